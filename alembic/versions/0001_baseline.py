@@ -0,0 +1,156 @@
+"""baseline schema (as created by Base.metadata.create_all)
+
+Existing databases already have these tables; stamp them instead of
+upgrading:
+
+    alembic stamp 0001_baseline
+
+Revision ID: 0001_baseline
+Revises:
+Create Date: 2026-10-16
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0001_baseline"
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+def _timestamps(nullable: bool = True):
+    return [
+        sa.Column("created_at", sa.DateTime(timezone=True), nullable=nullable),
+        sa.Column("updated_at", sa.DateTime(timezone=True), nullable=nullable),
+    ]
+
+
+def upgrade() -> None:
+    op.create_table(
+        "students",
+        sa.Column("id", sa.Integer, primary_key=True, autoincrement=True),
+        sa.Column("hovn_student_id", sa.String(64), unique=True, nullable=True),
+        sa.Column("first_name", sa.String(100)),
+        sa.Column("last_name", sa.String(100)),
+        sa.Column("email", sa.String(255)),
+        sa.Column("phone_e164", sa.String(32)),
+        sa.Column("phone_raw", sa.String(64)),
+        *_timestamps(nullable=False),
+    )
+    op.create_index("ix_students_email", "students", ["email"])
+
+    op.create_table(
+        "agencies",
+        sa.Column("id", sa.Integer, primary_key=True, autoincrement=True),
+        sa.Column("name", sa.String(255), unique=True, nullable=False),
+        *_timestamps(nullable=False),
+    )
+
+    op.create_table(
+        "courses",
+        sa.Column("id", sa.Integer, primary_key=True, autoincrement=True),
+        sa.Column("name", sa.String(255), nullable=False),
+        sa.Column("format", sa.String(50)),
+        sa.Column("agency_id", sa.Integer, sa.ForeignKey("agencies.id")),
+        *_timestamps(),
+        sa.UniqueConstraint("name", "format", "agency_id", name="uq_course_name_format_agency"),
+    )
+
+    op.create_table(
+        "locations",
+        sa.Column("id", sa.Integer, primary_key=True, autoincrement=True),
+        sa.Column("name", sa.String(255), nullable=False),
+        sa.Column("address_line1", sa.String(255)),
+        sa.Column("city", sa.String(100)),
+        sa.Column("state", sa.String(50)),
+        sa.Column("postal_code", sa.String(20)),
+        sa.Column("country_code", sa.String(2)),
+        sa.Column("raw_address", sa.String(500)),
+        *_timestamps(),
+        sa.UniqueConstraint("name", "address_line1", "city", "state", "postal_code", name="uq_location"),
+    )
+
+    op.create_table(
+        "instructors",
+        sa.Column("id", sa.Integer, primary_key=True, autoincrement=True),
+        sa.Column("first_name", sa.String(100)),
+        sa.Column("last_name", sa.String(100)),
+        sa.Column("full_name", sa.String(255), nullable=False),
+        sa.Column("title", sa.String(100)),
+        sa.Column("email", sa.String(255)),
+        sa.Column("phone_e164", sa.String(32)),
+        sa.Column("phone_raw", sa.String(64)),
+        *_timestamps(),
+    )
+
+    op.create_table(
+        "sessions",
+        sa.Column("id", sa.Integer, primary_key=True, autoincrement=True),
+        sa.Column("hovn_session_id", sa.String(64), unique=True, nullable=False),
+        sa.Column("course_id", sa.Integer, sa.ForeignKey("courses.id")),
+        sa.Column("agency_id", sa.Integer, sa.ForeignKey("agencies.id")),
+        sa.Column("location_id", sa.Integer, sa.ForeignKey("locations.id")),
+        sa.Column("instructor_id", sa.Integer, sa.ForeignKey("instructors.id")),
+        sa.Column("start_utc", sa.DateTime(timezone=True)),
+        sa.Column("start_local", sa.DateTime(timezone=True)),
+        sa.Column("format", sa.String(50)),
+        sa.Column("hovn_session_url", sa.String(500)),
+        *_timestamps(),
+    )
+
+    op.create_table(
+        "orders",
+        sa.Column("id", sa.Integer, primary_key=True, autoincrement=True),
+        sa.Column("hovn_order_id", sa.String(64), unique=True, nullable=False),
+        sa.Column("hovn_order_number", sa.String(64)),
+        sa.Column("stripe_order_number", sa.String(128)),
+        sa.Column("student_id", sa.Integer, sa.ForeignKey("students.id")),
+        sa.Column("amount_cents", sa.Integer),
+        sa.Column("currency_code", sa.String(3)),
+        sa.Column("status", sa.String(50)),
+        sa.Column("ordered_at_utc", sa.DateTime(timezone=True)),
+        sa.Column("ordered_at_local", sa.DateTime(timezone=True)),
+        *_timestamps(),
+    )
+    op.create_index("ix_orders_stripe_order_number", "orders", ["stripe_order_number"])
+
+    op.create_table(
+        "bookings",
+        sa.Column("id", sa.Integer, primary_key=True, autoincrement=True),
+        sa.Column("hovn_booking_ref", sa.String(64), unique=True, nullable=False),
+        sa.Column("student_id", sa.Integer, sa.ForeignKey("students.id")),
+        sa.Column("session_id", sa.Integer, sa.ForeignKey("sessions.id")),
+        sa.Column("order_id", sa.Integer, sa.ForeignKey("orders.id")),
+        sa.Column("status", sa.String(50)),
+        sa.Column("is_online_component_completed", sa.Boolean),
+        *_timestamps(),
+    )
+
+    op.create_table(
+        "certificates",
+        sa.Column("cert_id", sa.String(32), primary_key=True),
+        sa.Column("student_id", sa.Integer, sa.ForeignKey("students.id"), nullable=False),
+        sa.Column("course_name", sa.String(255)),
+        sa.Column("course_code", sa.String(64)),
+        sa.Column("format", sa.String(32)),
+        sa.Column("issuer_org", sa.String(255)),
+        sa.Column("instructor_name", sa.String(255)),
+        sa.Column("issue_date", sa.Date),
+        sa.Column("expiry_date", sa.Date),
+        sa.Column("added_at", sa.DateTime),
+    )
+
+
+def downgrade() -> None:
+    for table in (
+        "certificates",
+        "bookings",
+        "orders",
+        "sessions",
+        "instructors",
+        "locations",
+        "courses",
+        "agencies",
+        "students",
+    ):
+        op.drop_table(table)
@@ -0,0 +1,25 @@
+"""students.certs_checked_at + expiry index for the cert refresh scheduler
+
+Revision ID: 0002_cert_refresh
+Revises: 0001_baseline
+Create Date: 2026-10-16
+"""
+from alembic import op
+
+revision = "0002_cert_refresh"
+down_revision = "0001_baseline"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # IF NOT EXISTS: some environments already picked these up via create_all()
+    op.execute("ALTER TABLE students ADD COLUMN IF NOT EXISTS certs_checked_at TIMESTAMPTZ")
+    op.execute("CREATE INDEX IF NOT EXISTS ix_students_certs_checked_at ON students (certs_checked_at)")
+    op.execute("CREATE INDEX IF NOT EXISTS ix_certificates_expiry_date ON certificates (expiry_date)")
+
+
+def downgrade() -> None:
+    op.execute("DROP INDEX IF EXISTS ix_certificates_expiry_date")
+    op.execute("DROP INDEX IF EXISTS ix_students_certs_checked_at")
+    op.execute("ALTER TABLE students DROP COLUMN IF EXISTS certs_checked_at")
@@ -0,0 +1,31 @@
+"""sync_state table for incremental Hovn syncs (updatedAt watermarks)
+
+Revision ID: 0003_sync_state
+Revises: 0002_cert_refresh
+Create Date: 2026-10-16
+"""
+from alembic import op
+
+revision = "0003_sync_state"
+down_revision = "0002_cert_refresh"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # IF NOT EXISTS: some environments already picked this up via create_all()
+    op.execute(
+        """
+        CREATE TABLE IF NOT EXISTS sync_state (
+            name VARCHAR(64) PRIMARY KEY,
+            watermark TIMESTAMPTZ,
+            last_run_at TIMESTAMPTZ,
+            last_run_stats TEXT,
+            updated_at TIMESTAMPTZ NOT NULL DEFAULT now()
+        )
+        """
+    )
+
+
+def downgrade() -> None:
+    op.execute("DROP TABLE IF EXISTS sync_state")
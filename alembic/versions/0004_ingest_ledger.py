@@ -0,0 +1,35 @@
+"""ingest_ledger table: per-ref source hash, outcome and retry backoff
+
+Revision ID: 0004_ingest_ledger
+Revises: 0003_sync_state
+Create Date: 2026-10-16
+"""
+from alembic import op
+
+revision = "0004_ingest_ledger"
+down_revision = "0003_sync_state"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # IF NOT EXISTS: some environments already picked this up via create_all()
+    op.execute(
+        """
+        CREATE TABLE IF NOT EXISTS ingest_ledger (
+            booking_ref VARCHAR(64) PRIMARY KEY,
+            source_hash VARCHAR(64),
+            outcome VARCHAR(16),
+            error TEXT,
+            failures INTEGER NOT NULL DEFAULT 0,
+            last_fetched_at TIMESTAMPTZ,
+            last_success_at TIMESTAMPTZ,
+            next_retry_at TIMESTAMPTZ,
+            updated_at TIMESTAMPTZ NOT NULL DEFAULT now()
+        )
+        """
+    )
+
+
+def downgrade() -> None:
+    op.execute("DROP TABLE IF EXISTS ingest_ledger")
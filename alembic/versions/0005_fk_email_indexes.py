@@ -0,0 +1,58 @@
+"""indexes on foreign keys + lower(email) for case-insensitive student lookups
+
+Revision ID: 0005_fk_email_indexes
+Revises: 0004_ingest_ledger
+Create Date: 2026-10-16
+"""
+import sqlalchemy as sa
+from alembic import op
+
+revision = "0005_fk_email_indexes"
+down_revision = "0004_ingest_ledger"
+branch_labels = None
+depends_on = None
+
+# (name, table, column expression)
+INDEXES = (
+    ("ix_bookings_student_id", "bookings", "student_id"),
+    ("ix_bookings_session_id", "bookings", "session_id"),
+    ("ix_bookings_order_id", "bookings", "order_id"),
+    ("ix_orders_student_id", "orders", "student_id"),
+    ("ix_sessions_course_id", "sessions", "course_id"),
+    ("ix_sessions_location_id", "sessions", "location_id"),
+    ("ix_sessions_instructor_id", "sessions", "instructor_id"),
+    ("ix_certificates_student_id", "certificates", "student_id"),
+    ("ix_certificates_expiry_date", "certificates", "expiry_date"),
+    ("ix_students_email_lower", "students", "lower(email)"),
+)
+
+
+def _is_invalid(name: str) -> bool:
+    return bool(
+        op.get_bind().execute(
+            sa.text("SELECT NOT indisvalid FROM pg_index WHERE indexrelid = to_regclass(:name)"),
+            {"name": name},
+        ).scalar()
+    )
+
+
+def upgrade() -> None:
+    # CONCURRENTLY so the API keeps writing while these build; it can't run
+    # inside a transaction. IF NOT EXISTS: create_all() may have made them
+    # (ix_certificates_expiry_date already comes from 0002).
+    context = op.get_context()
+    with context.autocommit_block():
+        for name, table, expr in INDEXES:
+            # An interrupted CONCURRENTLY build leaves an INVALID index behind
+            # that IF NOT EXISTS would keep and the planner never uses
+            if not context.as_sql and _is_invalid(name):
+                op.execute(f"DROP INDEX CONCURRENTLY IF EXISTS {name}")
+            op.execute(f"CREATE INDEX CONCURRENTLY IF NOT EXISTS {name} ON {table} ({expr})")
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        for name, _, _ in INDEXES:
+            if name == "ix_certificates_expiry_date":
+                continue  # owned by 0002_cert_refresh
+            op.execute(f"DROP INDEX CONCURRENTLY IF EXISTS {name}")
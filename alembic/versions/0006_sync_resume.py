@@ -0,0 +1,23 @@
+"""sync_state resume cursor for incremental walks cut short by the page cap
+
+Revision ID: 0006_sync_resume
+Revises: 0005_fk_email_indexes
+Create Date: 2026-10-16
+"""
+from alembic import op
+
+revision = "0006_sync_resume"
+down_revision = "0005_fk_email_indexes"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # IF NOT EXISTS: some environments already picked these up via create_all()
+    op.execute("ALTER TABLE sync_state ADD COLUMN IF NOT EXISTS resume_page INTEGER")
+    op.execute("ALTER TABLE sync_state ADD COLUMN IF NOT EXISTS resume_watermark TIMESTAMPTZ")
+
+
+def downgrade() -> None:
+    op.execute("ALTER TABLE sync_state DROP COLUMN IF EXISTS resume_watermark")
+    op.execute("ALTER TABLE sync_state DROP COLUMN IF EXISTS resume_page")
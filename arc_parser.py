@@ -0,0 +1,192 @@
+# arc_parser.py
+# -------------
+# Single parser for the Red Cross Certificates-SearchCertificates ajax
+# response. Every certificate row carries a hidden
+#
+#   <input class="certpdfdownload" value="id-XXXX|...|...">
+#
+# whose pipe-separated value has everything we store. Instead of building
+# a BeautifulSoup tree for the whole page we jump straight to those inputs
+# with str.find and only look at the tag text.
+
+import html as html_lib
+import re
+from dataclasses import dataclass
+from datetime import date, datetime
+from functools import lru_cache
+from typing import Any, Dict, Iterator, List
+
+# Red Cross certpdfdownload value indexes:
+# 0  id-XXXXXX
+# 1  TS/walletpdftemplate
+# 2  cert PDF URL
+# 3  Org / Provider
+# 4  AAS number
+# 5  Course name
+# 6  Course code
+# 7  ?
+# 8  Format (text)
+# 9  Active/Expired
+# 10 "Certifications"
+# 11 Student name
+# 12 Provider / Org
+# 13 Issue date
+# 14 Expiry date
+# 15 Validity length
+# 16 Instructor name
+# 17 Cert number duplicated
+IDX_CERT_ID = 0
+IDX_PDF_URL = 2
+IDX_ORG = 3
+IDX_COURSE_NAME = 5
+IDX_COURSE_CODE = 6
+IDX_STATUS = 9
+IDX_STUDENT_NAME = 11
+IDX_ISSUE_DATE = 13
+IDX_EXPIRY_DATE = 14
+IDX_VALIDITY = 15
+IDX_INSTRUCTOR = 16
+
+DATE_FORMATS = ("%m/%d/%Y", "%b %d, %Y", "%b %d, %y")
+
+_MARKER = "certpdfdownload"
+# Anchored on whitespace so data-class= / data-value= don't match
+_CLASS_RE = re.compile(r"""(?:^|\s)class\s*=\s*(?:"([^"]*)"|'([^']*)'|([^\s>]+))""", re.I)
+_VALUE_RE = re.compile(r"""(?:^|\s)value\s*=\s*(?:"([^"]*)"|'([^']*)'|([^\s>]+))""", re.I)
+
+
+@dataclass(frozen=True)
+class ArcCert:
+    cert_id: str
+    course_name: str
+    course_code: str
+    format: str
+    status: str
+    issuer_org: str
+    student_name: str
+    instructor_name: str
+    pdf_url: str
+    validity: str
+    issue_date: date | None
+    expiry_date: date | None
+    issue_date_raw: str
+    expiry_date_raw: str
+
+    def as_dict(self) -> Dict[str, Any]:
+        """Dict in the shape redcross.scrape_certs_for_email has always returned."""
+        return {
+            "cert_id": self.cert_id,
+            "course_name": self.course_name,
+            "course_code": self.course_code,
+            "format": self.format,
+            "issue_date": _fmt_date(self.issue_date) or self.issue_date_raw,
+            "expiry_date": _fmt_date(self.expiry_date) or self.expiry_date_raw,
+            "agency_org_name": self.issuer_org,
+            "instructor_name": self.instructor_name,
+        }
+
+
+def determine_format(course_code: str):
+    code = (course_code or "").upper()
+    if "BL" in code:
+        return "Blended"
+    if "OL" in code or code.startswith("ROC"):
+        return "Online"
+    return "Instructor-Led"
+
+
+@lru_cache(maxsize=4096)
+def parse_arc_date(raw: str) -> date | None:
+    raw = (raw or "").strip()
+    if not raw:
+        return None
+    for fmt in DATE_FORMATS:
+        try:
+            return datetime.strptime(raw, fmt).date()
+        except ValueError:
+            continue
+    return None
+
+
+def _fmt_date(d: date | None) -> str | None:
+    return d.strftime("%m/%d/%Y") if d else None
+
+
+def _attr(regex: re.Pattern, tag: str) -> str | None:
+    m = regex.search(tag)
+    if not m:
+        return None
+    return next(g for g in m.groups() if g is not None)
+
+
+def iter_certpdf_values(html: str) -> Iterator[str]:
+    """
+    Yield the (unescaped) value attribute of every <input> whose class
+    list contains "certpdfdownload", in document order.
+    """
+    pos = 0
+    while True:
+        hit = html.find(_MARKER, pos)
+        if hit == -1:
+            return
+
+        start = html.rfind("<", 0, hit)
+        end = html.find(">", hit)
+        if start == -1 or end == -1:
+            return
+        pos = end + 1
+
+        tag = html[start:end]
+        if tag[1:6].lower() != "input":
+            continue
+
+        classes = _attr(_CLASS_RE, tag)
+        if not classes or _MARKER not in classes.split():
+            continue
+
+        value = _attr(_VALUE_RE, tag) or ""
+        if "&" in value:
+            value = html_lib.unescape(value)
+        yield value
+
+
+def parse_cert_value(raw: str) -> ArcCert | None:
+    parts = raw.split("|")
+
+    def part(i: int) -> str:
+        return parts[i].strip() if len(parts) > i else ""
+
+    cert_id = part(IDX_CERT_ID).replace("id-", "")
+    if not cert_id:
+        return None
+
+    course_code = part(IDX_COURSE_CODE)
+    issue_raw = part(IDX_ISSUE_DATE)
+    expiry_raw = part(IDX_EXPIRY_DATE)
+
+    return ArcCert(
+        cert_id=cert_id,
+        course_name=part(IDX_COURSE_NAME),
+        course_code=course_code,
+        format=determine_format(course_code),
+        status=part(IDX_STATUS),
+        issuer_org=part(IDX_ORG),
+        student_name=part(IDX_STUDENT_NAME),
+        instructor_name=part(IDX_INSTRUCTOR),
+        pdf_url=part(IDX_PDF_URL),
+        validity=part(IDX_VALIDITY),
+        issue_date=parse_arc_date(issue_raw),
+        expiry_date=parse_arc_date(expiry_raw),
+        issue_date_raw=issue_raw,
+        expiry_date_raw=expiry_raw,
+    )
+
+
+def parse_certs(html: str) -> List[ArcCert]:
+    """Parse every certificate in an ARC search response."""
+    certs = []
+    for raw in iter_certpdf_values(html or ""):
+        cert = parse_cert_value(raw)
+        if cert is not None:
+            certs.append(cert)
+    return certs
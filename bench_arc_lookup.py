@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+# bench_arc_lookup.py
+# -------------------
+# Usage:
+#   python bench_arc_lookup.py
+#   python bench_arc_lookup.py --emails 400 --latency 0.15 --concurrency 1 4 16 64
+#
+# Starts a local ARC stand-in (aiohttp) that answers the
+# Certificates-SearchCertificates ajax call after a fixed delay,
+# then runs redcross.scrape_certs_for_emails against it at several
+# concurrency levels and prints throughput for each.
+
+import argparse
+import asyncio
+import threading
+import time
+
+from aiohttp import web
+
+from http_transport import PooledTransport
+from redcross import scrape_certs_for_emails
+
+CERT_INPUT = (
+    '<input type="hidden" class="certpdfdownload" value="'
+    "id-{n:08d}|TS/walletpdftemplate|https://example.invalid/{n}.pdf|"
+    "n.e. thing training|AAS123|Adult First Aid/CPR/AED|BL-FACPRAED|x|Blended|Active|"
+    "Certifications|Student {n}|n.e. thing training|01/15/2024|01/15/2026|2 years|"
+    'Jane Instructor|{n:08d}" />'
+)
+
+
+def _fake_arc_html(email: str, certs: int) -> str:
+    seed = abs(hash(email)) % 10_000_000
+    rows = "\n".join(
+        f'<div class="certificate-heading-list result-certificate-dt align-layout">'
+        f"{CERT_INPUT.format(n=seed + i)}</div>"
+        for i in range(certs)
+    )
+    return f"<html><body>{rows}</body></html>"
+
+
+def start_standin(port: int, latency: float, certs: int) -> threading.Thread:
+    async def handler(request: web.Request):
+        await asyncio.sleep(latency)
+        email = request.query.get("email", "")
+        return web.Response(text=_fake_arc_html(email, certs), content_type="text/html")
+
+    ready = threading.Event()
+
+    def run():
+        loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(loop)
+        app = web.Application()
+        app.router.add_get("/arc", handler)
+        runner = web.AppRunner(app)
+        loop.run_until_complete(runner.setup())
+        loop.run_until_complete(web.TCPSite(runner, "127.0.0.1", port).start())
+        ready.set()
+        loop.run_forever()
+
+    t = threading.Thread(target=run, daemon=True)
+    t.start()
+    ready.wait()
+    return t
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Benchmark bulk ARC lookups against a local stand-in.")
+    ap.add_argument("--emails", type=int, default=200)
+    ap.add_argument("--latency", type=float, default=0.1, help="stand-in response delay (seconds)")
+    ap.add_argument("--certs", type=int, default=3, help="certs per response")
+    ap.add_argument("--port", type=int, default=8765)
+    ap.add_argument("--concurrency", type=int, nargs="+", default=[1, 4, 16, 64])
+    args = ap.parse_args()
+
+    start_standin(args.port, args.latency, args.certs)
+    base_url = f"http://127.0.0.1:{args.port}/arc"
+
+    emails = [f"student{i}@example.com" for i in range(args.emails)]
+
+    # No client-side rate limit: we are measuring the concurrency ceiling
+    transport = PooledTransport(name="BENCH", pool_size=max(args.concurrency))
+
+    print(f"[BENCH] {args.emails} emails, {args.latency * 1000:.0f} ms simulated ARC latency")
+    print(f"{'concurrency':>12} {'seconds':>9} {'emails/s':>10} {'errors':>7}")
+
+    for n in args.concurrency:
+        errors = 0
+        started = time.perf_counter()
+        for _email, _certs, err in scrape_certs_for_emails(
+            emails, concurrency=n, base_url=base_url, transport=transport
+        ):
+            if err is not None:
+                errors += 1
+        elapsed = time.perf_counter() - started
+        print(f"{n:>12} {elapsed:>9.2f} {args.emails / elapsed:>10.1f} {errors:>7}")
+
+
+if __name__ == "__main__":
+    main()
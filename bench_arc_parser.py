@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+# bench_arc_parser.py
+# -------------------
+# Usage:
+#   python bench_arc_parser.py
+#   python bench_arc_parser.py --certs 10 100 1000 --repeat 20
+#
+# Compares arc_parser.parse_certs against the BeautifulSoup path the
+# three ARC parsers used before (full html.parser tree + select) on
+# synthetic multi-cert ARC responses, and checks both agree.
+
+import argparse
+import time
+
+from bs4 import BeautifulSoup
+
+from arc_parser import parse_certs
+
+ROW = """
+<div class="certificate-heading-list result-certificate-dt align-layout">
+  <input type="hidden" class="certid" value="id-{n:010d}">
+  <div class="section-header col-class">Adult and Pediatric First Aid/CPR/AED</div>
+  <div class="section-header col-date">Jan 15, 2024</div>
+  <div class="col-actions">
+    <a href="#" class="btn btn-link download-cert" data-id="{n}">Download</a>
+    <input type="hidden" class="certpdfdownload" value="id-{n:010d}|TS/walletpdftemplate|https://www.redcross.org/certs/{n}.pdf|n.e. thing training|AAS{n}|Adult and Pediatric First Aid/CPR/AED|BL-APFACPRAED|x|Blended|Active|Certifications|Student Name {n}|n.e. thing training|01/15/2024|01/15/2026|2 years|Jane Instructor|{n:010d}">
+  </div>
+  <ul class="details">{filler}</ul>
+</div>
+"""
+
+FILLER = "".join(f'<li class="detail-{i}"><span>field {i}</span><em>value</em></li>' for i in range(12))
+
+
+def build_response(certs: int) -> str:
+    rows = "".join(ROW.format(n=i, filler=FILLER) for i in range(certs))
+    return (
+        '<html><head><script src="/app.js"></script></head><body>'
+        '<div class="search-results">' + rows + "</div></body></html>"
+    )
+
+
+def legacy_bs4_parse(html: str):
+    soup = BeautifulSoup(html, "html.parser")
+    out = []
+    for tag in soup.select("input.certpdfdownload"):
+        parts = tag.get("value", "").split("|")
+        out.append(parts[0].replace("id-", ""))
+    return out
+
+
+def _best_of(fn, html: str, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn(html)
+        best = min(best, time.perf_counter() - t0)
+    return best
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Benchmark ARC response parsing.")
+    ap.add_argument("--certs", type=int, nargs="+", default=[1, 10, 100, 1000])
+    ap.add_argument("--repeat", type=int, default=10)
+    args = ap.parse_args()
+
+    print(f"{'certs':>7} {'size KB':>9} {'bs4 ms':>9} {'scanner ms':>11} {'speedup':>8}")
+    for n in args.certs:
+        html = build_response(n)
+
+        expected = legacy_bs4_parse(html)
+        got = [c.cert_id for c in parse_certs(html)]
+        if got != expected:
+            raise SystemExit(f"parsers disagree at {n} certs")
+
+        bs = _best_of(legacy_bs4_parse, html, args.repeat)
+        fast = _best_of(parse_certs, html, args.repeat)
+        print(
+            f"{n:>7} {len(html) / 1024:>9.1f} {bs * 1000:>9.2f} "
+            f"{fast * 1000:>11.3f} {bs / fast:>7.0f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
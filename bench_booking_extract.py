@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+# bench_booking_extract.py
+# ------------------------
+# Usage:
+#   python bench_booking_extract.py
+#   python bench_booking_extract.py --sizes-mb 1 4 16 --legacy-timeout 5
+#
+# Adversarial inputs for booking JSON extraction from admin page HTML:
+#   miss-noise:  multi-MB page of other bookings, target ref absent
+#   miss-open:   thousands of '"booking":{' openers that never close, ref absent
+#   near-miss:   thousands of '"referenceNumber":"brn_TARGET' prefixes
+#                (brn_TARGETX), no real match
+#   open-ref:    unclosed '"booking":{' openers, then the ref outside any booking
+#   bad-ref:     100k+ closed but malformed '"booking":{...}' objects on
+#                separate lines, then the ref outside any booking
+#   deep-ref:    the target booking nested thousands of arrays deep
+#                (must fail with HovnHttpScrapeError, not RecursionError)
+#   hit-last:    target booking is the last of thousands
+#
+# For each we time hovn_http_scraper.find_booking_json (the index-based
+# extractor hovn_api_client falls back to) and the old
+# '"booking":(\{.*?"referenceNumber":"..".*?}}),"disabled"' DOTALL regex.
+# The regex runs in a subprocess and is killed after --legacy-timeout
+# seconds, since on these inputs it backtracks more or less forever.
+
+import argparse
+import json
+import multiprocessing as mp
+import re
+import time
+
+from hovn_http_scraper import find_booking_json, HovnHttpScrapeError
+
+TARGET = "brn_TARGET"
+
+
+def _booking(i: int, ref: str) -> str:
+    b = {
+        "id": i,
+        "referenceNumber": ref,
+        "createdAt": "$D2025-11-07T15:41:44.284Z",
+        "student": {"id": 100 + i, "firstName": "S", "lastName": str(i), "email": f"s{i}@example.com"},
+        "courseOrderItem": {"orderId": 500 + i, "order": {"referenceNumber": f"ord_{i}", "status": "PAID"}},
+        "courseSession": {"id": 77, "course": {"name": "Adult CPR"}},
+    }
+    return '"booking":' + json.dumps(b, separators=(",", ":")) + ',"disabled":false'
+
+
+def _fill(unit_fn, size_mb: float) -> str:
+    parts, total, i = [], 0, 0
+    while total < size_mb * 1_000_000:
+        u = unit_fn(i)
+        parts.append(u)
+        total += len(u)
+        i += 1
+    return "<html><body><script>" + ",".join(parts)
+
+
+def build_cases(size_mb: float) -> dict:
+    return {
+        "miss-noise": _fill(lambda i: "{" + _booking(i, f"brn_{i:06d}") + "}", size_mb),
+        "miss-open": _fill(lambda i: '{"booking":{"id":' + str(i) + ',"note":"' + "x" * 40 + '"', size_mb),
+        "near-miss": _fill(lambda i: '{"booking":{"referenceNumber":"' + TARGET + 'X","id":' + str(i) + "}}", size_mb),
+        "open-ref": _fill(lambda i: '{"booking":{"id":' + str(i) + ',"note":"' + "x" * 40 + '"', size_mb)
+        + ',"referenceNumber":"' + TARGET + '"',
+        "bad-ref": _fill(lambda i: '{"booking":{"id":' + str(i) + ',oops}}\n', size_mb)
+        + '"referenceNumber":"' + TARGET + '"',
+        "deep-ref": '{"booking":{"referenceNumber":"' + TARGET + '","x":'
+        + "[" * 100_000 + "]" * 100_000 + "}}",
+        "hit-last": _fill(lambda i: "{" + _booking(i, f"brn_{i:06d}") + "}", size_mb) + ",{" + _booking(-1, TARGET) + "}",
+    }
+
+
+def legacy_regex(html: str, booking_ref: str):
+    pattern = '"booking":(' + r'\{.*?"referenceNumber":"' + re.escape(booking_ref) + r'".*?}}' + '),"disabled"'
+    return re.search(pattern, html, re.DOTALL)
+
+
+def _legacy_worker(html: str, q) -> None:
+    t0 = time.perf_counter()
+    m = legacy_regex(html, TARGET)
+    q.put((time.perf_counter() - t0, m is not None))
+
+
+def time_legacy(html: str, timeout: float):
+    q = mp.Queue()
+    p = mp.Process(target=_legacy_worker, args=(html, q))
+    p.start()
+    p.join(timeout)
+    if p.is_alive():
+        p.terminate()
+        p.join()
+        return None, None
+    return q.get()
+
+
+def time_indexed(html: str, repeat: int):
+    best, found = float("inf"), None
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        try:
+            found = find_booking_json(html, TARGET).get("referenceNumber") == TARGET
+        except HovnHttpScrapeError:
+            found = False
+        best = min(best, time.perf_counter() - t0)
+    return best, found
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Adversarial benchmark for booking JSON extraction.")
+    ap.add_argument("--sizes-mb", type=float, nargs="+", default=[1, 4])
+    ap.add_argument("--repeat", type=int, default=3)
+    ap.add_argument("--legacy-timeout", type=float, default=5.0)
+    ap.add_argument("--skip-legacy", action="store_true")
+    args = ap.parse_args()
+
+    print(f"{'case':>11} {'MB':>6} {'indexed ms':>11} {'found':>6} {'regex ms':>11} {'found':>6}")
+    for size in args.sizes_mb:
+        for name, html in build_cases(size).items():
+            t_idx, f_idx = time_indexed(html, args.repeat)
+            if args.skip_legacy:
+                legacy = f"{'-':>11} {'-':>6}"
+            else:
+                t_re, f_re = time_legacy(html, args.legacy_timeout)
+                legacy = (
+                    f"{'>' + format(args.legacy_timeout * 1000, '.0f'):>11} {'?':>6}"
+                    if t_re is None else f"{t_re * 1000:>11.1f} {str(f_re):>6}"
+                )
+            print(f"{name:>11} {len(html) / 1e6:>6.1f} {t_idx * 1000:>11.2f} {str(f_idx):>6} {legacy}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,153 @@
+#!/usr/bin/env python3
+# bench_bulk_loader.py
+# --------------------
+# Usage:
+#   BENCH_DATABASE_URL=postgresql://postgres@localhost/bench python bench_bulk_loader.py
+#   python bench_bulk_loader.py --database-url postgresql://... --bookings 20000 --orm-sample 1000
+#
+# Loads the same synthetic normalized bundles three ways into a scratch
+# schema ("bench_bulk", dropped afterwards) on a local Postgres:
+#   orm    db_pipeline.persist_full_normalized_bundle, one bundle per
+#          transaction (only --orm-sample bundles; it is slow)
+#   batch  db_pipeline.persist_normalized_bundles, HOVN_PERSIST_BATCH per call
+#   copy   bulk_loader.bulk_load (COPY into staging + set-based merge)
+# Tables are truncated and the dimension cache cleared before each path.
+# Never point this at the production database.
+
+import argparse
+import os
+import time
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import create_engine, text
+from sqlalchemy.orm import sessionmaker
+
+SCHEMA = "bench_bulk"
+
+
+def make_bundles(n: int):
+    base = datetime(2025, 1, 6, 15, tzinfo=timezone.utc)
+    for i in range(n):
+        sess = i // 20
+        start = base + timedelta(days=sess % 365)
+        yield {
+            "booking_ref": f"brn_{i:07d}",
+            "booking_url": None,
+            "student": {
+                "student_id": str(100000 + i * 4 // 5),
+                "first_name": "Student",
+                "last_name": str(i),
+                "email": f"student{i * 4 // 5}@example.com",
+                "phone_e164": "+13125550100",
+            },
+            "order": {
+                "order_id": str(500000 + i),
+                "order_number": f"ord_{i:07d}",
+                "status": "PAID",
+                "order_datetime_utc": start.isoformat(),
+                "order_datetime_central": start.isoformat(),
+                "total_cents": 9500,
+                "stripe_order_number": None,
+            },
+            "session": {
+                "session_id": str(7000 + sess),
+                "course_name": ("Adult CPR/AED", "BLS", "First Aid")[sess % 3],
+                "format": ("Blended", "In-Person", None)[sess % 3],
+                "agency": "American Red Cross",
+                "start_utc": start.isoformat(),
+                "start_central": start.isoformat(),
+                "location_name": f"Training Room {sess % 7}",
+                "location_street": f"{100 + sess % 7} Main St",
+                "location_city": "Glenview",
+                "location_state": "IL",
+                "location_zip": "60025",
+                "instructor_name": ("Jane Doe", "John Smith")[sess % 2],
+            },
+        }
+
+
+def reset(engine):
+    from dimension_cache import dimension_cache
+
+    with engine.begin() as conn:
+        conn.execute(text(
+            "TRUNCATE bookings, orders, sessions, certificates, students, courses, "
+            "locations, instructors, agencies RESTART IDENTITY CASCADE"
+        ))
+    dimension_cache.clear()
+
+
+def run_orm(engine, bundles):
+    import db_pipeline
+
+    db_pipeline.SessionLocal = sessionmaker(bind=engine, expire_on_commit=False)
+    for b in bundles:
+        db_pipeline.persist_full_normalized_bundle(b)
+
+
+def run_batch(engine, bundles, batch_size):
+    from db_pipeline import persist_normalized_bundles
+
+    Session = sessionmaker(bind=engine, expire_on_commit=False)
+    for i in range(0, len(bundles), batch_size):
+        with Session() as db:
+            persist_normalized_bundles(bundles[i:i + batch_size], db=db)
+
+
+def run_copy(engine, bundles):
+    from bulk_loader import bulk_load
+
+    bulk_load(bundles, engine=engine)
+
+
+def main():
+    ap = argparse.ArgumentParser(description="ORM vs batch vs COPY import benchmark (local Postgres only).")
+    ap.add_argument("--database-url", default=os.getenv("BENCH_DATABASE_URL"))
+    ap.add_argument("--bookings", type=int, default=10000)
+    ap.add_argument("--orm-sample", type=int, default=1000)
+    ap.add_argument("--batch-size", type=int, default=int(os.getenv("HOVN_PERSIST_BATCH", "500")))
+    ap.add_argument("--paths", nargs="+", default=["orm", "batch", "copy"])
+    args = ap.parse_args()
+
+    if not args.database_url:
+        ap.error("set BENCH_DATABASE_URL or pass --database-url (a local scratch database)")
+
+    # db_pipeline builds its module engine from DATABASE_URL on import (and
+    # load_dotenv() won't override it): point it at the scratch database too
+    os.environ["DATABASE_URL"] = args.database_url
+
+    from db import Base
+    import models  # noqa: F401  (registers the tables)
+
+    admin = create_engine(args.database_url)
+    with admin.begin() as conn:
+        conn.execute(text(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE"))
+        conn.execute(text(f"CREATE SCHEMA {SCHEMA}"))
+    engine = create_engine(args.database_url, connect_args={"options": f"-csearch_path={SCHEMA}"})
+    Base.metadata.create_all(engine)
+
+    bundles = list(make_bundles(args.bookings))
+    print(f"{'path':>6} {'bookings':>9} {'seconds':>9} {'rows/sec':>10}")
+    try:
+        for path in args.paths:
+            sample = bundles[:args.orm_sample] if path == "orm" else bundles
+            reset(engine)
+            t0 = time.perf_counter()
+            if path == "orm":
+                run_orm(engine, sample)
+            elif path == "batch":
+                run_batch(engine, sample, args.batch_size)
+            elif path == "copy":
+                run_copy(engine, sample)
+            else:
+                raise SystemExit(f"unknown path {path}")
+            elapsed = time.perf_counter() - t0
+            print(f"{path:>6} {len(sample):>9} {elapsed:>9.2f} {len(sample) / elapsed:>10.0f}")
+    finally:
+        engine.dispose()
+        with admin.begin() as conn:
+            conn.execute(text(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE"))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,191 @@
+#!/usr/bin/env python3
+# bench_hovn_scraper.py
+# ---------------------
+# Usage:
+#   python bench_hovn_scraper.py brn_ABC123 --booking-html booking.html
+#   python bench_hovn_scraper.py brn_ABC123 --booking-html booking.html --session-html session.html --repeat 5
+#   python bench_hovn_scraper.py brn_ABC123 --live          # end-to-end against Hovn (cookie + Edge needed)
+#
+# Fixtures are saved Hovn admin pages (view-source / "Save page as",
+# or objects from RAW_ARCHIVE_DIR). For each one we time:
+#   - http:       hovn_http_scraper.parse_booking_page on the booking HTML
+#   - pw-locator:  set_content + one locator wait per XPath on the same HTML
+#                  (bundled Chromium, live XPath timeouts)
+#   - pw-evaluate: set_content + one readiness wait and a single page.evaluate
+#                  for every XPath (HOVN_EXTRACT_MODE=evaluate)
+# and print which normalized fields the engines disagree on.
+#
+# --live times scrape_booking_and_session with each backend instead
+# (network + navigation included).
+#
+# --page-loads times the Playwright path under each request-blocking
+# profile / wait condition (off+networkidle is the old behaviour):
+#   python bench_hovn_scraper.py brn_ABC123 --page-loads --repeat 5
+
+import argparse
+import time
+
+from normalize import normalize_full_bundle
+
+
+def _read(path: str | None) -> str | None:
+    if not path:
+        return None
+    with open(path, encoding="utf-8") as f:
+        return f.read()
+
+
+def _flatten(d: dict, prefix: str = "") -> dict:
+    out = {}
+    for k, v in d.items():
+        if isinstance(v, dict):
+            out.update(_flatten(v, f"{prefix}{k}."))
+        else:
+            out[f"{prefix}{k}"] = v
+    return out
+
+
+def _diff(a: dict, b: dict) -> list:
+    fa, fb = _flatten(a), _flatten(b)
+    return sorted(k for k in fa.keys() | fb.keys() if fa.get(k) != fb.get(k))
+
+
+def bench_fixtures(args) -> None:
+    from playwright.sync_api import sync_playwright
+
+    from hovn_http_scraper import parse_booking_page, HovnHttpScrapeError
+    from hovn_scraper import (
+        _extract_booking_locator,
+        _extract_session_locator,
+        extract_booking,
+        extract_session,
+        XPATH_TIMEOUT_MS,
+        BOOKING_BASE_URL,
+    )
+
+    pw_modes = {
+        "pw-locator": (_extract_booking_locator, _extract_session_locator),
+        "pw-evaluate": (
+            lambda page, timeout: extract_booking(page, timeout)[0],
+            lambda page, timeout: extract_session(page, timeout)[0],
+        ),
+    }
+
+    booking_html = _read(args.booking_html)
+    session_html = _read(args.session_html)
+
+    http_times = []
+    http_bundle = None
+    for _ in range(args.repeat):
+        t0 = time.perf_counter()
+        try:
+            http_bundle = parse_booking_page(booking_html, args.ref)
+        except HovnHttpScrapeError as e:
+            print(f"[BENCH] http engine failed: {e}")
+            break
+        http_times.append(time.perf_counter() - t0)
+
+    times = {"http": http_times}
+    bundles = {"http": http_bundle}
+    with sync_playwright() as p:
+        browser = p.chromium.launch(headless=True)
+        page = browser.new_page()
+        try:
+            for mode, (get_booking, get_session) in pw_modes.items():
+                times[mode] = []
+                for _ in range(args.repeat):
+                    t0 = time.perf_counter()
+                    page.set_content(booking_html, wait_until="domcontentloaded")
+                    booking = get_booking(page, XPATH_TIMEOUT_MS)
+                    session = None
+                    if session_html:
+                        page.set_content(session_html, wait_until="domcontentloaded")
+                        session = get_session(page, XPATH_TIMEOUT_MS)
+                    times[mode].append(time.perf_counter() - t0)
+                    bundles[mode] = {
+                        "booking_ref": args.ref,
+                        "booking_url": BOOKING_BASE_URL + args.ref,
+                        "booking": booking,
+                        "session": session,
+                    }
+        finally:
+            browser.close()
+
+    print(f"{'engine':>11} {'best ms':>10} {'mean ms':>10}")
+    for name, t in times.items():
+        if t:
+            print(f"{name:>11} {min(t) * 1000:>10.2f} {sum(t) / len(t) * 1000:>10.2f}")
+
+    locator, evaluate = bundles.get("pw-locator"), bundles.get("pw-evaluate")
+    if locator and evaluate:
+        diff = _diff(locator, evaluate)
+        print(f"[BENCH] pw-locator vs pw-evaluate raw fields that differ: {', '.join(diff) if diff else 'none'}")
+
+    if http_bundle and evaluate and evaluate["session"]:
+        diff = _diff(normalize_full_bundle(http_bundle), normalize_full_bundle(evaluate))
+        print(f"[BENCH] http vs playwright normalized fields that differ: {', '.join(diff) if diff else 'none'}")
+
+
+def bench_live(args) -> None:
+    from hovn_scraper import scrape_booking_and_session
+
+    results = {}
+    for backend in ("http", "playwright"):
+        t0 = time.perf_counter()
+        try:
+            results[backend] = scrape_booking_and_session(args.ref, backend=backend)
+            print(f"[BENCH] {backend:>10}: {time.perf_counter() - t0:.2f}s")
+        except Exception as e:
+            print(f"[BENCH] {backend:>10}: failed after {time.perf_counter() - t0:.2f}s ({e})")
+
+    if len(results) == 2:
+        diff = _diff(normalize_full_bundle(results["http"]), normalize_full_bundle(results["playwright"]))
+        print(f"[BENCH] normalized fields that differ: {', '.join(diff) if diff else 'none'}")
+
+
+PAGE_LOAD_CONFIGS = (
+    ("off", "networkidle"),
+    ("assets", "domcontentloaded"),
+    ("strict", "domcontentloaded"),
+)
+
+
+def bench_page_loads(args) -> None:
+    from hovn_scraper import scrape_booking_and_session_playwright, PAGE_TIMINGS
+
+    phases = ("booking_nav", "booking_extract", "session_nav", "session_extract", "scrape_total")
+    print(f"{'profile':>8} {'wait_until':>17} {'blocked':>8} " + " ".join(f"{p:>16}" for p in phases))
+    for profile, wait_until in PAGE_LOAD_CONFIGS:
+        PAGE_TIMINGS.reset()
+        for _ in range(args.repeat):
+            try:
+                scrape_booking_and_session_playwright(args.ref, block_profile=profile, wait_until=wait_until)
+            except Exception as e:
+                print(f"[BENCH] {profile}/{wait_until}: scrape failed ({e})")
+        summary = PAGE_TIMINGS.summary()
+        cells = [f"{summary[p]['mean_ms']:>14.0f}ms" if p in summary else f"{'-':>16}" for p in phases]
+        print(f"{profile:>8} {wait_until:>17} {summary['blocked_requests']:>8} " + " ".join(cells))
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Benchmark the HTTP/Flight and Playwright Hovn scrapers.")
+    ap.add_argument("ref", help="booking reference, e.g. brn_YZWADB")
+    ap.add_argument("--booking-html", help="saved admin booking page")
+    ap.add_argument("--session-html", help="saved admin session page (Playwright path only)")
+    ap.add_argument("--repeat", type=int, default=3)
+    ap.add_argument("--live", action="store_true")
+    ap.add_argument("--page-loads", action="store_true", help="time Playwright page loads per blocking profile")
+    args = ap.parse_args()
+
+    if args.page_loads:
+        bench_page_loads(args)
+    elif args.live:
+        bench_live(args)
+    elif args.booking_html:
+        bench_fixtures(args)
+    else:
+        ap.error("pass --booking-html (fixture mode), --live or --page-loads")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+# bench_next_parser.py
+# --------------------
+# Usage:
+#   python bench_next_parser.py
+#   python bench_next_parser.py --bookings 20 200 2000 --padding-kb 2048 --repeat 10
+#
+# Builds synthetic Hovn admin pages (a "bookings" and a "classes" array
+# buried in `padding-kb` of other Flight/HTML noise) and compares
+#   - legacy: _extract_array_block per key (Python char loop, one find()
+#             scan each) + _clean_hovn_json regexes + json.loads
+#   - single: extract_arrays, one scan + JSONDecoder.raw_decode with the
+#             $D / $undefined object hook
+# and checks both decode to the same data.
+
+import argparse
+import json
+import time
+
+from hovn_next_parser import _clean_hovn_json, _extract_array_block, extract_arrays
+
+
+def _booking(i: int) -> dict:
+    return {
+        "id": i,
+        "cuid": f"c{i:08d}",
+        "referenceNumber": f"brn_{i:06d}",
+        "courseSessionId": 1000 + i // 20,
+        "courseOrderItemId": 5000 + i,
+        "createdAt": "$D2025-11-07T15:41:44.284Z",
+        "updatedAt": "$D2025-11-08T09:00:00.000Z",
+        "canceledAt": "$undefined",
+        "verifiedAt": None,
+        "student": {
+            "id": 200 + i,
+            "firstName": "Student",
+            "lastName": f"Number {i}",
+            "email": f"student{i}@example.com",
+            "phoneNumber": "+13125551212",
+            "createdAt": "$D2024-01-01T00:00:00.000Z",
+        },
+        "courseOrderItem": {
+            "orderId": 9000 + i,
+            "price": 9500,
+            "order": {
+                "referenceNumber": f"ord_{i:06d}",
+                "status": "PAID",
+                "totalPrice": 9500,
+                "paidAt": "$D2025-11-07T15:41:44.284Z",
+                "notes": 'quoted "text" with [brackets] and {braces}',
+            },
+        },
+        "tags": ["$undefined", "vip"],
+    }
+
+
+def _class(i: int) -> dict:
+    return {
+        "id": i,
+        "courseSessionId": 1000 + i,
+        "modality": "INSTRUCTOR_LED",
+        "name": "Skills session",
+        "startsAt": "$D2025-12-01T15:00:00.000Z",
+        "endsAt": "$D2025-12-01T19:00:00.000Z",
+        "location": {"label": "HQ", "address1": "2331 Willow Rd", "city": "Glenview", "state": "IL", "postalCode": "60025"},
+    }
+
+
+def build_page(bookings: int, padding_kb: int) -> str:
+    noise = '<div class="x" data-k="[1,2,3]">' + "lorem ipsum " * 8 + "</div>"
+    pad = noise * max(1, padding_kb * 1024 // len(noise))
+    payload = json.dumps(
+        {"bookings": [_booking(i) for i in range(bookings)], "classes": [_class(i) for i in range(max(1, bookings // 20))]},
+        separators=(",", ":"),
+    )
+    # Arrays near the end, like the real pages: every find() walks the padding
+    return "<html><body>" + pad + "<script>" + payload + "</script>" + pad[: len(pad) // 4] + "</body></html>"
+
+
+def legacy(html: str) -> dict:
+    out = {}
+    for key in ("bookings", "classes"):
+        out[key] = json.loads(_clean_hovn_json(_extract_array_block(html, key)))
+    return out
+
+
+def single(html: str) -> dict:
+    return extract_arrays(html, ("bookings", "classes"))
+
+
+def _best_of(fn, html: str, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn(html)
+        best = min(best, time.perf_counter() - t0)
+    return best
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Benchmark Flight array extraction on synthetic Hovn pages.")
+    ap.add_argument("--bookings", type=int, nargs="+", default=[20, 200, 2000])
+    ap.add_argument("--padding-kb", type=int, default=1024)
+    ap.add_argument("--repeat", type=int, default=5)
+    args = ap.parse_args()
+
+    print(f"{'bookings':>9} {'page MB':>8} {'legacy ms':>10} {'single ms':>10} {'speedup':>8}  same")
+    for n in args.bookings:
+        html = build_page(n, args.padding_kb)
+        same = legacy(html) == single(html)
+        t_legacy = _best_of(legacy, html, args.repeat)
+        t_single = _best_of(single, html, args.repeat)
+        print(
+            f"{n:>9} {len(html) / 1e6:>8.2f} {t_legacy * 1000:>10.2f} {t_single * 1000:>10.2f} "
+            f"{t_legacy / t_single:>7.1f}x  {'yes' if same else 'NO'}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,472 @@
+#!/usr/bin/env python3
+# bulk_loader.py
+# --------------
+# COPY-based loader for large historical imports (tens of thousands of
+# Hovn bookings). Batched INSERTs still pay a bind-parameter round trip
+# per statement against the Neon pooler; here the normalized bundles are
+# streamed into temp staging tables with psycopg2 COPY FROM STDIN and then
+# merged into the real tables with one set-based statement each:
+#
+#   stg_bookings       one row per bundle (student + session + order + booking)
+#   stg_certs          one row per ARC cert, keyed by hovn_student_id
+#   stg_cert_students  students whose certs were checked (even if none)
+#
+#   agencies -> courses, locations, instructors -> students -> sessions
+#   -> orders -> bookings -> certificates
+#
+# Everything runs in one transaction and the staging tables are
+# ON COMMIT DROP, so this is safe behind pgbouncer's transaction pooling.
+# Later duplicates of the same student/session/order/ref win, the same as
+# persisting the bundles one after another.
+#
+# Usage:
+#   python bulk_loader.py bundles.jsonl                     # normalize_full_bundle() output, one per line
+#   python bulk_loader.py scraped.jsonl --scraped           # scrape_booking_and_session() output
+#   python bulk_loader.py bundles.jsonl --certs certs.jsonl # {"hovn_student_id": ..., "certs": [...]}
+
+import argparse
+import csv
+import io
+import json
+import sys
+import time
+from datetime import date, datetime
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from cert_store import cert_row
+
+# (column, SQL type) per staging table, in COPY order
+STAGING_BOOKINGS = (
+    ("seq", "integer"),
+    ("booking_ref", "text"),
+    ("hovn_student_id", "text"),
+    ("first_name", "text"),
+    ("last_name", "text"),
+    ("email", "text"),
+    ("phone_e164", "text"),
+    ("phone_raw", "text"),
+    ("hovn_session_id", "text"),
+    ("course_name", "text"),
+    ("format", "text"),
+    ("agency", "text"),
+    ("start_utc", "timestamptz"),
+    ("start_local", "timestamptz"),
+    ("session_url", "text"),
+    ("location_name", "text"),
+    ("location_street", "text"),
+    ("location_city", "text"),
+    ("location_state", "text"),
+    ("location_zip", "text"),
+    ("instructor_name", "text"),
+    ("hovn_order_id", "text"),
+    ("order_number", "text"),
+    ("stripe_order_number", "text"),
+    ("amount_cents", "integer"),
+    ("order_status", "text"),
+    ("ordered_at_utc", "timestamptz"),
+    ("ordered_at_local", "timestamptz"),
+)
+
+STAGING_CERTS = (
+    ("seq", "integer"),
+    ("hovn_student_id", "text"),
+    ("cert_id", "text"),
+    ("course_name", "text"),
+    ("course_code", "text"),
+    ("format", "text"),
+    ("issuer_org", "text"),
+    ("instructor_name", "text"),
+    ("issue_date", "date"),
+    ("expiry_date", "date"),
+)
+
+STAGING_CERT_STUDENTS = (("hovn_student_id", "text"),)
+
+_NULL = r"\N"
+
+
+# ------------------------------------------------------
+# STAGING ROWS
+# ------------------------------------------------------
+
+def booking_rows(bundles: Iterable[Dict[str, Any]], skipped: List[Any]) -> Iterator[Tuple]:
+    """normalize_full_bundle() dicts -> stg_bookings tuples. Bundles missing an id go to `skipped`."""
+    for seq, data in enumerate(bundles):
+        stu, sess, order = data.get("student") or {}, data.get("session") or {}, data.get("order") or {}
+        if not (stu.get("student_id") and sess.get("session_id") and order.get("order_id") and data.get("booking_ref")):
+            skipped.append(data.get("booking_ref"))
+            continue
+        yield (
+            seq,
+            data["booking_ref"],
+            stu["student_id"],
+            stu.get("first_name"),
+            stu.get("last_name"),
+            stu.get("email"),
+            stu.get("phone_e164"),
+            stu.get("phone_raw"),
+            sess["session_id"],
+            sess.get("course_name"),
+            sess.get("format"),
+            sess.get("agency"),
+            sess.get("start_utc"),
+            sess.get("start_central"),
+            sess.get("session_url"),
+            sess.get("location_name"),
+            sess.get("location_street"),
+            sess.get("location_city"),
+            sess.get("location_state"),
+            sess.get("location_zip"),
+            sess.get("instructor_name"),
+            order["order_id"],
+            order.get("order_number"),
+            order.get("stripe_order_number"),
+            order.get("total_cents"),
+            order.get("status"),
+            order.get("order_datetime_utc"),
+            order.get("order_datetime_central"),
+        )
+
+
+def cert_rows(certs_by_student: Dict[str, Iterable[Dict[str, Any]]]) -> Iterator[Tuple]:
+    """{hovn_student_id: [ARC cert dicts]} -> stg_certs tuples (mapped like cert_store.cert_row)."""
+    seq = 0
+    for hovn_student_id, certs in certs_by_student.items():
+        for c in certs or []:
+            row = cert_row(0, c)
+            if not row:
+                continue
+            seq += 1
+            yield (
+                seq,
+                hovn_student_id,
+                row["cert_id"],
+                row["course_name"],
+                row["course_code"],
+                row["format"],
+                row["issuer_org"],
+                row["instructor_name"],
+                row["issue_date"],
+                row["expiry_date"],
+            )
+
+
+def _csv_value(v: Any) -> Any:
+    if v is None:
+        return _NULL
+    if isinstance(v, (datetime, date)):
+        return v.isoformat()
+    return v
+
+
+class _CsvStream:
+    """File-like object that renders rows as CSV on demand, for copy_expert."""
+
+    def __init__(self, rows: Iterable[Tuple]):
+        self._rows = iter(rows)
+        self._buf = io.StringIO()
+        self._writer = csv.writer(self._buf, lineterminator="\n")
+        self._pending = ""
+        self.rows = 0
+
+    def read(self, size: int = -1) -> str:
+        while size < 0 or len(self._pending) < size:
+            row = next(self._rows, None)
+            if row is None:
+                break
+            self._writer.writerow([_csv_value(v) for v in row])
+            self.rows += 1
+            if self._buf.tell() >= 65536:
+                self._pending += self._buf.getvalue()
+                self._buf.seek(0)
+                self._buf.truncate()
+        self._pending += self._buf.getvalue()
+        self._buf.seek(0)
+        self._buf.truncate()
+
+        if size < 0:
+            out, self._pending = self._pending, ""
+        else:
+            out, self._pending = self._pending[:size], self._pending[size:]
+        return out
+
+
+# ------------------------------------------------------
+# MERGE SQL
+# ------------------------------------------------------
+
+# (label, statement) in FK order; each is one round trip
+MERGE_STATEMENTS = (
+    ("agencies", """
+        INSERT INTO agencies (name, created_at, updated_at)
+        SELECT DISTINCT agency, now(), now() FROM stg_bookings WHERE agency IS NOT NULL
+        ON CONFLICT (name) DO NOTHING
+    """),
+    # uq_course_name_format_agency / uq_location contain NULLable columns,
+    # which ON CONFLICT never matches; NOT EXISTS with IS NOT DISTINCT FROM does
+    ("courses", """
+        INSERT INTO courses (name, format, agency_id, created_at, updated_at)
+        SELECT DISTINCT s.course_name, s.format, a.id, now(), now()
+        FROM stg_bookings s LEFT JOIN agencies a ON a.name = s.agency
+        WHERE s.course_name IS NOT NULL
+          AND NOT EXISTS (
+              SELECT 1 FROM courses c
+              WHERE c.name = s.course_name
+                AND c.format IS NOT DISTINCT FROM s.format
+                AND c.agency_id IS NOT DISTINCT FROM a.id
+          )
+        ON CONFLICT DO NOTHING
+    """),
+    ("locations", """
+        INSERT INTO locations (name, address_line1, city, state, postal_code, country_code, created_at, updated_at)
+        SELECT DISTINCT s.location_name, s.location_street, s.location_city, s.location_state, s.location_zip, 'US', now(), now()
+        FROM stg_bookings s
+        WHERE s.location_name IS NOT NULL
+          AND NOT EXISTS (
+              SELECT 1 FROM locations l
+              WHERE l.name = s.location_name
+                AND l.address_line1 IS NOT DISTINCT FROM s.location_street
+                AND l.city IS NOT DISTINCT FROM s.location_city
+                AND l.state IS NOT DISTINCT FROM s.location_state
+                AND l.postal_code IS NOT DISTINCT FROM s.location_zip
+          )
+        ON CONFLICT DO NOTHING
+    """),
+    ("instructors", """
+        INSERT INTO instructors (full_name, first_name, last_name, created_at, updated_at)
+        SELECT DISTINCT s.instructor_name,
+               split_part(s.instructor_name, ' ', 1),
+               CASE WHEN position(' ' IN s.instructor_name) > 0
+                    THEN substring(s.instructor_name FROM position(' ' IN s.instructor_name) + 1) END,
+               now(), now()
+        FROM stg_bookings s
+        WHERE s.instructor_name IS NOT NULL
+          AND NOT EXISTS (SELECT 1 FROM instructors i WHERE i.full_name = s.instructor_name)
+    """),
+    ("students", """
+        INSERT INTO students (hovn_student_id, first_name, last_name, email, phone_e164, phone_raw, created_at, updated_at)
+        SELECT DISTINCT ON (hovn_student_id)
+               hovn_student_id, first_name, last_name, email, phone_e164, phone_raw, now(), now()
+        FROM stg_bookings
+        ORDER BY hovn_student_id, seq DESC
+        ON CONFLICT (hovn_student_id) DO UPDATE SET
+            first_name = EXCLUDED.first_name,
+            last_name = EXCLUDED.last_name,
+            email = EXCLUDED.email,
+            phone_e164 = EXCLUDED.phone_e164,
+            phone_raw = EXCLUDED.phone_raw,
+            updated_at = now()
+    """),
+    ("sessions", """
+        INSERT INTO sessions (hovn_session_id, course_id, agency_id, location_id, instructor_id,
+                              start_utc, start_local, format, hovn_session_url, created_at, updated_at)
+        SELECT DISTINCT ON (s.hovn_session_id)
+               s.hovn_session_id,
+               (SELECT min(c.id) FROM courses c
+                 WHERE c.name = s.course_name AND c.format IS NOT DISTINCT FROM s.format
+                   AND c.agency_id IS NOT DISTINCT FROM a.id),
+               a.id,
+               (SELECT min(l.id) FROM locations l
+                 WHERE l.name = s.location_name
+                   AND l.address_line1 IS NOT DISTINCT FROM s.location_street
+                   AND l.city IS NOT DISTINCT FROM s.location_city
+                   AND l.state IS NOT DISTINCT FROM s.location_state
+                   AND l.postal_code IS NOT DISTINCT FROM s.location_zip),
+               (SELECT min(i.id) FROM instructors i WHERE i.full_name = s.instructor_name),
+               s.start_utc, s.start_local, s.format, s.session_url, now(), now()
+        FROM stg_bookings s LEFT JOIN agencies a ON a.name = s.agency
+        ORDER BY s.hovn_session_id, s.seq DESC
+        ON CONFLICT (hovn_session_id) DO UPDATE SET
+            course_id = EXCLUDED.course_id,
+            agency_id = EXCLUDED.agency_id,
+            location_id = EXCLUDED.location_id,
+            instructor_id = EXCLUDED.instructor_id,
+            start_utc = EXCLUDED.start_utc,
+            start_local = EXCLUDED.start_local,
+            format = EXCLUDED.format,
+            hovn_session_url = EXCLUDED.hovn_session_url,
+            updated_at = now()
+    """),
+    ("orders", """
+        INSERT INTO orders (hovn_order_id, hovn_order_number, stripe_order_number, student_id, amount_cents,
+                            currency_code, status, ordered_at_utc, ordered_at_local, created_at, updated_at)
+        SELECT DISTINCT ON (s.hovn_order_id)
+               s.hovn_order_id, s.order_number, s.stripe_order_number, st.id, s.amount_cents,
+               'USD', s.order_status, s.ordered_at_utc, s.ordered_at_local, now(), now()
+        FROM stg_bookings s JOIN students st ON st.hovn_student_id = s.hovn_student_id
+        ORDER BY s.hovn_order_id, s.seq DESC
+        ON CONFLICT (hovn_order_id) DO UPDATE SET
+            hovn_order_number = EXCLUDED.hovn_order_number,
+            stripe_order_number = EXCLUDED.stripe_order_number,
+            student_id = EXCLUDED.student_id,
+            amount_cents = EXCLUDED.amount_cents,
+            currency_code = EXCLUDED.currency_code,
+            status = EXCLUDED.status,
+            ordered_at_utc = EXCLUDED.ordered_at_utc,
+            ordered_at_local = EXCLUDED.ordered_at_local,
+            updated_at = now()
+    """),
+    ("bookings", """
+        INSERT INTO bookings (hovn_booking_ref, student_id, session_id, order_id, status,
+                              is_online_component_completed, created_at, updated_at)
+        SELECT DISTINCT ON (s.booking_ref)
+               s.booking_ref, st.id, se.id, o.id, 'active', false, now(), now()
+        FROM stg_bookings s
+        JOIN students st ON st.hovn_student_id = s.hovn_student_id
+        JOIN sessions se ON se.hovn_session_id = s.hovn_session_id
+        JOIN orders o ON o.hovn_order_id = s.hovn_order_id
+        ORDER BY s.booking_ref, s.seq DESC
+        ON CONFLICT (hovn_booking_ref) DO UPDATE SET
+            student_id = EXCLUDED.student_id,
+            session_id = EXCLUDED.session_id,
+            order_id = EXCLUDED.order_id,
+            status = EXCLUDED.status,
+            updated_at = now()
+    """),
+    # Same write guard as cert_store.sync_certs: unchanged rows aren't touched,
+    # and a cert keeps the student it was first stored under
+    ("certificates", """
+        INSERT INTO certificates (cert_id, student_id, course_name, course_code, format, issuer_org,
+                                  instructor_name, issue_date, expiry_date, added_at)
+        SELECT DISTINCT ON (c.cert_id)
+               c.cert_id, st.id, c.course_name, c.course_code, c.format, c.issuer_org,
+               c.instructor_name, c.issue_date, c.expiry_date, now()
+        FROM stg_certs c JOIN students st ON st.hovn_student_id = c.hovn_student_id
+        ORDER BY c.cert_id, c.seq DESC
+        ON CONFLICT (cert_id) DO UPDATE SET
+            course_name = EXCLUDED.course_name,
+            course_code = EXCLUDED.course_code,
+            format = EXCLUDED.format,
+            issuer_org = EXCLUDED.issuer_org,
+            instructor_name = EXCLUDED.instructor_name,
+            issue_date = EXCLUDED.issue_date,
+            expiry_date = EXCLUDED.expiry_date
+        WHERE (certificates.course_name, certificates.course_code, certificates.format, certificates.issuer_org,
+               certificates.instructor_name, certificates.issue_date, certificates.expiry_date)
+              IS DISTINCT FROM
+              (EXCLUDED.course_name, EXCLUDED.course_code, EXCLUDED.format, EXCLUDED.issuer_org,
+               EXCLUDED.instructor_name, EXCLUDED.issue_date, EXCLUDED.expiry_date)
+    """),
+    ("certs_checked", """
+        UPDATE students st SET certs_checked_at = now()
+        FROM (SELECT DISTINCT hovn_student_id FROM stg_cert_students) c
+        WHERE st.hovn_student_id = c.hovn_student_id
+    """),
+)
+
+
+def _create_staging(cur, name: str, columns) -> None:
+    cols = ", ".join(f"{c} {t}" for c, t in columns)
+    cur.execute(f"CREATE TEMP TABLE {name} ({cols}) ON COMMIT DROP")
+
+
+def _copy(cur, name: str, columns, rows: Iterable[Tuple]) -> int:
+    stream = _CsvStream(rows)
+    cols = ", ".join(c for c, _ in columns)
+    cur.copy_expert(f"COPY {name} ({cols}) FROM STDIN WITH (FORMAT csv, NULL '{_NULL}')", stream)
+    return stream.rows
+
+
+# ------------------------------------------------------
+# LOAD
+# ------------------------------------------------------
+
+def bulk_load(
+    bundles: Iterable[Dict[str, Any]],
+    certs_by_student: Optional[Dict[str, Iterable[Dict[str, Any]]]] = None,
+    engine=None,
+) -> Dict[str, Any]:
+    """
+    COPY normalized bundles (and optional {hovn_student_id: [ARC certs]})
+    into staging and merge everything in one transaction. Returns per-table
+    affected row counts, timings and rows/sec.
+    """
+    if engine is None:
+        from db_pipeline import engine
+
+    certs_by_student = certs_by_student or {}
+    skipped: List[Any] = []
+    stats: Dict[str, Any] = {"merged": {}}
+
+    t0 = time.perf_counter()
+    conn = engine.raw_connection()
+    try:
+        cur = conn.cursor()
+        _create_staging(cur, "stg_bookings", STAGING_BOOKINGS)
+        _create_staging(cur, "stg_certs", STAGING_CERTS)
+        _create_staging(cur, "stg_cert_students", STAGING_CERT_STUDENTS)
+
+        staged = _copy(cur, "stg_bookings", STAGING_BOOKINGS, booking_rows(bundles, skipped))
+        staged_certs = _copy(cur, "stg_certs", STAGING_CERTS, cert_rows(certs_by_student))
+        _copy(cur, "stg_cert_students", STAGING_CERT_STUDENTS, ((sid,) for sid in certs_by_student))
+        cur.execute("ANALYZE stg_bookings")
+        t_copy = time.perf_counter()
+
+        for label, sql in MERGE_STATEMENTS:
+            cur.execute(sql)
+            stats["merged"][label] = cur.rowcount
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        conn.close()
+    t_end = time.perf_counter()
+
+    total = t_end - t0
+    stats.update({
+        "staged_bookings": staged,
+        "staged_certs": staged_certs,
+        "skipped": skipped,
+        "copy_seconds": round(t_copy - t0, 3),
+        "merge_seconds": round(t_end - t_copy, 3),
+        "total_seconds": round(total, 3),
+        "rows_per_sec": round((staged + staged_certs) / total, 1) if total > 0 else 0.0,
+    })
+    print(
+        f"[BULK] {staged} bookings + {staged_certs} certs in {total:.2f}s "
+        f"(copy {t_copy - t0:.2f}s, merge {t_end - t_copy:.2f}s) — {stats['rows_per_sec']:.0f} rows/sec"
+        + (f", {len(skipped)} skipped" if skipped else "")
+    )
+    return stats
+
+
+# ------------------------------------------------------
+# CLI
+# ------------------------------------------------------
+
+def _read_jsonl(path: str) -> Iterator[Dict[str, Any]]:
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if line:
+                yield json.loads(line)
+
+
+def main():
+    ap = argparse.ArgumentParser(description="COPY-based bulk import of normalized Hovn bundles.")
+    ap.add_argument("bundles", help="JSONL file, one bundle per line")
+    ap.add_argument("--scraped", action="store_true", help="lines are raw scraper bundles; normalize them first")
+    ap.add_argument("--certs", help='JSONL of {"hovn_student_id": ..., "certs": [...]}')
+    args = ap.parse_args()
+
+    bundles: Iterable[Dict[str, Any]] = _read_jsonl(args.bundles)
+    if args.scraped:
+        from normalize import normalize_full_bundle
+
+        bundles = (normalize_full_bundle(b) for b in bundles)
+
+    certs = None
+    if args.certs:
+        certs = {str(r["hovn_student_id"]): r.get("certs") or [] for r in _read_jsonl(args.certs)}
+
+    try:
+        stats = bulk_load(bundles, certs)
+    except Exception as e:
+        print("[BULK] Error:", e)
+        sys.exit(1)
+    print(json.dumps({k: v for k, v in stats.items() if k != "skipped"}, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,140 @@
+# cert_cache.py
+# -------------
+# In-process TTL + negative cache in front of redcross.scrape_certs_for_email.
+#
+# - Positive results (at least one cert) live for ARC_CACHE_TTL seconds.
+# - Empty results ("no certs on ARC") live for ARC_CACHE_NEGATIVE_TTL seconds.
+# - Errors are never cached.
+# - Entries are evicted least-recently-used once ARC_CACHE_MAX_ENTRIES is hit.
+#
+# Each gunicorn worker holds its own cache.
+
+import copy
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, List
+
+from redcross import scrape_certs_for_email
+
+ARC_CACHE_TTL = float(os.getenv("ARC_CACHE_TTL", "900"))
+ARC_CACHE_NEGATIVE_TTL = float(os.getenv("ARC_CACHE_NEGATIVE_TTL", "120"))
+ARC_CACHE_MAX_ENTRIES = int(os.getenv("ARC_CACHE_MAX_ENTRIES", "2048"))
+
+
+class TTLCache:
+    """
+    Thread-safe LRU cache with separate TTLs for positive and
+    negative (empty) values, plus hit/miss counters.
+    """
+
+    def __init__(self, max_entries: int, ttl: float, negative_ttl: float):
+        self.max_entries = max(1, max_entries)
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+
+        self._data: "OrderedDict[str, tuple[float, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.negative_hits = 0
+        self.misses = 0
+        self.expired = 0
+        self.evictions = 0
+        self.bypasses = 0
+
+    def get(self, key: str):
+        """Return (found, value). Expired entries count as a miss."""
+        now = time.monotonic()
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                self.misses += 1
+                return False, None
+
+            expires_at, value = entry
+            if expires_at <= now:
+                del self._data[key]
+                self.expired += 1
+                self.misses += 1
+                return False, None
+
+            self._data.move_to_end(key)
+            self.hits += 1
+            if not value:
+                self.negative_hits += 1
+            return True, value
+
+    def set(self, key: str, value: Any) -> None:
+        ttl = self.ttl if value else self.negative_ttl
+        if ttl <= 0:
+            return
+
+        with self._lock:
+            self._data[key] = (time.monotonic() + ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def record_bypass(self) -> None:
+        with self._lock:
+            self.bypasses += 1
+
+    def invalidate(self, key: str) -> None:
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._data),
+                "max_entries": self.max_entries,
+                "ttl_seconds": self.ttl,
+                "negative_ttl_seconds": self.negative_ttl,
+                "hits": self.hits,
+                "negative_hits": self.negative_hits,
+                "misses": self.misses,
+                "expired": self.expired,
+                "evictions": self.evictions,
+                "bypasses": self.bypasses,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            }
+
+
+arc_cache = TTLCache(
+    max_entries=ARC_CACHE_MAX_ENTRIES,
+    ttl=ARC_CACHE_TTL,
+    negative_ttl=ARC_CACHE_NEGATIVE_TTL,
+)
+
+
+def _cache_key(email: str) -> str:
+    return (email or "").strip().lower()
+
+
+def cached_scrape_certs_for_email(email: str, refresh: bool = False) -> List[Dict[str, Any]]:
+    """
+    scrape_certs_for_email with a TTL cache in front.
+
+    refresh=True skips the cache read (the "refresh now" button) but
+    still stores the fresh result for the next caller.
+    """
+    key = _cache_key(email)
+
+    if refresh:
+        arc_cache.record_bypass()
+    else:
+        found, value = arc_cache.get(key)
+        if found:
+            return copy.deepcopy(value)
+
+    certs = scrape_certs_for_email(key) or []
+    arc_cache.set(key, copy.deepcopy(certs))
+    return certs
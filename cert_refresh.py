@@ -0,0 +1,334 @@
+#!/usr/bin/env python3
+# cert_refresh.py
+# ---------------
+# Background refresh of ARC certs so lookup_certs() doesn't serve the
+# same DB rows forever after a student renews.
+#
+# Each tick picks the students most due for a re-check, in this order:
+#   0) "hot" students — a cert expiring within CERT_REFRESH_EXPIRY_WINDOW_DAYS
+#      (or expired within CERT_REFRESH_EXPIRED_GRACE_DAYS, i.e. likely renewing)
+#      or a booking whose session starts within CERT_REFRESH_SESSION_WINDOW_DAYS —
+#      not checked in the last CERT_REFRESH_HOT_MAX_AGE_HOURS
+#   1) students never checked (certs_checked_at IS NULL)
+#   2) everyone else not checked in CERT_REFRESH_MAX_AGE_DAYS
+# and refreshes them through the shared ARC transport (rate limited) in
+# batches of CERT_REFRESH_BATCH.
+#
+# Usage:
+#   python cert_refresh.py --once               # one batch, then exit
+#   python cert_refresh.py --once --limit 500
+#   python cert_refresh.py --dry-run            # print who is due
+#
+# In the API process the scheduler thread starts on app startup when
+# CERT_REFRESH_ENABLED=1. Only one worker runs a tick at a time
+# (transaction advisory lock), so running 4 gunicorn workers is fine.
+#
+# lookup_certs() also uses cert_freshness() / revalidate_student_certs()
+# here for stale-while-revalidate: DB rows older than CERT_FRESH_TTL are
+# still served immediately, with a one-student refresh queued behind them.
+
+import argparse
+import os
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List
+
+from sqlalchemy import and_, case, exists, or_, select
+from sqlalchemy.orm import Session
+
+from db import SessionLocal
+from models import Booking, Certificate, Student
+from models import Session as HovnSession
+from redcross import scrape_certs_for_emails
+from cert_cache import arc_cache, cached_scrape_certs_for_email
+from cert_store import CertUpsertBuffer, sync_certs
+from singleflight import (
+    coalesce,
+    email_key,
+    pg_try_advisory_xact_lock,
+    ARC_REVALIDATE_LOCK_NAMESPACE,
+    SCHEDULER_LOCK_NAMESPACE,
+)
+
+CERT_REFRESH_ENABLED = os.getenv("CERT_REFRESH_ENABLED", "").lower() in ("1", "true", "yes")
+CERT_REFRESH_INTERVAL = float(os.getenv("CERT_REFRESH_INTERVAL", "300"))        # seconds between ticks
+CERT_REFRESH_BATCH = int(os.getenv("CERT_REFRESH_BATCH", "100"))                # students per tick
+CERT_REFRESH_CONCURRENCY = int(os.getenv("CERT_REFRESH_CONCURRENCY", "2"))      # leave ARC headroom for interactive lookups
+
+CERT_REFRESH_EXPIRY_WINDOW_DAYS = int(os.getenv("CERT_REFRESH_EXPIRY_WINDOW_DAYS", "60"))
+CERT_REFRESH_EXPIRED_GRACE_DAYS = int(os.getenv("CERT_REFRESH_EXPIRED_GRACE_DAYS", "30"))
+CERT_REFRESH_SESSION_WINDOW_DAYS = int(os.getenv("CERT_REFRESH_SESSION_WINDOW_DAYS", "14"))
+CERT_REFRESH_HOT_MAX_AGE_HOURS = float(os.getenv("CERT_REFRESH_HOT_MAX_AGE_HOURS", "24"))
+CERT_REFRESH_MAX_AGE_DAYS = float(os.getenv("CERT_REFRESH_MAX_AGE_DAYS", "30"))
+
+# lookup_certs serves DB rows checked within this many seconds without a re-check
+CERT_FRESH_TTL = float(os.getenv("CERT_FRESH_TTL", "86400"))
+
+SCHEDULER_LOCK_KEY = "cert_refresh"
+
+
+# ------------------------------------------------------
+# FRESHNESS (stale-while-revalidate for lookup_certs)
+# ------------------------------------------------------
+
+def cert_freshness(checked_at: datetime | None) -> tuple[str, float | None]:
+    """("fresh" | "stale" | "unknown", age in seconds) for a certs_checked_at value."""
+    if checked_at is None:
+        return "unknown", None
+    if checked_at.tzinfo is None:
+        checked_at = checked_at.replace(tzinfo=timezone.utc)
+    age = max(0.0, (datetime.now(timezone.utc) - checked_at).total_seconds())
+    return ("fresh" if age <= CERT_FRESH_TTL else "stale"), age
+
+
+def revalidate_student_certs(student_id: int, email: str) -> None:
+    """
+    Background re-check of one student's certs. Skips the scrape if the
+    student became fresh since the request was served (another request,
+    worker or the scheduler got there first).
+    """
+    db = SessionLocal()
+
+    def still_fresh():
+        checked = db.execute(
+            select(Student.certs_checked_at).where(Student.id == student_id)
+        ).scalar()
+        return cert_freshness(checked)[0] == "fresh"
+
+    def fetch():
+        certs = cached_scrape_certs_for_email(email)
+        diff = sync_certs(db, {student_id: certs}).get(student_id)
+        db.commit()
+        if diff is not None and diff.has_changes:
+            print(f"[CERT_REFRESH] revalidated {email}: {diff.summary()}")
+        return True
+
+    def recheck():
+        return True if still_fresh() else None
+
+    try:
+        if still_fresh():
+            return
+        coalesce(ARC_REVALIDATE_LOCK_NAMESPACE, email_key(email), fetch, recheck)
+    except Exception as e:
+        db.rollback()
+        print(f"[CERT_REFRESH] revalidate failed for {email}: {e}")
+    finally:
+        db.close()
+
+
+# ------------------------------------------------------
+# PICKING
+# ------------------------------------------------------
+
+def pick_due_students(db: Session, limit: int = CERT_REFRESH_BATCH) -> List[Any]:
+    """
+    Students due for an ARC re-check, most urgent first, as
+    (id, email, certs_checked_at) rows — plain rows rather than ORM objects
+    so nothing needs reloading after the batch commits.
+    """
+    now = datetime.now(timezone.utc)
+    today = now.date()
+    checked = Student.certs_checked_at
+
+    expiring = exists().where(
+        Certificate.student_id == Student.id,
+        Certificate.expiry_date.between(
+            today - timedelta(days=CERT_REFRESH_EXPIRED_GRACE_DAYS),
+            today + timedelta(days=CERT_REFRESH_EXPIRY_WINDOW_DAYS),
+        ),
+    )
+    upcoming = exists().where(
+        Booking.student_id == Student.id,
+        Booking.session_id == HovnSession.id,
+        HovnSession.start_utc.between(now, now + timedelta(days=CERT_REFRESH_SESSION_WINDOW_DAYS)),
+    )
+
+    hot = and_(
+        or_(expiring, upcoming),
+        or_(checked.is_(None), checked < now - timedelta(hours=CERT_REFRESH_HOT_MAX_AGE_HOURS)),
+    )
+    never = checked.is_(None)
+    stale = checked < now - timedelta(days=CERT_REFRESH_MAX_AGE_DAYS)
+
+    priority = case((hot, 0), (never, 1), else_=2)
+
+    stmt = (
+        select(Student.id, Student.email, Student.certs_checked_at)
+        .where(Student.email.is_not(None), Student.email != "", or_(hot, never, stale))
+        .order_by(priority, checked.asc().nulls_first(), Student.id)
+        .limit(limit)
+    )
+    return list(db.execute(stmt))
+
+
+# ------------------------------------------------------
+# REFRESHING
+# ------------------------------------------------------
+
+def refresh_due_students(
+    db: Session,
+    limit: int = CERT_REFRESH_BATCH,
+    concurrency: int = CERT_REFRESH_CONCURRENCY,
+) -> Dict[str, Any]:
+    """
+    Re-scrape ARC for one batch of due students and store the results.
+    Students whose lookup failed keep their old certs_checked_at so they
+    are picked again next tick.
+    """
+    started = time.perf_counter()
+    due = pick_due_students(db, limit=limit)
+
+    by_email: Dict[str, List[Any]] = {}
+    for s in due:
+        by_email.setdefault(s.email.strip().lower(), []).append(s)
+
+    changed: Dict[str, Any] = {}
+    errors: Dict[str, str] = {}
+
+    def on_flush(student, diff):
+        if diff.has_changes:
+            changed[student.email] = diff.summary()
+
+    with CertUpsertBuffer(db, on_flush=on_flush) as buffer:
+        for email, certs, err in scrape_certs_for_emails(list(by_email), concurrency=concurrency):
+            if err is not None:
+                errors[email] = str(err)
+                continue
+            arc_cache.set(email, certs)
+            for student in by_email.get(email, []):
+                # Empty lists still go in so the student is stamped as checked
+                buffer.add(student, certs)
+
+    return {
+        "picked": len(due),
+        "refreshed": buffer.students_written,
+        "certs_written": buffer.certs_written,
+        "certs_unchanged": buffer.certs_unchanged,
+        "changed": changed,
+        "errors": errors,
+        "seconds": round(time.perf_counter() - started, 2),
+    }
+
+
+def run_tick(limit: int = CERT_REFRESH_BATCH, concurrency: int = CERT_REFRESH_CONCURRENCY) -> Dict[str, Any] | None:
+    """One scheduler tick. Returns None if another worker holds the scheduler lock."""
+    with pg_try_advisory_xact_lock(SCHEDULER_LOCK_NAMESPACE, SCHEDULER_LOCK_KEY) as leader:
+        if not leader:
+            return None
+        db = SessionLocal()
+        try:
+            return refresh_due_students(db, limit=limit, concurrency=concurrency)
+        finally:
+            db.close()
+
+
+# ------------------------------------------------------
+# SCHEDULER THREAD
+# ------------------------------------------------------
+
+class CertRefreshScheduler:
+    def __init__(
+        self,
+        interval: float = CERT_REFRESH_INTERVAL,
+        limit: int = CERT_REFRESH_BATCH,
+        concurrency: int = CERT_REFRESH_CONCURRENCY,
+    ):
+        self.interval = interval
+        self.limit = limit
+        self.concurrency = concurrency
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+        self.last_result: Dict[str, Any] | None = None
+        self.last_run_at: datetime | None = None
+
+    def start(self) -> None:
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="cert-refresh", daemon=True)
+        self._thread.start()
+        print(f"[CERT_REFRESH] scheduler started (every {self.interval:.0f}s, batch {self.limit})")
+
+    def stop(self, timeout: float = 5.0) -> None:
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout)
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            try:
+                result = run_tick(limit=self.limit, concurrency=self.concurrency)
+                if result is not None:
+                    self.last_result = result
+                    self.last_run_at = datetime.now(timezone.utc)
+                    print(
+                        f"[CERT_REFRESH] refreshed {result['refreshed']}/{result['picked']} students, "
+                        f"{result['certs_written']} certs written, {len(result['errors'])} errors "
+                        f"in {result['seconds']}s"
+                    )
+            except Exception as e:
+                print(f"[CERT_REFRESH] tick failed: {e}")
+            self._stop.wait(self.interval)
+
+    def status(self) -> Dict[str, Any]:
+        return {
+            "running": bool(self._thread and self._thread.is_alive()),
+            "interval": self.interval,
+            "batch": self.limit,
+            "last_run_at": self.last_run_at.isoformat() if self.last_run_at else None,
+            "last_result": self.last_result,
+        }
+
+
+scheduler = CertRefreshScheduler()
+
+
+# ------------------------------------------------------
+# CLI
+# ------------------------------------------------------
+
+def main():
+    ap = argparse.ArgumentParser(description="Refresh ARC certs for students that are due.")
+    ap.add_argument("--once", action="store_true", help="run one batch and exit")
+    ap.add_argument("--dry-run", action="store_true", help="list due students without scraping")
+    ap.add_argument("--limit", type=int, default=CERT_REFRESH_BATCH)
+    ap.add_argument("--concurrency", type=int, default=CERT_REFRESH_CONCURRENCY)
+    args = ap.parse_args()
+
+    if args.dry_run:
+        db = SessionLocal()
+        try:
+            for s in pick_due_students(db, limit=args.limit):
+                print(f"{s.id:>7}  {s.email:<40}  last checked: {s.certs_checked_at or 'never'}")
+        finally:
+            db.close()
+        return
+
+    if args.once:
+        db = SessionLocal()
+        try:
+            result = refresh_due_students(db, limit=args.limit, concurrency=args.concurrency)
+        finally:
+            db.close()
+        print(
+            f"[CERT_REFRESH] refreshed {result['refreshed']}/{result['picked']} students, "
+            f"{result['certs_written']} written, {result['certs_unchanged']} unchanged, "
+            f"{len(result['errors'])} errors in {result['seconds']}s"
+        )
+        for email, summary in result["changed"].items():
+            print(f"  {email}: {summary}")
+        return
+
+    s = CertRefreshScheduler(limit=args.limit, concurrency=args.concurrency)
+    s.start()
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        s.stop()
+
+
+if __name__ == "__main__":
+    main()
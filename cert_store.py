@@ -0,0 +1,284 @@
+# cert_store.py
+# -------------
+# Set-based persistence for ARC certificates.
+#
+# sync_certs() writes certs for any number of students with one SELECT of
+# what is stored plus one INSERT ... ON CONFLICT (cert_id) DO UPDATE ...
+# RETURNING per chunk of rows, instead of a SELECT + ORM mutation per
+# cert followed by a re-query of the student's certs.
+#
+# Each row gets a content hash; rows whose hash matches what is already
+# stored are not written at all, and the caller gets a CertDiff of what
+# was added, changed and (no longer on ARC) removed. Only added/changed
+# count as has_changes; removed certs are kept and reported, not acted on.
+
+import hashlib
+import os
+from dataclasses import dataclass, field
+from datetime import date, datetime, timedelta
+from typing import Any, Callable, Dict, Iterable, List, Mapping, Optional
+
+from sqlalchemy import func, or_, select, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.orm import Session
+
+from models import Certificate, Student
+
+# Students per commit for migration tools (hovn_sync, hovn_sync_full, /api/migrate/bookings)
+CERT_COMMIT_CHUNK = int(os.getenv("CERT_COMMIT_CHUNK", "50"))
+
+# Rows per INSERT statement (keeps us well under Postgres' 65535 bind-param limit)
+CERT_ROWS_PER_STATEMENT = 1000
+
+SKILLS_SESSION_MARKER = "eligible for skills session within 90 days"
+
+# A cert keeps the student it was first stored under: re-scraping it for
+# another student updates its content, never its owner.
+_UPDATE_COLUMNS = (
+    "course_name",
+    "course_code",
+    "format",
+    "issuer_org",
+    "instructor_name",
+    "issue_date",
+    "expiry_date",
+)
+
+
+def parse_cert_date(x: str | date | None) -> date | None:
+    if not x:
+        return None
+    if isinstance(x, date):
+        return x
+    for fmt in ("%m/%d/%Y", "%b %d, %Y", "%b %d, %y"):
+        try:
+            return datetime.strptime(x.strip(), fmt).date()
+        except ValueError:
+            continue
+    return None
+
+
+def cert_row(student_id: int, c: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """Map one scraped ARC cert dict to a certificates row (None if it has no cert_id)."""
+    cert_id = c.get("cert_id")
+    if not cert_id:
+        return None
+
+    issue_date = parse_cert_date(c.get("issue_date"))
+    expiry_date = parse_cert_date(c.get("expiry_date"))
+
+    # Special rule: Skills Session eligible within 90 days
+    name_str = (c.get("course_name") or "").lower()
+    if SKILLS_SESSION_MARKER in name_str and issue_date:
+        expiry_date = issue_date + timedelta(days=90)
+
+    return {
+        "cert_id": cert_id,
+        "student_id": student_id,
+        "course_name": c.get("course_name"),
+        "course_code": c.get("course_code"),
+        "format": c.get("format"),
+        "issuer_org": c.get("issuer_org") or c.get("agency_org_name") or c.get("org_name"),
+        "instructor_name": c.get("instructor_name"),
+        "issue_date": issue_date,
+        "expiry_date": expiry_date,
+    }
+
+
+def cert_content_hash(row: Mapping[str, Any]) -> str:
+    """Stable hash of the columns a refresh can change (cert rows or DB rows)."""
+    parts = []
+    for col in _UPDATE_COLUMNS:
+        v = row.get(col)
+        parts.append("" if v is None else (v.isoformat() if isinstance(v, date) else str(v)))
+    return hashlib.sha1("\x1f".join(parts).encode("utf-8")).hexdigest()
+
+
+@dataclass
+class CertDiff:
+    current: List[Any] = field(default_factory=list)   # every stored cert for the student after the sync
+    added: List[Any] = field(default_factory=list)
+    changed: List[Any] = field(default_factory=list)   # rows as stored after the update
+    removed: List[Any] = field(default_factory=list)   # stored rows ARC no longer returned (kept in DB)
+    changed_fields: Dict[str, Dict[str, tuple]] = field(default_factory=dict)  # cert_id -> {col: (old, new)}
+    unchanged: int = 0
+
+    @property
+    def has_changes(self) -> bool:
+        # Not `removed`: those rows stay in the DB, so the same certs would
+        # show up as removed on every later sync too.
+        return bool(self.added or self.changed)
+
+    def summary(self) -> Dict[str, Any]:
+        return {
+            "added": [r.cert_id for r in self.added],
+            "changed": {cid: list(cols) for cid, cols in self.changed_fields.items()},
+            "removed": [r.cert_id for r in self.removed],
+            "unchanged": self.unchanged,
+        }
+
+
+def sync_certs(db: Session, certs_by_student: Dict[int, Iterable[Dict[str, Any]]]) -> Dict[int, CertDiff]:
+    """
+    Upsert scraped certs for many students, skipping rows whose content
+    hash matches what is stored, and stamp every student in the batch
+    with certs_checked_at = now() (even if ARC returned nothing).
+    Does not commit.
+
+    Returns {student_id: CertDiff}. Rows in the diff are DB rows with
+    attribute access (row.cert_id, row.course_name, ...). A cert already
+    stored under another student keeps that owner and is reported in
+    the owner's diff.
+    """
+    rows: Dict[str, Dict[str, Any]] = {}
+    for student_id, certs in certs_by_student.items():
+        for c in certs or []:
+            row = cert_row(student_id, c)
+            if row:
+                # ON CONFLICT can't touch the same cert twice in one statement
+                rows[row["cert_id"]] = row
+
+    diffs: Dict[int, CertDiff] = {sid: CertDiff() for sid in certs_by_student}
+    table = Certificate.__table__
+    student_ids = list(certs_by_student)
+
+    if not student_ids:
+        return diffs
+
+    # 1) What is stored now — for these students or for any incoming cert_id
+    stored = {
+        r.cert_id: r
+        for r in db.execute(
+            select(table).where(
+                or_(table.c.student_id.in_(student_ids), table.c.cert_id.in_(list(rows)))
+            )
+        )
+    }
+
+    # 2) Classify
+    to_write: List[Dict[str, Any]] = []
+    for cert_id, row in rows.items():
+        old = stored.get(cert_id)
+        if old is None:
+            to_write.append(row)
+            continue
+        owner = diffs.setdefault(old.student_id, CertDiff())
+        if cert_content_hash(row) != cert_content_hash(old._mapping):
+            to_write.append(row)
+            owner.changed_fields[cert_id] = {
+                col: (old._mapping[col], row[col])
+                for col in _UPDATE_COLUMNS
+                if old._mapping[col] != row[col]
+            }
+        else:
+            owner.unchanged += 1
+            owner.current.append(old)
+
+    for cert_id, old in stored.items():
+        if cert_id not in rows and old.student_id in certs_by_student:
+            diffs[old.student_id].removed.append(old)
+            diffs[old.student_id].current.append(old)
+
+    # 3) Write only new/changed rows. The WHERE guard keeps a concurrent
+    #    identical write from touching the row again.
+    for i in range(0, len(to_write), CERT_ROWS_PER_STATEMENT):
+        stmt = pg_insert(table).values(to_write[i:i + CERT_ROWS_PER_STATEMENT])
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[table.c.cert_id],
+            set_={col: stmt.excluded[col] for col in _UPDATE_COLUMNS},
+            where=or_(*[table.c[col].is_distinct_from(stmt.excluded[col]) for col in _UPDATE_COLUMNS]),
+        ).returning(table)
+
+        for r in db.execute(stmt):
+            diff = diffs.setdefault(r.student_id, CertDiff())
+            if r.cert_id in stored:
+                diff.changed.append(r)
+            else:
+                diff.added.append(r)
+            diff.current.append(r)
+
+    # 4) Record the check
+    mark_certs_checked(db, student_ids)
+
+    return diffs
+
+
+def mark_certs_checked(db: Session, student_ids: Iterable[int]) -> None:
+    """
+    Stamp certs_checked_at = now() for these students. updated_at is
+    pinned so a refresh that found nothing new doesn't look like a
+    profile edit. Does not commit.
+    """
+    ids = list(student_ids)
+    if not ids:
+        return
+    students = Student.__table__
+    db.execute(
+        update(students)
+        .where(students.c.id.in_(ids))
+        .values(certs_checked_at=func.now(), updated_at=students.c.updated_at)
+    )
+
+
+def upsert_certs(db: Session, certs_by_student: Dict[int, Iterable[Dict[str, Any]]]) -> Dict[int, List[Any]]:
+    """
+    sync_certs() for callers that only need the student's stored certs.
+    Does not commit. Returns {student_id: [row, ...]}.
+    """
+    return {sid: diff.current for sid, diff in sync_certs(db, certs_by_student).items()}
+
+
+class CertUpsertBuffer:
+    """
+    Collects scraped certs per student and writes them with sync_certs()
+    + one commit every `chunk_size` students.
+
+    on_flush(student, diff) is called for each student after its chunk
+    is committed (e.g. to send migration emails only when diff.has_changes).
+    """
+
+    def __init__(
+        self,
+        db: Session,
+        chunk_size: int = CERT_COMMIT_CHUNK,
+        on_flush: Optional[Callable[[Student, CertDiff], None]] = None,
+    ):
+        self.db = db
+        self.chunk_size = max(1, chunk_size)
+        self.on_flush = on_flush
+        self._pending: Dict[int, tuple[Student, List[Dict[str, Any]]]] = {}
+        self.students_written = 0
+        self.certs_written = 0
+        self.certs_unchanged = 0
+
+    def add(self, student: Student, certs: List[Dict[str, Any]]) -> None:
+        self._pending[student.id] = (student, certs)
+        if len(self._pending) >= self.chunk_size:
+            self.flush()
+
+    def flush(self) -> None:
+        if not self._pending:
+            return
+
+        pending, self._pending = self._pending, {}
+        try:
+            diffs = sync_certs(self.db, {sid: certs for sid, (_, certs) in pending.items()})
+            self.db.commit()
+        except Exception:
+            self.db.rollback()
+            raise
+
+        for sid, (student, _) in pending.items():
+            diff = diffs.get(sid) or CertDiff()
+            self.students_written += 1
+            self.certs_written += len(diff.added) + len(diff.changed)
+            self.certs_unchanged += diff.unchanged
+            if self.on_flush:
+                self.on_flush(student, diff)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.flush()
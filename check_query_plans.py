@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+# check_query_plans.py
+# --------------------
+# Usage:
+#   python check_query_plans.py                      # DATABASE_URL, after `alembic upgrade head`
+#   python check_query_plans.py --database-url postgresql://... --verbose
+#   python check_query_plans.py --real-costs         # don't disable seq scans
+#
+# Query-plan regression check: runs EXPLAIN (FORMAT JSON) on the hot
+# queries (cert lookup by email, batch email match, certs per student,
+# cert refresh's "due" scan, roster / order joins) and fails if a plan
+# doesn't use the index it is expected to.
+#
+# On a small or empty database Postgres rightly prefers a seq scan, so by
+# default each EXPLAIN runs with enable_seqscan = off: the check proves the
+# index is usable for the query shape, not that it wins on today's row
+# counts. Nothing is executed except EXPLAIN; every statement is rolled back.
+
+import argparse
+import json
+import sys
+from typing import Any, Dict, Iterator, List, Set, Tuple
+
+from sqlalchemy import create_engine, func, select, text
+from sqlalchemy.dialects import postgresql
+
+from models import Booking, Certificate, Order, Session as HovnSession, Student
+
+SAMPLE_EMAIL = "plan-check@example.com"
+
+
+def hot_queries() -> List[Tuple[str, Any, Set[str]]]:
+    """(label, statement, indexes that must appear in its plan)."""
+    return [
+        (
+            "lookup_certs: student by email",
+            select(Student).where(func.lower(Student.email) == SAMPLE_EMAIL),
+            {"ix_students_email_lower"},
+        ),
+        (
+            "sync_certs_for_emails: students by email batch",
+            select(Student).where(func.lower(Student.email).in_([SAMPLE_EMAIL, "b@example.com", "c@example.com"])),
+            {"ix_students_email_lower"},
+        ),
+        (
+            "lookup_certs: certs for a student",
+            select(Certificate).where(Certificate.student_id == 1),
+            {"ix_certificates_student_id"},
+        ),
+        (
+            "cert_refresh: certs expiring soon",
+            select(Certificate.student_id).where(
+                Certificate.expiry_date.between(text("current_date - 30"), text("current_date + 60"))
+            ),
+            {"ix_certificates_expiry_date"},
+        ),
+        (
+            "cert_refresh: bookings for a student",
+            select(Booking.id).where(Booking.student_id == 1),
+            {"ix_bookings_student_id"},
+        ),
+        (
+            "roster: bookings in a session",
+            select(Booking).where(Booking.session_id == 1),
+            {"ix_bookings_session_id"},
+        ),
+        (
+            "bookings for an order",
+            select(Booking).where(Booking.order_id == 1),
+            {"ix_bookings_order_id"},
+        ),
+        (
+            "orders for a student",
+            select(Order).where(Order.student_id == 1),
+            {"ix_orders_student_id"},
+        ),
+        (
+            "sessions for a course / location / instructor",
+            select(HovnSession.id).where(
+                (HovnSession.course_id == 1) | (HovnSession.location_id == 1) | (HovnSession.instructor_id == 1)
+            ),
+            {"ix_sessions_course_id", "ix_sessions_location_id", "ix_sessions_instructor_id"},
+        ),
+    ]
+
+
+def _index_names(plan: Dict[str, Any]) -> Iterator[str]:
+    if "Index Name" in plan:
+        yield plan["Index Name"]
+    for child in plan.get("Plans", ()):
+        yield from _index_names(child)
+
+
+def explain(conn, stmt, real_costs: bool) -> Dict[str, Any]:
+    sql = str(stmt.compile(dialect=postgresql.dialect(), compile_kwargs={"literal_binds": True}))
+    trans = conn.begin()
+    try:
+        if not real_costs:
+            conn.execute(text("SET LOCAL enable_seqscan = off"))
+        (plan_json,) = conn.execute(text("EXPLAIN (FORMAT JSON) " + sql)).one()
+    finally:
+        trans.rollback()
+    if isinstance(plan_json, str):
+        plan_json = json.loads(plan_json)
+    return plan_json[0]["Plan"]
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Fail if hot queries stop using their indexes.")
+    ap.add_argument("--database-url")
+    ap.add_argument("--real-costs", action="store_true", help="keep seq scans enabled (real planner choice)")
+    ap.add_argument("--verbose", action="store_true", help="print every plan")
+    args = ap.parse_args()
+
+    if args.database_url:
+        url = args.database_url
+    else:
+        from settings import DATABASE_URL as url
+
+    engine = create_engine(url)
+    failures = 0
+    with engine.connect() as conn:
+        for label, stmt, expected in hot_queries():
+            plan = explain(conn, stmt, args.real_costs)
+            used = set(_index_names(plan))
+            missing = expected - used
+            status = "ok  " if not missing else "FAIL"
+            print(f"[PLAN] {status} {label}: {', '.join(sorted(used)) or 'no index'}")
+            if missing:
+                failures += 1
+                print(f"[PLAN]      expected {', '.join(sorted(missing))}")
+            if args.verbose or missing:
+                print(json.dumps(plan, indent=2))
+    engine.dispose()
+
+    if failures:
+        print(f"[PLAN] {failures} queries not using their index (run `alembic upgrade head`?)")
+        sys.exit(1)
+    print("[PLAN] all hot queries use their indexes")
+
+
+if __name__ == "__main__":
+    main()
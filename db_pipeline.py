@@ -1,6 +1,9 @@
 import os
+from datetime import datetime
+
 from sqlalchemy.orm import sessionmaker
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 from dotenv import load_dotenv
 
 load_dotenv()
@@ -16,6 +19,8 @@ from models import (
     Instructor,
 )
 
+from dimension_cache import dimension_cache, DimensionCache, DIMENSION_KEYS
+
 DATABASE_URL = os.getenv("DATABASE_URL")
 
 engine = create_engine(DATABASE_URL, future=True)
@@ -26,6 +31,13 @@ SessionLocal = sessionmaker(bind=engine, expire_on_commit=False)
 # Helper: get or create a record
 # --------------------------------------------------
 def get_or_create(db, model, defaults=None, **filters):
+    # Dimension tables resolve by natural key through the in-process cache;
+    # any other filter columns only apply to a newly created row
+    if model in DIMENSION_KEYS and all(c in filters for c in DIMENSION_KEYS[model]):
+        values = {c: filters[c] for c in DIMENSION_KEYS[model]}
+        extra = {k: v for k, v in filters.items() if k not in values}
+        return dimension_cache.get_or_create(db, model, values, defaults={**extra, **(defaults or {})})
+
     instance = db.query(model).filter_by(**filters).first()
     if instance:
         return instance, False
@@ -192,4 +204,242 @@ def persist_full_normalized_bundle(data: dict):
         db.rollback()
         raise
     finally:
-        db.close()
\ No newline at end of file
+        db.close()
+
+# --------------------------------------------------
+# Batch persistence: many bundles, one transaction
+# --------------------------------------------------
+# persist_normalized_bundles() upserts a whole list of normalized bundles
+# with one multi-row statement per table per BATCH_STATEMENT_ROWS rows,
+# in FK order:
+#
+#   agencies -> courses, locations, instructors  (SELECT known keys, INSERT the rest)
+#   students, sessions, orders, bookings         (INSERT ... ON CONFLICT DO UPDATE)
+#
+# Dimensions go through dimension_cache first, so a warm batch usually
+# skips their SELECTs. Bundles are deduplicated in memory (last one wins,
+# same as persisting them one after another).
+
+BATCH_STATEMENT_ROWS = int(os.getenv("BATCH_STATEMENT_ROWS", "1000"))
+
+
+def _chunks(items, size=BATCH_STATEMENT_ROWS):
+    for i in range(0, len(items), size):
+        yield items[i:i + size]
+
+
+class _BatchWriter:
+    def __init__(self, db):
+        self.db = db
+        self.now = datetime.utcnow()
+        self.round_trips = 0
+
+    def execute(self, stmt):
+        self.round_trips += 1
+        return self.db.execute(stmt)
+
+    def _select_existing(self, model, rows, ids):
+        keys = DIMENSION_KEYS[model]
+        first = getattr(model, keys[0])
+        wanted = [k for k in rows if k not in ids]
+        for chunk in _chunks(sorted({k[0] for k in wanted})):
+            for r in self.execute(select(model.__table__).where(first.in_(chunk))).mappings():
+                k = tuple(r[c] for c in keys)
+                if k in rows and k not in ids:
+                    ids[k] = r["id"]
+                    dimension_cache.remember(self.db, model, r)
+
+    def resolve_dimension(self, model, rows):
+        """{natural key: column values} -> {natural key: id}; missing rows are inserted."""
+        ids = {}
+        for k in rows:
+            snap = dimension_cache.peek(model, k)
+            if snap is not None:
+                ids[k] = snap["id"]
+
+        if len(ids) < len(rows):
+            self._select_existing(model, rows, ids)
+
+        missing = [k for k in rows if k not in ids]
+        for chunk in _chunks(missing):
+            stmt = (
+                pg_insert(model.__table__)
+                .values([{**rows[k], "created_at": self.now, "updated_at": self.now} for k in chunk])
+                .on_conflict_do_nothing()
+                .returning(*model.__table__.c)
+            )
+            for r in self.execute(stmt).mappings():
+                ids[tuple(r[c] for c in DIMENSION_KEYS[model])] = r["id"]
+                dimension_cache.remember(self.db, model, r, inserted=True)
+
+        if len(ids) < len(rows):
+            # Another worker inserted some of these between our SELECT and INSERT
+            self._select_existing(model, rows, ids)
+        return ids
+
+    def upsert(self, model, conflict_col, rows, update_cols):
+        """Multi-row INSERT ... ON CONFLICT (conflict_col) DO UPDATE. Returns {conflict value: id}."""
+        table = model.__table__
+        ids = {}
+        for chunk in _chunks(rows):
+            stmt = pg_insert(table).values([{**r, "created_at": self.now, "updated_at": self.now} for r in chunk])
+            stmt = stmt.on_conflict_do_update(
+                index_elements=[conflict_col],
+                set_={**{c: stmt.excluded[c] for c in update_cols}, "updated_at": self.now},
+            ).returning(table.c.id, table.c[conflict_col])
+            for row_id, value in self.execute(stmt):
+                ids[value] = row_id
+        return ids
+
+
+def persist_normalized_bundles(bundles: list, db=None) -> dict:
+    """
+    Upsert many normalize_full_bundle() results in one transaction.
+    Bundles without a student, session or order id or a booking ref are
+    left out (see "skipped"); persist_full_normalized_bundle handles those
+    one at a time. Returns counts plus the number of DB round trips.
+    """
+    own_session = db is None
+    db = db or SessionLocal()
+    w = _BatchWriter(db)
+    skipped = []
+
+    agencies, courses, locations, instructors = {}, {}, {}, {}
+    students, sessions, orders, bookings = {}, {}, {}, {}
+    usable = []
+
+    for data in bundles:
+        stu, sess, order = data.get("student") or {}, data.get("session") or {}, data.get("order") or {}
+        if not (stu.get("student_id") and sess.get("session_id") and order.get("order_id") and data.get("booking_ref")):
+            skipped.append(data.get("booking_ref"))
+            continue
+        usable.append(data)
+
+        if sess.get("agency"):
+            agencies[(sess["agency"],)] = {"name": sess["agency"]}
+
+        instr_name = sess.get("instructor_name")
+        if instr_name:
+            first, *rest = instr_name.split(" ")
+            instructors[(instr_name,)] = {
+                "full_name": instr_name,
+                "first_name": first,
+                "last_name": " ".join(rest) if rest else None,
+            }
+
+        if sess.get("location_name"):
+            loc = {
+                "name": sess["location_name"],
+                "address_line1": sess.get("location_street"),
+                "city": sess.get("location_city"),
+                "state": sess.get("location_state"),
+                "postal_code": sess.get("location_zip"),
+            }
+            locations[DimensionCache.key_for(Location, loc)] = {**loc, "country_code": "US"}
+
+    try:
+        # ---------- dimensions ----------
+        agency_ids = w.resolve_dimension(Agency, agencies)
+
+        for data in usable:
+            sess = data["session"]
+            if sess.get("course_name"):
+                course = {
+                    "name": sess["course_name"],
+                    "format": sess.get("format"),
+                    "agency_id": agency_ids.get((sess.get("agency"),)),
+                }
+                courses[DimensionCache.key_for(Course, course)] = course
+
+        course_ids = w.resolve_dimension(Course, courses)
+        location_ids = w.resolve_dimension(Location, locations)
+        instructor_ids = w.resolve_dimension(Instructor, instructors)
+
+        # ---------- students ----------
+        for data in usable:
+            stu = data["student"]
+            students[stu["student_id"]] = {
+                "hovn_student_id": stu["student_id"],
+                "first_name": stu.get("first_name"),
+                "last_name": stu.get("last_name"),
+                "email": stu.get("email"),
+                "phone_e164": stu.get("phone_e164"),
+                "phone_raw": stu.get("phone_raw"),
+            }
+        student_ids = w.upsert(
+            Student, "hovn_student_id", list(students.values()),
+            ["first_name", "last_name", "email", "phone_e164", "phone_raw"],
+        )
+
+        # ---------- sessions ----------
+        for data in usable:
+            sess = data["session"]
+            agency_id = agency_ids.get((sess.get("agency"),))
+            sessions[sess["session_id"]] = {
+                "hovn_session_id": sess["session_id"],
+                "course_id": course_ids.get((sess.get("course_name"), sess.get("format"), agency_id)),
+                "agency_id": agency_id,
+                "location_id": location_ids.get((
+                    sess.get("location_name"), sess.get("location_street"), sess.get("location_city"),
+                    sess.get("location_state"), sess.get("location_zip"),
+                )),
+                "instructor_id": instructor_ids.get((sess.get("instructor_name"),)),
+                "start_utc": sess.get("start_utc"),
+                "start_local": sess.get("start_central"),
+                "format": sess.get("format"),
+                "hovn_session_url": sess.get("session_url"),
+            }
+        session_ids = w.upsert(
+            Session, "hovn_session_id", list(sessions.values()),
+            ["course_id", "agency_id", "location_id", "instructor_id", "start_utc", "start_local", "format", "hovn_session_url"],
+        )
+
+        # ---------- orders ----------
+        for data in usable:
+            order = data["order"]
+            orders[order["order_id"]] = {
+                "hovn_order_id": order["order_id"],
+                "hovn_order_number": order.get("order_number"),
+                "stripe_order_number": order.get("stripe_order_number"),
+                "student_id": student_ids[data["student"]["student_id"]],
+                "amount_cents": order.get("total_cents"),
+                "currency_code": "USD",
+                "status": order.get("status"),
+                "ordered_at_utc": order.get("order_datetime_utc"),
+                "ordered_at_local": order.get("order_datetime_central"),
+            }
+        order_ids = w.upsert(
+            Order, "hovn_order_id", list(orders.values()),
+            ["hovn_order_number", "stripe_order_number", "student_id", "amount_cents", "currency_code",
+             "status", "ordered_at_utc", "ordered_at_local"],
+        )
+
+        # ---------- bookings ----------
+        for data in usable:
+            bookings[data["booking_ref"]] = {
+                "hovn_booking_ref": data["booking_ref"],
+                "student_id": student_ids[data["student"]["student_id"]],
+                "session_id": session_ids[data["session"]["session_id"]],
+                "order_id": order_ids[data["order"]["order_id"]],
+                "status": "active",
+            }
+        w.upsert(Booking, "hovn_booking_ref", list(bookings.values()), ["student_id", "session_id", "order_id", "status"])
+
+        db.commit()
+        w.round_trips += 1
+
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        if own_session:
+            db.close()
+
+    return {
+        "bookings": len(bookings),
+        "students": len(students),
+        "sessions": len(sessions),
+        "orders": len(orders),
+        "skipped": skipped,
+        "round_trips": w.round_trips,
+    }
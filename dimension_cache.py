@@ -0,0 +1,252 @@
+# dimension_cache.py
+# ------------------
+# In-process cache in front of the small dimension tables (agencies,
+# courses, locations, instructors) that every booking upsert resolves.
+#
+# - Keyed by each table's natural unique key (DIMENSION_KEYS), so a hit
+#   skips the SELECT against Neon entirely: the cached column snapshot is
+#   attached to the caller's session with merge(load=False).
+# - Preloaded from the DB on first use (and at API startup), bounded to
+#   DIM_CACHE_MAX_ENTRIES per table, evicted least-recently-used.
+# - Rows we insert are only published to the cache once the inserting
+#   transaction commits; a rollback drops them. Callers that modify a
+#   cached row invalidate its key.
+# - Inserts run in a SAVEPOINT; if another worker inserted the same key
+#   first, the unique violation rolls back just the savepoint and the
+#   winner's row is selected instead.
+#
+# Each gunicorn worker / script run holds its own cache. DIM_CACHE_ENABLED=0
+# turns it off (every call is a plain SELECT + INSERT).
+
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+from sqlalchemy import event, inspect, select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session as OrmSession, make_transient_to_detached
+
+from models import Agency, Course, Location, Instructor
+
+DIM_CACHE_ENABLED = os.getenv("DIM_CACHE_ENABLED", "1").lower() not in ("0", "false", "no")
+DIM_CACHE_MAX_ENTRIES = int(os.getenv("DIM_CACHE_MAX_ENTRIES", "5000"))
+
+# Natural key per dimension (uq_course_name_format_agency, uq_location, ...).
+# instructors has no unique constraint; full_name is what lookups use.
+DIMENSION_KEYS = {
+    Agency: ("name",),
+    Course: ("name", "format", "agency_id"),
+    Location: ("name", "address_line1", "city", "state", "postal_code"),
+    Instructor: ("full_name",),
+}
+
+_PENDING_KEY = "dimension_cache_pending"
+
+
+def _snapshot(obj) -> Dict[str, Any]:
+    return {attr.key: getattr(obj, attr.key) for attr in inspect(obj).mapper.column_attrs}
+
+
+class DimensionCache:
+    def __init__(self, max_entries: int = DIM_CACHE_MAX_ENTRIES, enabled: bool = DIM_CACHE_ENABLED):
+        self.max_entries = max(1, max_entries)
+        self.enabled = enabled
+
+        # model -> natural key tuple -> column snapshot
+        self._data: Dict[type, "OrderedDict[Tuple, Dict[str, Any]]"] = {m: OrderedDict() for m in DIMENSION_KEYS}
+        self._lock = threading.Lock()
+        self._preloaded = False
+
+        self.hits = 0
+        self.misses = 0
+        self.inserts = 0
+        self.races = 0
+        self.evictions = 0
+        self.invalidations = 0
+        self.preloaded_rows = 0
+        self._miss_seconds = 0.0
+
+    # ---------- keys ----------
+
+    @staticmethod
+    def key_for(model, values: Dict[str, Any]) -> Tuple:
+        return tuple(values.get(c) for c in DIMENSION_KEYS[model])
+
+    @staticmethod
+    def _key_of(obj) -> Tuple:
+        return tuple(getattr(obj, c) for c in DIMENSION_KEYS[type(obj)])
+
+    # ---------- storage ----------
+
+    def _store(self, model, key: Tuple, snap: Dict[str, Any]) -> None:
+        with self._lock:
+            table = self._data[model]
+            table[key] = snap
+            table.move_to_end(key)
+            while len(table) > self.max_entries:
+                table.popitem(last=False)
+                self.evictions += 1
+
+    def _lookup(self, model, key: Tuple) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            snap = self._data[model].get(key)
+            if snap is not None:
+                self._data[model].move_to_end(key)
+            return snap
+
+    def invalidate(self, model, key: Tuple) -> None:
+        with self._lock:
+            if self._data[model].pop(key, None) is not None:
+                self.invalidations += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            for table in self._data.values():
+                table.clear()
+            self._preloaded = False
+
+    def preload(self, db) -> int:
+        """Load every dimension row (newest first, up to max_entries per table)."""
+        loaded = 0
+        for model in DIMENSION_KEYS:
+            rows = db.execute(select(model).order_by(model.id.desc()).limit(self.max_entries)).scalars().all()
+            for obj in reversed(rows):
+                self._store(model, self._key_of(obj), _snapshot(obj))
+            loaded += len(rows)
+        with self._lock:
+            self._preloaded = True
+            self.preloaded_rows = loaded
+        print(f"[DIM_CACHE] preloaded {loaded} dimension rows")
+        return loaded
+
+    # ---------- batch access (db_pipeline.persist_normalized_bundles) ----------
+
+    def peek(self, model, key: Tuple) -> Optional[Dict[str, Any]]:
+        """Cached column snapshot for `key` (counted as a hit or miss), or None."""
+        if not self.enabled:
+            return None
+        snap = self._lookup(model, key)
+        with self._lock:
+            if snap is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        return snap
+
+    def remember(self, db, model, row: Dict[str, Any], inserted: bool = False) -> None:
+        """Cache a row read back from the DB; rows `inserted` by db wait for its commit."""
+        if not self.enabled:
+            return
+        snap = {attr.key: row[attr.columns[0].name] for attr in inspect(model).column_attrs}
+        key = self.key_for(model, snap)
+        if inserted:
+            with self._lock:
+                self.inserts += 1
+            db.info.setdefault(_PENDING_KEY, []).append((model, key, snap))
+        else:
+            self._store(model, key, snap)
+
+    # ---------- commit / rollback hooks ----------
+
+    def _publish(self, db) -> None:
+        for model, key, snap in db.info.pop(_PENDING_KEY, ()):
+            self._store(model, key, snap)
+
+    @staticmethod
+    def _discard(db) -> None:
+        db.info.pop(_PENDING_KEY, None)
+
+    # ---------- resolution ----------
+
+    def _select(self, db, model, values: Dict[str, Any]):
+        stmt = select(model).where(*(getattr(model, c) == values.get(c) for c in DIMENSION_KEYS[model]))
+        return db.execute(stmt).scalars().first()
+
+    def get_or_create(self, db, model, values: Dict[str, Any], defaults: Optional[Dict[str, Any]] = None):
+        """
+        (instance attached to `db`, created) for the row whose natural key
+        matches `values`. New rows are flushed, not committed.
+        """
+        key = self.key_for(model, values)
+
+        if self.enabled:
+            if not self._preloaded:
+                self.preload(db)
+            snap = self._lookup(model, key)
+            if snap is not None:
+                with self._lock:
+                    self.hits += 1
+                obj = model(**snap)
+                make_transient_to_detached(obj)
+                return db.merge(obj, load=False), False
+
+        t0 = time.perf_counter()
+        obj = self._select(db, model, values)
+        with self._lock:
+            self.misses += 1
+            self._miss_seconds += time.perf_counter() - t0
+
+        if obj is not None:
+            if self.enabled and obj not in db.new and obj not in db.dirty:
+                self._store(model, key, _snapshot(obj))
+            return obj, False
+
+        obj = model(**{**values, **(defaults or {})})
+        try:
+            with db.begin_nested():
+                db.add(obj)
+        except IntegrityError:
+            # Another worker committed the same key between our SELECT and INSERT
+            with self._lock:
+                self.races += 1
+            obj = self._select(db, model, values)
+            if obj is None:
+                raise
+            if self.enabled:
+                self._store(model, key, _snapshot(obj))
+            return obj, False
+
+        with self._lock:
+            self.inserts += 1
+        if self.enabled:
+            db.info.setdefault(_PENDING_KEY, []).append((model, key, _snapshot(obj)))
+        return obj, True
+
+    # ---------- stats ----------
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            avg_miss = self._miss_seconds / self.misses if self.misses else 0.0
+            return {
+                "enabled": self.enabled,
+                "entries": {m.__tablename__: len(t) for m, t in self._data.items()},
+                "max_entries": self.max_entries,
+                "preloaded_rows": self.preloaded_rows,
+                "hits": self.hits,
+                "misses": self.misses,
+                "inserts": self.inserts,
+                "races": self.races,
+                "evictions": self.evictions,
+                "invalidations": self.invalidations,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+                "avg_select_ms": round(avg_miss * 1000, 3),
+                # every hit is one SELECT we didn't send
+                "est_saved_ms": round(self.hits * avg_miss * 1000, 1),
+            }
+
+
+dimension_cache = DimensionCache()
+
+
+@event.listens_for(OrmSession, "after_commit")
+def _after_commit(db):
+    dimension_cache._publish(db)
+
+
+@event.listens_for(OrmSession, "after_rollback")
+def _after_rollback(db):
+    # Also fires for savepoint rollbacks; dropping pending rows then only costs a later miss
+    dimension_cache._discard(db)
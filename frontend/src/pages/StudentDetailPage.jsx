@@ -1,6 +1,21 @@
 import React, { useEffect, useMemo, useState } from "react";
 import { useLocation, useNavigate, useParams } from "react-router-dom";
 
+function formatAge(seconds) {
+  if (seconds < 60) return "just now";
+  if (seconds < 3600) return `${Math.round(seconds / 60)} min ago`;
+  if (seconds < 86400) return `${Math.round(seconds / 3600)} h ago`;
+  return `${Math.round(seconds / 86400)} days ago`;
+}
+
+function describeFreshness(f) {
+  if (!f || !f.state) return "First lookup hits Red Cross, then results are cached in the DB.";
+  if (f.state === "live") return "Checked with Red Cross just now.";
+  if (f.ageSeconds === null) return "From the DB · refreshing from Red Cross in the background.";
+  const when = `Checked with Red Cross ${formatAge(f.ageSeconds)}`;
+  return f.state === "stale" ? `${when} · refreshing in the background.` : `${when}.`;
+}
+
 function StudentDetailPage() {
   const { id } = useParams();
   const navigate = useNavigate();
@@ -13,6 +28,7 @@ function StudentDetailPage() {
   const [certs, setCerts] = useState([]);
   const [loadingCerts, setLoadingCerts] = useState(false);
   const [certError, setCertError] = useState(null);
+  const [certFreshness, setCertFreshness] = useState(null);
 
   useEffect(() => {
     if (student) return;
@@ -58,7 +74,7 @@ function StudentDetailPage() {
     }
   }, [student]);
 
-  const handleLookupCerts = async () => {
+  const handleLookupCerts = async (refresh = false) => {
     if (!student?.email) return;
 
     try {
@@ -66,13 +82,20 @@ function StudentDetailPage() {
       setCertError(null);
       setCerts([]);
 
-      const url = `/api/certs/lookup?email=${encodeURIComponent(student.email)}`;
+      const url =
+        `/api/certs/lookup?email=${encodeURIComponent(student.email)}` +
+        (refresh ? "&refresh=true" : "");
       const res = await fetch(url, { method: "POST" });
       if (!res.ok) throw new Error(`API /api/certs/lookup failed: ${res.status}`);
 
       const data = await res.json();
       const list = Array.isArray(data) ? data : data.certs || [];
 
+      const age = res.headers.get("X-Cert-Age-Seconds");
+      setCertFreshness({
+        state: res.headers.get("X-Cert-Freshness"),
+        ageSeconds: age === null ? null : Number(age),
+      });
       setCerts(list);
     } catch (err) {
       console.error("Failed to lookup certs", err);
@@ -126,7 +149,7 @@ function StudentDetailPage() {
 
         {student?.email && (
           <button
-            onClick={handleLookupCerts}
+            onClick={() => handleLookupCerts(true)}
             disabled={loadingCerts}
             className="text-xs px-3 py-1 rounded-md bg-slate-900 text-slate-50 hover:bg-slate-800 disabled:opacity-60"
           >
@@ -203,7 +226,7 @@ function StudentDetailPage() {
           <div className="flex items-center justify-between mb-2">
             <h4 className="text-xs font-semibold text-slate-600">Red Cross Certifications</h4>
             <p className="text-[11px] text-slate-400">
-              First lookup hits Red Cross, then results are cached in the DB.
+              {describeFreshness(certFreshness)}
             </p>
           </div>
 
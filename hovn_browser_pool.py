@@ -0,0 +1,416 @@
+# hovn_browser_pool.py
+# --------------------
+# Long-lived Playwright scraper for batch runs: one CDP connection to the
+# already-running Edge and a pool of N tabs, instead of sync_playwright()
+# + connect_over_cdp + new_page + teardown for every booking ref.
+#
+#   with HovnBrowserPool(tabs=4) as pool:
+#       bundle = pool.scrape("brn_ABC123")
+#       for ref, bundle, err in pool.scrape_many(refs):
+#           ...
+#
+# Playwright objects are bound to the event loop that created them, so the
+# pool runs its own asyncio loop on a background thread; scrape() and
+# scrape_many() are safe to call from any number of worker threads.
+#
+# Tabs are recycled (closed and replaced) when they crash, raise during a
+# scrape, exceed HOVN_TAB_MAX_USES, or their JS heap grows past
+# HOVN_TAB_MAX_HEAP_MB. Only tabs we opened are ever closed — the browser
+# is the user's real Edge profile.
+#
+# Each tab gets the HOVN_BLOCK_PROFILE request interception and navigates
+# with HOVN_WAIT_UNTIL; per-phase latencies are in pool.stats()["timings"].
+
+import asyncio
+import concurrent.futures
+import os
+import threading
+import time
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from playwright.async_api import async_playwright, TimeoutError as PlaywrightTimeoutError
+
+import raw_archive
+from session_cache import SessionPageCache, session_key
+from hovn_scraper import (
+    EDGE_CDP_URL,
+    BOOKING_BASE_URL,
+    XPATH_TIMEOUT_MS,
+    HOVN_EXTRACT_MODE,
+    HOVN_BLOCK_PROFILE,
+    HOVN_WAIT_UNTIL,
+    PageTimings,
+    should_block,
+    BOOKING_FIELDS,
+    SESSION_FIELDS,
+    BOOKING_READY_XPATH,
+    SESSION_READY_XPATH,
+    EXTRACT_FIELDS_JS,
+    booking_from_raw,
+    session_from_raw,
+    missing_keys,
+    field_needed,
+)
+
+HOVN_POOL_TABS = int(os.getenv("HOVN_POOL_TABS", "4"))
+HOVN_TAB_MAX_USES = int(os.getenv("HOVN_TAB_MAX_USES", "50"))
+HOVN_TAB_MAX_HEAP_MB = float(os.getenv("HOVN_TAB_MAX_HEAP_MB", "300"))
+HOVN_NAV_TIMEOUT_MS = int(os.getenv("HOVN_NAV_TIMEOUT_MS", "60000"))
+
+
+class _Tab:
+    def __init__(self, page):
+        self.page = page
+        self.uses = 0
+        self.crashed = False
+        page.on("crash", lambda _page: setattr(self, "crashed", True))
+
+
+# ------------------------------------------------------
+# ASYNC EXTRACTION (hovn_scraper's field table and post-processing)
+# ------------------------------------------------------
+
+async def _get_text(page, xpath: str, timeout: int = XPATH_TIMEOUT_MS) -> str | None:
+    try:
+        el = page.locator(f"xpath={xpath}")
+        await el.wait_for(timeout=timeout)
+        return (await el.inner_text()).strip()
+    except PlaywrightTimeoutError:
+        return None
+    except Exception:
+        return None
+
+
+async def _get_attr(page, xpath: str, attr: str, timeout: int = XPATH_TIMEOUT_MS) -> str | None:
+    try:
+        el = page.locator(f"xpath={xpath}")
+        await el.wait_for(timeout=timeout)
+        val = await el.get_attribute(attr)
+        return val.strip() if val is not None else None
+    except PlaywrightTimeoutError:
+        return None
+    except Exception:
+        return None
+
+
+async def _read_fields_locator(page, fields: dict, timeout: int = XPATH_TIMEOUT_MS) -> dict:
+    # Async twin of hovn_scraper.read_fields_locator (same table, same order)
+    raw: dict[str, str | None] = {}
+    for name, (xpath, attr) in fields.items():
+        if not field_needed(name, raw):
+            raw[name] = None
+        elif attr:
+            raw[name] = await _get_attr(page, xpath, attr, timeout)
+        else:
+            raw[name] = await _get_text(page, xpath, timeout)
+    return raw
+
+
+async def _evaluate_fields(page, fields: dict, ready_xpath: str, timeout: int) -> dict:
+    # Same single-roundtrip path as hovn_scraper.extract_booking/extract_session
+    try:
+        await page.locator(f"xpath={ready_xpath}").first.wait_for(timeout=timeout)
+    except PlaywrightTimeoutError:
+        pass
+    return await page.evaluate(EXTRACT_FIELDS_JS, fields)
+
+
+async def _extract_booking(page, timeout: int = XPATH_TIMEOUT_MS) -> dict:
+    if HOVN_EXTRACT_MODE == "locator":
+        return booking_from_raw(await _read_fields_locator(page, BOOKING_FIELDS, timeout))
+    data = booking_from_raw(await _evaluate_fields(page, BOOKING_FIELDS, BOOKING_READY_XPATH, timeout))
+    missing = missing_keys(data)
+    if missing:
+        print(f"[POOL] booking page missing: {', '.join(missing)}")
+    return data
+
+
+async def _extract_session(page, timeout: int = XPATH_TIMEOUT_MS) -> dict:
+    if HOVN_EXTRACT_MODE == "locator":
+        return session_from_raw(await _read_fields_locator(page, SESSION_FIELDS, timeout))
+    data = session_from_raw(await _evaluate_fields(page, SESSION_FIELDS, SESSION_READY_XPATH, timeout))
+    missing = missing_keys(data)
+    if missing:
+        print(f"[POOL] session page missing: {', '.join(missing)}")
+    return data
+
+
+async def _archive_page(page, source: str, booking_ref: str) -> Optional[str]:
+    if raw_archive.RAW_ARCHIVE_ENABLED:
+        html = await page.content()
+        return await asyncio.to_thread(raw_archive.capture, source, page.url, html, booking_ref)
+    return None
+
+
+async def install_resource_blocking(page, profile: str = HOVN_BLOCK_PROFILE, timings: Optional[PageTimings] = None) -> None:
+    if profile == "off":
+        return
+
+    async def handler(route):
+        req = route.request
+        if should_block(req.url, req.resource_type, profile):
+            if timings is not None:
+                timings.count_blocked()
+            await route.abort()
+        else:
+            await route.continue_()
+
+    await page.route("**/*", handler)
+
+
+async def scrape_on_page(
+    page,
+    booking_ref: str,
+    wait_until: str = HOVN_WAIT_UNTIL,
+    timings: Optional[PageTimings] = None,
+    session_cache: Optional[SessionPageCache] = None,
+    session_locks: Optional[Dict[str, asyncio.Lock]] = None,
+) -> dict:
+    """
+    One booking + session scrape on an already-open tab. With a
+    session_cache, tabs scraping bookings of the same session wait on one
+    lock per session so only the first of them loads the page.
+    """
+    timings = timings or PageTimings()
+    started = time.perf_counter()
+
+    async def timed(phase: str, coro):
+        t0 = time.perf_counter()
+        result = await coro
+        timings.record(phase, time.perf_counter() - t0)
+        return result
+
+    booking_url = BOOKING_BASE_URL + booking_ref
+    await timed("booking_nav", page.goto(booking_url, wait_until=wait_until, timeout=HOVN_NAV_TIMEOUT_MS))
+    booking_data = await timed("booking_extract", _extract_booking(page))
+    # After extraction, so the archived DOM is the rendered one
+    await _archive_page(page, raw_archive.HOVN_BOOKING_PAGE, booking_ref)
+
+    async def load_session(url: str) -> Optional[dict]:
+        cached = session_cache.get(url) if session_cache else None
+        if cached:
+            await asyncio.to_thread(
+                raw_archive.link, raw_archive.HOVN_SESSION_PAGE, url, cached["archive_sha"], booking_ref
+            )
+            return cached["session"]
+        await timed("session_nav", page.goto(url, wait_until=wait_until, timeout=HOVN_NAV_TIMEOUT_MS))
+        session = await timed("session_extract", _extract_session(page))
+        sha = await _archive_page(page, raw_archive.HOVN_SESSION_PAGE, booking_ref)
+        if session_cache:
+            session_cache.put(url, session, sha)
+        return session
+
+    session_data = None
+    session_url = booking_data.get("session_url")
+    if session_url and session_locks is not None:
+        async with session_locks.setdefault(session_key(session_url), asyncio.Lock()):
+            session_data = await load_session(session_url)
+    elif session_url:
+        session_data = await load_session(session_url)
+    else:
+        print(f"[POOL] WARNING: No session_url found on booking page for {booking_ref}.")
+
+    timings.record("scrape_total", time.perf_counter() - started)
+    return {
+        "booking_ref": booking_ref,
+        "booking_url": booking_url,
+        "booking": booking_data,
+        "session": session_data,
+    }
+
+
+# ------------------------------------------------------
+# POOL
+# ------------------------------------------------------
+
+class HovnBrowserPool:
+    def __init__(
+        self,
+        tabs: int = HOVN_POOL_TABS,
+        cdp_url: str = EDGE_CDP_URL,
+        max_uses: int = HOVN_TAB_MAX_USES,
+        max_heap_mb: float = HOVN_TAB_MAX_HEAP_MB,
+        block_profile: str = HOVN_BLOCK_PROFILE,
+        wait_until: str = HOVN_WAIT_UNTIL,
+        session_cache: Optional[SessionPageCache] = None,
+    ):
+        self.tabs = max(1, tabs)
+        self.cdp_url = cdp_url
+        self.max_uses = max_uses
+        self.max_heap_mb = max_heap_mb
+        self.block_profile = block_profile.lower()
+        self.wait_until = wait_until
+        self.timings = PageTimings()
+        self.session_cache = session_cache if session_cache is not None else SessionPageCache()
+        self._session_locks: Dict[str, asyncio.Lock] = {}
+
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+        self._pw = None
+        self._browser = None
+        self._context = None
+        self._idle: Optional[asyncio.Queue] = None
+        self._open_tabs: List[_Tab] = []
+        self._start_lock = threading.Lock()
+
+        self.scrapes = 0
+        self.recycled = 0
+
+    # ---------- lifecycle ----------
+
+    def start(self) -> "HovnBrowserPool":
+        with self._start_lock:
+            if self._loop is not None:
+                return self
+            self._loop = asyncio.new_event_loop()
+            self._thread = threading.Thread(target=self._loop.run_forever, name="hovn-browser-pool", daemon=True)
+            self._thread.start()
+            try:
+                self._run(self._open())
+            except Exception:
+                self.close()
+                raise
+        return self
+
+    def close(self) -> None:
+        if self._loop is None:
+            return
+        try:
+            self._run(self._shutdown())
+        except Exception as e:
+            print(f"[POOL] error while closing: {e}")
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join(5)
+        self._loop.close()
+        self._loop = None
+        print(f"[POOL] closed after {self.scrapes} scrapes ({self.recycled} tabs recycled)")
+        for phase, t in self.timings.summary().items():
+            if isinstance(t, dict):
+                print(f"[POOL]  {phase:>15}: n={t['n']} mean={t['mean_ms']}ms p95={t['p95_ms']}ms")
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def _run(self, coro):
+        return asyncio.run_coroutine_threadsafe(coro, self._loop).result()
+
+    async def _open(self) -> None:
+        print(f"[POOL] Attaching to Edge over CDP ({self.cdp_url}) with {self.tabs} tabs...")
+        self._pw = await async_playwright().start()
+        self._browser = await self._pw.chromium.connect_over_cdp(self.cdp_url)
+        contexts = self._browser.contexts
+        self._context = contexts[0] if contexts else await self._browser.new_context()
+
+        self._idle = asyncio.Queue()
+        for _ in range(self.tabs):
+            self._idle.put_nowait(await self._new_tab())
+
+    async def _shutdown(self) -> None:
+        for tab in list(self._open_tabs):
+            await self._close_tab(tab)
+        if self._pw is not None:
+            # Disconnects from Edge; the browser itself keeps running
+            await self._pw.stop()
+            self._pw = None
+
+    # ---------- tabs ----------
+
+    async def _new_tab(self) -> _Tab:
+        tab = _Tab(await self._context.new_page())
+        self._open_tabs.append(tab)
+        await install_resource_blocking(tab.page, self.block_profile, self.timings)
+        return tab
+
+    async def _close_tab(self, tab: _Tab) -> None:
+        if tab in self._open_tabs:
+            self._open_tabs.remove(tab)
+        try:
+            if not tab.page.is_closed():
+                await tab.page.close()
+        except Exception:
+            pass
+
+    async def _heap_mb(self, tab: _Tab) -> float:
+        try:
+            used = await tab.page.evaluate(
+                "() => (performance.memory ? performance.memory.usedJSHeapSize : 0)"
+            )
+            return (used or 0) / (1024 * 1024)
+        except Exception:
+            return 0.0
+
+    async def _recycle_reason(self, tab: _Tab, failed: bool) -> Optional[str]:
+        if tab.crashed or tab.page.is_closed():
+            return "crashed"
+        if failed:
+            return "scrape failed"
+        if tab.uses >= self.max_uses:
+            return f"{tab.uses} uses"
+        if self.max_heap_mb > 0:
+            heap = await self._heap_mb(tab)
+            if heap > self.max_heap_mb:
+                return f"JS heap {heap:.0f} MB"
+        return None
+
+    async def _release(self, tab: _Tab, failed: bool) -> None:
+        reason = await self._recycle_reason(tab, failed)
+        if reason:
+            self.recycled += 1
+            print(f"[POOL] recycling tab ({reason})")
+            await self._close_tab(tab)
+            tab = await self._new_tab()
+        self._idle.put_nowait(tab)
+
+    async def _scrape(self, booking_ref: str) -> dict:
+        tab = await self._idle.get()
+        failed = False
+        try:
+            tab.uses += 1
+            return await scrape_on_page(
+                tab.page, booking_ref, self.wait_until, self.timings, self.session_cache, self._session_locks
+            )
+        except Exception:
+            failed = True
+            raise
+        finally:
+            self.scrapes += 1
+            await self._release(tab, failed)
+
+    # ---------- public ----------
+
+    def scrape(self, booking_ref: str) -> dict:
+        """Scrape one booking on the next free tab (blocks until done)."""
+        self.start()
+        return self._run(self._scrape(booking_ref))
+
+    def scrape_many(self, booking_refs: Iterable[str]) -> Iterator[Tuple[str, Optional[dict], Optional[Exception]]]:
+        """
+        Scrape many refs across all tabs. Yields (ref, bundle, error) as
+        each finishes; a failed ref yields (ref, None, exc).
+        """
+        self.start()
+        refs = list(dict.fromkeys(r.strip() for r in booking_refs if r and r.strip()))
+
+        async def one(ref: str):
+            try:
+                return ref, await self._scrape(ref), None
+            except Exception as e:
+                return ref, None, e
+
+        futures = [asyncio.run_coroutine_threadsafe(one(r), self._loop) for r in refs]
+        for fut in concurrent.futures.as_completed(futures):
+            yield fut.result()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "tabs": self.tabs,
+            "scrapes": self.scrapes,
+            "recycled": self.recycled,
+            "block_profile": self.block_profile,
+            "wait_until": self.wait_until,
+            "timings": self.timings.summary(),
+            "session_cache": self.session_cache.stats(),
+        }
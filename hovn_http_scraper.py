@@ -0,0 +1,354 @@
+# hovn_http_scraper.py
+# --------------------
+# Playwright-free Hovn scrape: one cookie-authenticated GET of the admin
+# booking page, then the booking (with its student, order and course
+# session) is read out of the Next.js Flight payload embedded in the HTML.
+#
+# Produces the same dict as hovn_scraper's Playwright path, so
+# normalize_full_bundle() and everything downstream are unchanged:
+#
+#   {"booking_ref", "booking_url", "booking": {...}, "session": {...}}
+#
+# The page is decoded with next_flight (push chunks -> row table, "$" row
+# references resolved), so a course/location that Flight emitted as a
+# pointer to another row is still found. Raises HovnHttpScrapeError when
+# the page doesn't carry what we need (logged out, layout change);
+# hovn_scraper.scrape_booking_and_session then falls back to Playwright.
+
+import json
+import os
+import re
+from typing import Any, Dict, List, Optional
+
+from http_transport import PooledTransport, TokenBucket
+from settings import HOVN_PROVIDER_SLUG, HOVN_SESSION_COOKIE
+import raw_archive
+from next_flight import parse_flight, find_booking, flight_chunks
+
+HOVN_ORIGIN = "https://www.hovn.app"
+BOOKING_URL_TEMPLATE = HOVN_ORIGIN + "/admin/{slug}/bookings/{ref}"
+SESSION_URL_TEMPLATE = HOVN_ORIGIN + "/admin/{slug}/sessions/{session_id}"
+
+HOVN_HEADERS = {
+    "User-Agent": (
+        "Mozilla/5.0 (Windows NT 10.0; Win64; x64) "
+        "AppleWebKit/537.36 (KHTML, like Gecko) "
+        "Chrome/120.0.0.0 Safari/537.36"
+    ),
+    "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8",
+    "Accept-Language": "en-US,en;q=0.9",
+    "Referer": f"{HOVN_ORIGIN}/admin/{HOVN_PROVIDER_SLUG}/bookings",
+}
+
+# Fields a bundle must have before we trust it over the Playwright path:
+# everything db_pipeline.persist_full_normalized_bundle needs (ids plus the
+# NOT NULL Agency.name / Location.name / Instructor.full_name)
+REQUIRED_FIELDS = (
+    ("booking", "booking_ref"),
+    ("booking", "student_id"),
+    ("booking", "student_email"),
+    ("booking", "order_id"),
+    ("session", "session_id_text"),
+    ("session", "course_name"),
+    ("session", "agency"),
+    ("session", "session_date_iso"),
+    ("session", "location_name"),
+    ("session", "instructor_name"),
+)
+
+HOVN_TRANSPORT = PooledTransport(
+    name="HOVN",
+    headers=HOVN_HEADERS,
+    pool_size=int(os.getenv("HOVN_POOL_SIZE", "4")),
+    connect_timeout=float(os.getenv("HOVN_CONNECT_TIMEOUT", "5")),
+    read_timeout=float(os.getenv("HOVN_READ_TIMEOUT", "20")),
+    max_retries=int(os.getenv("HOVN_MAX_RETRIES", "3")),
+    rate_limiter=TokenBucket(
+        rate=float(os.getenv("HOVN_RATE_PER_SEC", "2")),
+        burst=int(os.getenv("HOVN_RATE_BURST", "4")),
+    ),
+)
+
+
+class HovnHttpScrapeError(RuntimeError):
+    pass
+
+
+def _cookie_jar(cookie_str: str) -> Dict[str, str]:
+    jar: Dict[str, str] = {}
+    for part in (cookie_str or "").split(";"):
+        if "=" in part:
+            name, value = part.strip().split("=", 1)
+            jar[name.strip()] = value.strip()
+    return jar
+
+
+if HOVN_SESSION_COOKIE:
+    HOVN_TRANSPORT.session.cookies.update(_cookie_jar(HOVN_SESSION_COOKIE))
+
+
+# ------------------------------------------------------
+# FLIGHT PAYLOAD
+# ------------------------------------------------------
+
+def flight_payload(html: str) -> str:
+    """
+    Concatenate the string chunks of every self.__next_f.push([1, "..."])
+    call, i.e. the RSC stream with its JSON unescaped. Falls back to the
+    raw HTML when the page has no push calls (e.g. already-decoded fixtures).
+    """
+    chunks = flight_chunks(html)
+    return "".join(chunks) if chunks else html
+
+
+_STRUCT_RE = re.compile(r'["{}\[\]]')
+_STRING_REST_RE = re.compile(r'[^"\\]*(?:\\.[^"\\]*)*"', re.S)
+
+
+def _value_end(s: str, start: int) -> int:
+    """
+    Index just past the JSON object/array that starts at s[start]. Jumps
+    between structural characters and over whole strings with regexes
+    (both linear), so worst case is one pass over the rest of s.
+    """
+    depth = 0
+    pos = start
+    while True:
+        m = _STRUCT_RE.search(s, pos)
+        if m is None:
+            break
+        ch = m.group()
+        pos = m.end()
+        if ch == '"':
+            m = _STRING_REST_RE.match(s, pos)
+            if m is None:
+                break
+            pos = m.end()
+        elif ch in "{[":
+            depth += 1
+        else:
+            depth -= 1
+            if depth == 0:
+                return pos
+    raise HovnHttpScrapeError("unterminated JSON value in Flight payload")
+
+
+def _clean_flight_value(obj: Any) -> Any:
+    """Strip Flight's $D date prefix and map $undefined to None."""
+    if isinstance(obj, dict):
+        return {k: _clean_flight_value(v) for k, v in obj.items()}
+    if isinstance(obj, list):
+        return [_clean_flight_value(v) for v in obj]
+    if isinstance(obj, str):
+        if obj == "$undefined":
+            return None
+        if obj.startswith("$D"):
+            return obj[2:]
+    return obj
+
+
+def _cleaned(obj: Dict[str, Any], booking_ref: str) -> Dict[str, Any]:
+    try:
+        return _clean_flight_value(obj)
+    except RecursionError:
+        raise HovnHttpScrapeError(f"booking JSON for {booking_ref} is nested too deeply") from None
+
+
+def find_booking_json(payload: str, booking_ref: str) -> Dict[str, Any]:
+    """
+    The "booking":{...} object whose referenceNumber is booking_ref.
+
+    Index based and linear in len(payload): a page without the ref fails
+    on one str.find, and each "booking":{ candidate is bracket-scanned to
+    its end, only that slice is decoded, and the scan skips past it.
+    Decoding the slice (not the whole payload) keeps a JSONDecodeError's
+    line counting bounded to the candidate.
+    """
+    needle = f'"referenceNumber":"{booking_ref}"'
+    first_needle = payload.find(needle)
+    if first_needle == -1:
+        raise HovnHttpScrapeError(f"no booking JSON for {booking_ref} in page")
+    last_needle = payload.rfind(needle)
+
+    def decode_at(start: int):
+        obj_start = start + len('"booking":')
+        obj_end = _value_end(payload, obj_start)
+        found = payload.find(needle, obj_start, obj_end) != -1
+        obj = None
+        if found:
+            try:
+                obj = json.loads(payload[obj_start:obj_end])
+            except (json.JSONDecodeError, RecursionError):
+                # Malformed, or nested deeper than the decoder allows
+                pass
+        return obj, obj_end, found
+
+    # Usual layout: the booking's own "booking":{ is the nearest one before its ref
+    nearest = payload.rfind('"booking":{', 0, first_needle)
+    if nearest != -1:
+        try:
+            obj, _, found = decode_at(nearest)
+        except HovnHttpScrapeError:
+            found = False
+        if found and isinstance(obj, dict):
+            return _cleaned(obj, booking_ref)
+
+    pos = 0
+    while True:
+        start = payload.find('"booking":{', pos)
+        if start == -1 or start > last_needle:
+            break
+        # An unterminated opener swallows the rest of the page: give up
+        obj, obj_end, found = decode_at(start)
+        if found:
+            if not isinstance(obj, dict):
+                raise HovnHttpScrapeError(f"booking JSON for {booking_ref} did not decode")
+            return _cleaned(obj, booking_ref)
+        pos = obj_end
+
+    raise HovnHttpScrapeError(f"no booking JSON for {booking_ref} in page")
+
+
+# ------------------------------------------------------
+# MAPPING (Hovn booking JSON -> scraper bundle)
+# ------------------------------------------------------
+
+def _dict(v: Any) -> Dict[str, Any]:
+    # Flight sometimes leaves nested objects as "$2:props:..." references
+    return v if isinstance(v, dict) else {}
+
+
+def _first(*values: Any) -> Any:
+    for v in values:
+        if v not in (None, ""):
+            return v
+    return None
+
+
+def _person_name(p: Dict[str, Any]) -> Optional[str]:
+    name = " ".join(x for x in (p.get("firstName"), p.get("lastName")) if x)
+    return _first(name, p.get("name"), p.get("fullName"))
+
+
+def _money_text(v: Any) -> Optional[str]:
+    """Hovn stores prices as integer cents; the Playwright path saw "$95.00"."""
+    if v is None:
+        return None
+    if isinstance(v, (int, float)):
+        return f"${v / 100:.2f}"
+    return str(v)
+
+
+def _address_line(loc: Dict[str, Any]) -> Optional[str]:
+    if loc.get("formattedAddress"):
+        return " ".join(str(loc["formattedAddress"]).split())
+    street = " ".join(x for x in (loc.get("address1"), loc.get("address2")) if x)
+    city = loc.get("city")
+    state_zip = " ".join(x for x in (loc.get("state"), loc.get("postalCode")) if x)
+    if not (street or city or state_zip):
+        return None
+    # Same shape normalize._parse_address() expects: "2331 Willow Rd Glenview, IL 60025"
+    tail = ", ".join(x for x in (city, state_zip) if x)
+    return " ".join(x for x in (street, tail) if x)
+
+
+def bundle_from_booking_json(booking_ref: str, b: Dict[str, Any], slug: str = HOVN_PROVIDER_SLUG) -> Dict[str, Any]:
+    student = _dict(b.get("student"))
+    item = _dict(b.get("courseOrderItem"))
+    order = _dict(item.get("order"))
+    cs = _dict(b.get("courseSession"))
+    course = _dict(cs.get("course"))
+    location = _dict(cs.get("location"))
+    instructor = _dict(_first(cs.get("instructor"), cs.get("instructorUser"), cs.get("leadInstructor")))
+    agency = _dict(_first(course.get("agency"), course.get("certifyingBody"), cs.get("agency")))
+
+    session_id = _first(cs.get("id"), b.get("courseSessionId"))
+    order_id = _first(item.get("orderId"), order.get("id"))
+    session_url = (
+        SESSION_URL_TEMPLATE.format(slug=slug, session_id=session_id) if session_id is not None else None
+    )
+
+    booking = {
+        "booking_ref": b.get("referenceNumber") or booking_ref,
+        "student_name": _person_name(student),
+        "student_email": student.get("email"),
+        "student_phone": student.get("phoneNumber"),
+        "student_id": str(student["id"]) if student.get("id") is not None else None,
+        "order_number": order.get("referenceNumber"),
+        "order_status": order.get("status"),
+        "order_datetime": _first(order.get("paidAt"), order.get("createdAt"), b.get("createdAt")),
+        "order_total": _money_text(_first(order.get("totalPrice"), item.get("price"))),
+        "session_address": _address_line(location),
+        "order_id": str(order_id) if order_id is not None else None,
+        "session_url": session_url,
+    }
+
+    session = {
+        "course_name": _first(course.get("name"), cs.get("name")),
+        "format": _first(cs.get("format"), course.get("format"), cs.get("modality")),
+        "agency": _first(agency.get("name"), agency.get("label")),
+        "session_date_iso": cs.get("startsAt"),
+        "location_name": _first(location.get("label"), location.get("name")),
+        "instructor_name": _person_name(instructor) if instructor else None,
+        # The ID the session page shows (what the Playwright path stores as
+        # hovn_session_id), not the numeric row id used in the session URL.
+        # Missing -> required field missing -> Playwright fallback, so one
+        # class never gets two Session rows.
+        "session_id_text": cs.get("referenceNumber"),
+    }
+
+    return {
+        "booking_ref": booking_ref,
+        "booking_url": BOOKING_URL_TEMPLATE.format(slug=slug, ref=booking_ref),
+        "booking": booking,
+        "session": session,
+    }
+
+
+def missing_fields(bundle: Dict[str, Any]) -> List[str]:
+    return [f"{part}.{field}" for part, field in REQUIRED_FIELDS if not (bundle.get(part) or {}).get(field)]
+
+
+def parse_booking_page(html: str, booking_ref: str) -> Dict[str, Any]:
+    """Booking page HTML -> scraper bundle. Raises HovnHttpScrapeError if incomplete."""
+    booking = find_booking(parse_flight(html), booking_ref)
+    if booking is not None:
+        try:
+            booking_json = booking.to_python()
+        except RecursionError:
+            raise HovnHttpScrapeError(f"booking JSON for {booking_ref} is nested too deeply") from None
+    else:
+        # Not in any decodable row (e.g. a truncated stream): scan the text
+        booking_json = find_booking_json(flight_payload(html), booking_ref)
+    bundle = bundle_from_booking_json(booking_ref, booking_json)
+    missing = missing_fields(bundle)
+    if missing:
+        raise HovnHttpScrapeError(f"booking page for {booking_ref} is missing {', '.join(missing)}")
+    return bundle
+
+
+# ------------------------------------------------------
+# FETCH
+# ------------------------------------------------------
+
+def scrape_booking_http(booking_ref: str, transport: PooledTransport = HOVN_TRANSPORT) -> Dict[str, Any]:
+    if not HOVN_SESSION_COOKIE:
+        raise HovnHttpScrapeError("HOVN_SESSION_COOKIE is not set")
+
+    url = BOOKING_URL_TEMPLATE.format(slug=HOVN_PROVIDER_SLUG, ref=booking_ref)
+    resp = transport.get(url, allow_redirects=False)
+
+    # Expired cookie -> redirect to the login page
+    if resp.status_code in (301, 302, 303, 307, 308, 401, 403):
+        raise HovnHttpScrapeError(f"Hovn returned {resp.status_code} for {url} (cookie expired?)")
+    if resp.status_code != 200:
+        raise HovnHttpScrapeError(f"Hovn returned {resp.status_code} for {url}")
+
+    if raw_archive.RAW_ARCHIVE_ENABLED:
+        raw_archive.capture(
+            raw_archive.HOVN_ADMIN_BOOKING_HTML, url, resp.text, key=booking_ref, status=resp.status_code
+        )
+
+    bundle = parse_booking_page(resp.text, booking_ref)
+    print(f"[SCRAPER] HTTP scrape OK for {booking_ref}")
+    return bundle
@@ -0,0 +1,269 @@
+# hovn_incremental.py
+# -------------------
+# Incremental Hovn sync: instead of an explicit refs.txt, walk the admin
+# bookings listing newest-first and only pick up bookings whose updatedAt
+# is past the last persisted watermark (sync_state row "hovn_bookings").
+#
+#   state = load_sync_state(db)
+#   entries, stats = walk_listing(state.watermark, start_page=state.resume_page or 1)
+#   ... scrape + persist entries ...
+#   watermark, resume = settle_watermark(state.watermark, entries, failed_refs, stats, resume_of(state))
+#   save_watermark(db, watermark, stats, resume)
+#
+# The watermark only moves past bookings that were persisted: if one
+# fails, it stops just before that booking's updatedAt so the next run
+# picks it (and anything newer) up again. Re-ingesting a booking is an
+# idempotent upsert, so overlap is harmless; gaps are not.
+#
+# A walk that stops at HOVN_SYNC_MAX_PAGES has only seen the newest part
+# of what changed, so the watermark stays put and a resume cursor is
+# saved instead: the next run continues from the last page fetched (one
+# page of overlap, in case rows shifted) with the same cutoff. Once a
+# walk reaches the cutoff, the watermark jumps to what the whole chain of
+# runs ingested.
+#
+# The listing is expected newest-updated first (HOVN_BOOKINGS_LIST_URL
+# must sort by updatedAt desc). The walk stops at the first page with
+# nothing newer than the watermark, so a few out-of-order rows within a
+# page are still caught.
+
+import json
+import os
+from datetime import datetime, timedelta, timezone
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+import raw_archive
+from settings import HOVN_PROVIDER_SLUG
+
+HOVN_BOOKINGS_LIST_URL = os.getenv(
+    "HOVN_BOOKINGS_LIST_URL",
+    "https://www.hovn.app/admin/{slug}/bookings?page={page}&sortBy=updatedAt&sortOrder=desc",
+)
+
+# Safety cap on listing pages per run (a first run with no watermark walks everything)
+HOVN_SYNC_MAX_PAGES = int(os.getenv("HOVN_SYNC_MAX_PAGES", "200"))
+
+# Re-check bookings updated this many seconds before the watermark, for
+# writes that commit on Hovn's side after a later updatedAt was listed
+HOVN_SYNC_OVERLAP_SECONDS = float(os.getenv("HOVN_SYNC_OVERLAP_SECONDS", "0"))
+
+SYNC_STATE_NAME = "hovn_bookings"
+
+
+# ------------------------------------------------------
+# LISTING
+# ------------------------------------------------------
+
+def listing_url(page: int) -> str:
+    return HOVN_BOOKINGS_LIST_URL.format(slug=HOVN_PROVIDER_SLUG, page=page)
+
+
+def fetch_listing_page(page: int) -> str:
+    """Cookie-authenticated GET of one listing page over the shared Hovn transport."""
+    from hovn_http_scraper import HOVN_TRANSPORT, HovnHttpScrapeError
+    from settings import HOVN_SESSION_COOKIE
+
+    if not HOVN_SESSION_COOKIE:
+        raise HovnHttpScrapeError("HOVN_SESSION_COOKIE is not set")
+
+    url = listing_url(page)
+    resp = HOVN_TRANSPORT.get(url, allow_redirects=False)
+    if resp.status_code in (301, 302, 303, 307, 308, 401, 403):
+        raise HovnHttpScrapeError(f"Hovn returned {resp.status_code} for {url} (cookie expired?)")
+    if resp.status_code != 200:
+        raise HovnHttpScrapeError(f"Hovn returned {resp.status_code} for {url}")
+
+    if raw_archive.RAW_ARCHIVE_ENABLED:
+        raw_archive.capture(raw_archive.HOVN_BOOKINGS_LISTING, url, resp.text, key=url, status=resp.status_code)
+    return resp.text
+
+
+def parse_listing(html: str) -> List[Dict[str, Any]]:
+    """
+    Listing page -> [{"ref", "updated_at", "created_at"}] in page order.
+    Times are UTC datetimes; updated_at falls back to createdAt.
+    """
+    from hovn_next_parser import _normalize_booking_bundle
+    from next_flight import FlightList, parse_flight
+    from normalize import parse_iso_utc_and_local
+
+    doc = parse_flight(html)
+    entries: List[Dict[str, Any]] = []
+    seen = set()
+
+    for bookings in doc.find_all("bookings"):
+        if not isinstance(bookings, FlightList):
+            continue
+        for raw in bookings.to_python():
+            if not isinstance(raw, dict):
+                continue
+            booking = _normalize_booking_bundle(raw, None)["booking"]
+            ref = booking.get("booking_ref")
+            if not ref or ref in seen:
+                continue
+            seen.add(ref)
+            created, _ = parse_iso_utc_and_local(booking.get("created_at"))
+            updated, _ = parse_iso_utc_and_local(booking.get("updated_at"))
+            entries.append({"ref": ref, "updated_at": updated or created, "created_at": created})
+
+    return entries
+
+
+def walk_listing(
+    watermark: Optional[datetime],
+    fetch: Callable[[int], str] = fetch_listing_page,
+    max_pages: int = HOVN_SYNC_MAX_PAGES,
+    overlap_seconds: float = HOVN_SYNC_OVERLAP_SECONDS,
+    start_page: int = 1,
+) -> Tuple[List[Dict[str, Any]], Dict[str, Any]]:
+    """
+    Walk up to max_pages listing pages from start_page until a page has
+    nothing newer than `watermark` (or is empty). Returns (changed entries
+    newest first, stats). stats["hit_max_pages"] means the walk was cut
+    short; stats["last_page"] is the last page fetched.
+    """
+    cutoff = watermark - timedelta(seconds=overlap_seconds) if watermark else None
+    changed: Dict[str, Dict[str, Any]] = {}
+    stats = {
+        "start_page": start_page,
+        "last_page": None,
+        "pages": 0,
+        "listed": 0,
+        "changed": 0,
+        "unsorted_pages": 0,
+        "hit_max_pages": False,
+    }
+
+    for page in range(start_page, start_page + max_pages):
+        entries = parse_listing(fetch(page))
+        stats["pages"] += 1
+        stats["last_page"] = page
+        stats["listed"] += len(entries)
+        if not entries:
+            break
+
+        times = [e["updated_at"] for e in entries if e["updated_at"]]
+        if times != sorted(times, reverse=True):
+            stats["unsorted_pages"] += 1
+
+        fresh = [e for e in entries if e["updated_at"] is None or cutoff is None or e["updated_at"] > cutoff]
+        for e in fresh:
+            changed.setdefault(e["ref"], e)
+        if cutoff is not None and not fresh:
+            break
+    else:
+        stats["hit_max_pages"] = True
+
+    if stats["unsorted_pages"]:
+        print(f"[INCREMENTAL] {stats['unsorted_pages']} listing page(s) not sorted by updatedAt; check HOVN_BOOKINGS_LIST_URL")
+    if stats["hit_max_pages"]:
+        print(
+            f"[INCREMENTAL] stopped at HOVN_SYNC_MAX_PAGES={max_pages} (page {stats['last_page']}); "
+            f"the watermark is held and the next run resumes from there"
+        )
+
+    _epoch = datetime.min.replace(tzinfo=timezone.utc)
+    out = sorted(changed.values(), key=lambda e: e["updated_at"] or _epoch, reverse=True)
+    stats["changed"] = len(out)
+    return out, stats
+
+
+# ------------------------------------------------------
+# WATERMARK
+# ------------------------------------------------------
+
+def advance_watermark(
+    watermark: Optional[datetime],
+    entries: Iterable[Dict[str, Any]],
+    failed_refs: Iterable[str],
+) -> Optional[datetime]:
+    """
+    Newest updatedAt such that every entry at or before it was ingested.
+    Never moves backwards.
+    """
+    entries = list(entries)
+    failed = set(failed_refs)
+    dated = sorted((e for e in entries if e["updated_at"]), key=lambda e: e["updated_at"])
+    # An undated failure can't be placed on the timeline; hold everything
+    if any(e["ref"] in failed and not e["updated_at"] for e in entries):
+        return watermark
+
+    new = watermark
+    for e in dated:
+        if e["ref"] in failed:
+            # Ties with the failure must be re-read too
+            if new is not None and new >= e["updated_at"]:
+                new = e["updated_at"] - timedelta(microseconds=1)
+            break
+        if new is None or e["updated_at"] > new:
+            new = e["updated_at"]
+
+    if watermark is not None and (new is None or new < watermark):
+        return watermark
+    return new
+
+
+def settle_watermark(
+    watermark: Optional[datetime],
+    entries: Iterable[Dict[str, Any]],
+    failed_refs: Iterable[str],
+    stats: Dict[str, Any],
+    resume: Optional[Dict[str, Any]] = None,
+) -> Tuple[Optional[datetime], Optional[Dict[str, Any]]]:
+    """
+    (watermark, resume cursor) to save after one walk_listing run.
+
+    `resume` is the cursor the run started from ({"page", "watermark"}, or
+    None for a walk from page 1). A cut-short walk keeps `watermark` and
+    returns a cursor; a finished one returns the watermark the whole chain
+    earned and None. The chain's watermark is set by its first (newest)
+    run and only ever lowered by failures in later, older runs.
+    """
+    entries = list(entries)
+    failed = set(failed_refs)
+    earned = advance_watermark(watermark, entries, failed)
+
+    if resume is None:
+        target = earned
+    elif any(e["ref"] in failed for e in entries):
+        target = resume["watermark"]
+        target = None if target is None or earned is None else min(target, earned)
+    else:
+        target = resume["watermark"]
+
+    if stats.get("hit_max_pages"):
+        return watermark, {"page": stats["last_page"], "watermark": target}
+    return target, None
+
+
+def resume_of(state) -> Optional[Dict[str, Any]]:
+    if state.resume_page is None:
+        return None
+    return {"page": state.resume_page, "watermark": state.resume_watermark}
+
+
+def load_sync_state(db, name: str = SYNC_STATE_NAME):
+    """The SyncState row for `name` (created, uncommitted, if missing)."""
+    from models import SyncState
+
+    state = db.get(SyncState, name)
+    if state is None:
+        state = SyncState(name=name)
+        db.add(state)
+    return state
+
+
+def save_watermark(
+    db,
+    watermark: Optional[datetime],
+    stats: Dict[str, Any],
+    resume: Optional[Dict[str, Any]] = None,
+    name: str = SYNC_STATE_NAME,
+) -> None:
+    state = load_sync_state(db, name)
+    state.watermark = watermark
+    state.resume_page = resume["page"] if resume else None
+    state.resume_watermark = resume["watermark"] if resume else None
+    state.last_run_at = datetime.now(timezone.utc)
+    state.last_run_stats = json.dumps(stats, default=str)
+    db.commit()
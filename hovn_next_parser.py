@@ -19,6 +19,8 @@ import re
 import sys
 from typing import Any, Dict, List, Optional
 
+from next_flight import FlightList, parse_flight
+
 
 # ------------------------------
 # Low-level helpers
@@ -100,6 +102,65 @@ def _extract_array_block(html: str, key: str) -> str:
     return html[start_idx:end_idx + 1]
 
 
+def _clean_hovn_value(v: Any) -> Any:
+    if isinstance(v, str):
+        if v == "$undefined":
+            return None
+        if v.startswith("$D"):
+            return v[2:]
+    return v
+
+
+def _hovn_object_hook(obj: Dict[str, Any]) -> Dict[str, Any]:
+    # Same rewrites as _clean_hovn_json, applied to decoded values instead
+    # of regexes over the raw text. Nested dicts have already been hooked.
+    for k, v in obj.items():
+        if isinstance(v, str):
+            obj[k] = _clean_hovn_value(v)
+        elif isinstance(v, list):
+            obj[k] = [_clean_hovn_value(x) for x in v]
+    return obj
+
+
+_hovn_decoder = json.JSONDecoder(object_hook=_hovn_object_hook)
+
+
+def extract_arrays(html: str, keys) -> Dict[str, List[Any]]:
+    """
+    Find the first '"<key>":[' for every key in one left-to-right scan and
+    decode each array in place with JSONDecoder.raw_decode (C scanner, no
+    intermediate copies). Keys that are absent are left out of the result.
+
+    Falls back to the bracket walker + _clean_hovn_json for an array that
+    raw_decode rejects (e.g. a bare $undefined token).
+    """
+    wanted = list(dict.fromkeys(keys))
+    pattern = re.compile('"(' + "|".join(re.escape(k) for k in wanted) + ')":\\[')
+    out: Dict[str, List[Any]] = {}
+
+    pos = 0
+    while len(out) < len(wanted):
+        m = pattern.search(html, pos)
+        if m is None:
+            break
+        key = m.group(1)
+        start = m.end() - 1
+        if key in out:
+            # Later occurrence of a key we already have (e.g. nested)
+            pos = m.end()
+            continue
+        try:
+            value, end = _hovn_decoder.raw_decode(html, start)
+        except json.JSONDecodeError:
+            block = _extract_array_block(html[m.start():], key)
+            value = json.loads(_clean_hovn_json(block))
+            end = start + len(block)
+        out[key] = value
+        pos = end
+
+    return out
+
+
 def _load_html_from_file(path: str) -> str:
     with open(path, "r", encoding="utf-8") as f:
         return f.read()
@@ -114,17 +175,7 @@ def _parse_bookings_array(html: str) -> List[Dict[str, Any]]:
     Extract and parse the "bookings" array from a Hovn admin HTML page.
     Returns a list of booking dicts.
     """
-    raw_block = _extract_array_block(html, "bookings")
-    cleaned = _clean_hovn_json(raw_block)
-    try:
-        data = json.loads(cleaned)
-    except json.JSONDecodeError as e:
-        raise RuntimeError(f"Failed to decode bookings JSON: {e}\nSnippet: {cleaned[:500]}") from e
-
-    if not isinstance(data, list):
-        raise RuntimeError(f'Expected "bookings" to parse as list, got {type(data)}')
-
-    return data
+    return _parse_flight_arrays(html)[0]
 
 
 def _parse_classes_array(html: str) -> List[Dict[str, Any]]:
@@ -133,20 +184,46 @@ def _parse_classes_array(html: str) -> List[Dict[str, Any]]:
     from the same HTML. If not found, returns [].
     """
     try:
-        raw_block = _extract_array_block(html, "classes")
-    except RuntimeError:
+        classes = extract_arrays(html, ("classes",)).get("classes")
+    except (RuntimeError, json.JSONDecodeError):
+        # Not critical for basic booking parsing
         return []
+    return classes if isinstance(classes, list) else []
+
+
+def _parse_flight_arrays(html: str):
+    """
+    (bookings, classes) from one scan of the page. A missing or broken
+    "bookings" array raises; "classes" degrades to [].
+
+    The page is decoded as a Flight stream first (chunks split across
+    pushes and "$" row references handled); the flat-text extractor is the
+    fallback for pages that aren't.
+    """
+    doc = parse_flight(html)
+    bookings = doc.find_first("bookings")
+    if isinstance(bookings, FlightList):
+        classes = doc.find_first("classes")
+        return bookings.to_python(), classes.to_python() if isinstance(classes, FlightList) else []
 
-    cleaned = _clean_hovn_json(raw_block)
     try:
-        data = json.loads(cleaned)
-    except json.JSONDecodeError:
-        # Not critical for basic booking parsing
-        return []
+        arrays = extract_arrays(html, ("bookings", "classes"))
+    except (RuntimeError, json.JSONDecodeError) as e:
+        # Retry without classes in case that's the array that's broken
+        try:
+            arrays = extract_arrays(html, ("bookings",))
+        except (RuntimeError, json.JSONDecodeError):
+            raise RuntimeError(f"Failed to decode bookings JSON: {e}") from e
 
-    if isinstance(data, list):
-        return data
-    return []
+    if "bookings" not in arrays:
+        raise RuntimeError('Could not find a "bookings" array in HTML.')
+
+    bookings = arrays["bookings"]
+    if not isinstance(bookings, list):
+        raise RuntimeError(f'Expected "bookings" to parse as list, got {type(bookings)}')
+
+    classes = arrays.get("classes")
+    return bookings, classes if isinstance(classes, list) else []
 
 
 def _find_session_segment_for_booking(
@@ -296,8 +373,7 @@ def parse_session_html_for_booking(
 
     Raises RuntimeError if the booking cannot be found.
     """
-    bookings = _parse_bookings_array(html)
-    classes = _parse_classes_array(html)
+    bookings, classes = _parse_flight_arrays(html)
 
     target: Optional[Dict[str, Any]] = None
     for b in bookings:
@@ -317,6 +393,30 @@ def parse_session_html_for_booking(
     return bundle
 
 
+def parse_roster_html(html: str) -> List[Dict[str, Any]]:
+    """
+    Every booking on a Hovn session/order page, normalized the same way as
+    parse_session_html_for_booking (one bundle per booking, each with its
+    own class segment). The bookings and classes arrays are parsed once.
+    """
+    bookings, classes = _parse_flight_arrays(html)
+
+    segments: Dict[Any, Optional[Dict[str, Any]]] = {}
+    bundles: List[Dict[str, Any]] = []
+    for b in bookings:
+        if not isinstance(b, dict):
+            continue
+        course_session_id = b.get("courseSessionId")
+        if course_session_id not in segments:
+            segments[course_session_id] = (
+                _find_session_segment_for_booking(classes, course_session_id)
+                if course_session_id is not None else None
+            )
+        bundles.append(_normalize_booking_bundle(b, segments[course_session_id]))
+
+    return bundles
+
+
 # ------------------------------
 # CLI usage (for debugging)
 # ------------------------------
@@ -0,0 +1,241 @@
+#!/usr/bin/env python3
+# hovn_roster_ingest.py
+# ---------------------
+# Import a whole class roster from one Hovn admin session (or order) page.
+#
+# The page's Flight payload already carries every booking with its student
+# and order, plus the class segments; hovn_next_parser.parse_roster_html
+# turns that into one bundle per booking and this module upserts all of
+# them through normalized_pipeline's get_or_create_* helpers in a single
+# transaction. One HTTP fetch per session instead of one scrape per booking.
+#
+# Usage:
+#   python hovn_roster_ingest.py 1234                      # session id
+#   python hovn_roster_ingest.py https://www.hovn.app/admin/ne-thing-training/sessions/1234
+#   python hovn_roster_ingest.py --html session.html       # saved page, no fetch
+#   python hovn_roster_ingest.py 1234 --dry-run            # parse + print, no DB writes
+
+import argparse
+import json
+import sys
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy.exc import SQLAlchemyError
+
+import raw_archive
+from hovn_next_parser import parse_roster_html
+from settings import HOVN_PROVIDER_SLUG
+
+
+def session_url_for(session: str) -> str:
+    from hovn_http_scraper import SESSION_URL_TEMPLATE
+
+    if session.startswith("http"):
+        return session
+    return SESSION_URL_TEMPLATE.format(slug=HOVN_PROVIDER_SLUG, session_id=session)
+
+
+def fetch_roster_html(url: str) -> str:
+    """Cookie-authenticated GET over the shared Hovn transport."""
+    from hovn_http_scraper import HOVN_TRANSPORT, HovnHttpScrapeError
+    from settings import HOVN_SESSION_COOKIE
+
+    if not HOVN_SESSION_COOKIE:
+        raise HovnHttpScrapeError("HOVN_SESSION_COOKIE is not set")
+
+    resp = HOVN_TRANSPORT.get(url, allow_redirects=False)
+    if resp.status_code in (301, 302, 303, 307, 308, 401, 403):
+        raise HovnHttpScrapeError(f"Hovn returned {resp.status_code} for {url} (cookie expired?)")
+    if resp.status_code != 200:
+        raise HovnHttpScrapeError(f"Hovn returned {resp.status_code} for {url}")
+
+    if raw_archive.RAW_ARCHIVE_ENABLED:
+        raw_archive.capture(raw_archive.HOVN_ROSTER_HTML, url, resp.text, key=url, status=resp.status_code)
+    return resp.text
+
+
+# ------------------------------------------------------
+# PERSIST
+# ------------------------------------------------------
+
+def _full_name(student: Dict[str, Any]) -> Optional[str]:
+    name = " ".join(x for x in (student.get("first_name"), student.get("last_name")) if x)
+    return name or None
+
+
+def _address_raw(session: Dict[str, Any]) -> Optional[str]:
+    # Comma separated so normalize.parse_address_block splits it reliably
+    location = session.get("location") or {}
+    if location.get("formattedAddress"):
+        return location["formattedAddress"]
+    street = " ".join(x for x in (location.get("address1"), location.get("address2")) if x)
+    state_zip = " ".join(x for x in (session.get("state"), session.get("postal_code")) if x)
+    parts = [x for x in (street, session.get("city"), state_zip) if x]
+    return ", ".join(parts) or None
+
+
+def _course_info(raw: Dict[str, Any]):
+    # Only present when the page embeds the course on the booking
+    cs = raw.get("courseSession") if isinstance(raw.get("courseSession"), dict) else {}
+    course = cs.get("course") if isinstance(cs.get("course"), dict) else {}
+    agency = course.get("agency") if isinstance(course.get("agency"), dict) else {}
+    return course.get("name"), course.get("format") or cs.get("format"), agency.get("name")
+
+
+def ingest_roster_bundles(db, bundles: List[Dict[str, Any]]) -> Dict[str, int]:
+    """
+    Upsert every bundle on `db` without committing. Bookings with no
+    reference, session or order id are skipped (counted in "skipped").
+    """
+    from hovn_http_scraper import SESSION_URL_TEMPLATE
+    from normalized_pipeline import (
+        get_or_create_agency,
+        get_or_create_course,
+        get_or_create_location,
+        get_or_create_student,
+        get_or_create_session,
+        get_or_create_order,
+        get_or_create_booking,
+    )
+
+    stats = {"bookings": 0, "skipped": 0}
+    sessions: Dict[str, Any] = {}
+    students, orders = set(), set()
+
+    for bundle in bundles:
+        booking = bundle["booking"]
+        student_data = bundle["student"]
+        session_data = bundle["session"]
+        invoice = bundle["invoice"]
+
+        ref = booking.get("booking_ref")
+        hovn_session_id = session_data.get("course_session_id")
+        hovn_order_id = invoice.get("hovn_order_id")
+        if not ref or hovn_session_id is None or hovn_order_id is None:
+            print(f"[ROSTER] skipping booking {ref or booking.get('hovn_booking_id')}: missing ref/session/order id")
+            stats["skipped"] += 1
+            continue
+        hovn_session_id = str(hovn_session_id)
+
+        student = get_or_create_student(
+            db=db,
+            hovn_student_id=str(student_data["hovn_student_id"]) if student_data.get("hovn_student_id") is not None else None,
+            full_name=_full_name(student_data),
+            email=student_data.get("email"),
+            phone_raw=student_data.get("phone"),
+        )
+        students.add(student.id)
+
+        session = sessions.get(hovn_session_id)
+        if session is None:
+            course_name, fmt, agency_name = _course_info(bundle.get("raw") or {})
+            agency = get_or_create_agency(db, agency_name)
+            session = get_or_create_session(
+                db=db,
+                hovn_session_id=hovn_session_id,
+                course=get_or_create_course(db, course_name, fmt, agency),
+                agency=agency,
+                location=get_or_create_location(db, session_data.get("location_label"), _address_raw(session_data)),
+                instructor=None,
+                session_start_iso=session_data.get("starts_at"),
+                session_url=SESSION_URL_TEMPLATE.format(slug=HOVN_PROVIDER_SLUG, session_id=hovn_session_id),
+            )
+            sessions[hovn_session_id] = session
+
+        order = get_or_create_order(
+            db=db,
+            hovn_order_id=str(hovn_order_id),
+            hovn_order_number=invoice.get("order_reference"),
+            student=student,
+            order_datetime_iso=invoice.get("paid_at") or invoice.get("created_at"),
+            amount_str=invoice.get("total_price"),
+            status=invoice.get("status"),
+        )
+        orders.add(order.id)
+
+        get_or_create_booking(
+            db=db,
+            hovn_booking_ref=ref,
+            student=student,
+            session=session,
+            order=order,
+            status=booking.get("status") or "active",
+        )
+        stats["bookings"] += 1
+
+    stats["students"] = len(students)
+    stats["orders"] = len(orders)
+    stats["sessions"] = len(sessions)
+    return stats
+
+
+def ingest_roster_html(html: str) -> Dict[str, int]:
+    """Parse one session/order page and upsert the whole roster in one transaction."""
+    from db import SessionLocal
+
+    bundles = parse_roster_html(html)
+    db = SessionLocal()
+    try:
+        stats = ingest_roster_bundles(db, bundles)
+        db.commit()
+    except SQLAlchemyError as e:
+        db.rollback()
+        print("[ROSTER] Database error:", e)
+        raise
+    except Exception as e:
+        db.rollback()
+        print("[ROSTER] Error:", e)
+        raise
+    finally:
+        db.close()
+
+    print(
+        f"[ROSTER] upserted {stats['bookings']} bookings ({stats['students']} students, "
+        f"{stats['orders']} orders, {stats['sessions']} sessions), {stats['skipped']} skipped"
+    )
+    return stats
+
+
+def ingest_session(session: str) -> Dict[str, int]:
+    """Session id or admin session URL -> fetch once, ingest the roster."""
+    url = session_url_for(session)
+    print(f"[ROSTER] Fetching {url}")
+    return ingest_roster_html(fetch_roster_html(url))
+
+
+# ------------------------------------------------------
+# CLI
+# ------------------------------------------------------
+
+def main():
+    ap = argparse.ArgumentParser(description="Import every booking on a Hovn session/order page.")
+    ap.add_argument("session", nargs="?", help="Hovn session id or admin session/order URL")
+    ap.add_argument("--html", help="read a saved page instead of fetching")
+    ap.add_argument("--dry-run", action="store_true", help="parse and print the bundles, don't write to the DB")
+    args = ap.parse_args()
+
+    if not args.session and not args.html:
+        ap.error("pass a session id/URL or --html")
+
+    if args.html:
+        with open(args.html, encoding="utf-8") as f:
+            html = f.read()
+    else:
+        html = fetch_roster_html(session_url_for(args.session))
+
+    if args.dry_run:
+        bundles = parse_roster_html(html)
+        for b in bundles:
+            b.pop("raw", None)
+        print(json.dumps(bundles, indent=2, default=str))
+        print(f"[ROSTER] {len(bundles)} bookings parsed (dry run)")
+        return
+
+    try:
+        ingest_roster_html(html)
+    except Exception:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,12 +1,44 @@
 import os
 import sys
 import json
-from urllib.parse import urljoin
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from urllib.parse import urljoin, urlsplit
 
 from playwright.sync_api import sync_playwright, TimeoutError as PlaywrightTimeoutError
 
+import raw_archive
+from session_cache import SessionPageCache
+
 EDGE_CDP_URL = os.getenv("EDGE_CDP_URL", "http://127.0.0.1:9222")
 
+# "http" (default): cookie GET + Flight JSON (hovn_http_scraper), falling back
+# to the browser if that fails. "playwright": always drive Edge over CDP.
+HOVN_SCRAPER_BACKEND = os.getenv("HOVN_SCRAPER_BACKEND", "http").lower()
+
+# "evaluate" (default): wait once for the page to render, then read every
+# XPath in a single page.evaluate. "locator": one locator wait per field.
+HOVN_EXTRACT_MODE = os.getenv("HOVN_EXTRACT_MODE", "evaluate").lower()
+
+# Request interception on the tabs we open (never the whole Edge context):
+#   "strict" (default): abort images, media, fonts and non-Hovn hosts
+#   "assets": abort images, media and fonts only
+#   "off":    let everything through
+HOVN_BLOCK_PROFILE = os.getenv("HOVN_BLOCK_PROFILE", "strict").lower()
+
+# Hosts (and their subdomains) "strict" still allows, comma separated
+HOVN_ALLOWED_HOSTS = [
+    h.strip().lower() for h in os.getenv("HOVN_ALLOWED_HOSTS", "hovn.app").split(",") if h.strip()
+]
+
+# goto() wait condition. The extractors then wait for their ready XPath, so
+# "domcontentloaded" is enough; "networkidle" is the old behaviour.
+HOVN_WAIT_UNTIL = os.getenv("HOVN_WAIT_UNTIL", "domcontentloaded")
+
+# Parallel HTTP scrapes for batch runs (the Hovn transport still rate limits)
+HOVN_HTTP_CONCURRENCY = int(os.getenv("HOVN_HTTP_CONCURRENCY", "4"))
+
 BOOKING_BASE_URL = "https://www.hovn.app/admin/ne-thing-training/bookings/"
 SESSION_BASE_URL = "https://www.hovn.app"
 
@@ -41,10 +73,103 @@ SESSION_XPATHS = {
 }
 
 
-def _get_text(page, xpath: str) -> str | None:
+# How long to wait for each XPath on a live page
+XPATH_TIMEOUT_MS = 15000
+
+# Archived HTML is already fully rendered: anything missing is just missing
+ARCHIVED_XPATH_TIMEOUT_MS = 250
+
+
+# ------------------------------------------------------
+# PAGE LOAD TUNING
+# ------------------------------------------------------
+
+BLOCK_PROFILES = {
+    "off": (frozenset(), False),
+    "assets": (frozenset({"image", "media", "font"}), False),
+    "strict": (frozenset({"image", "media", "font"}), True),
+}
+
+
+def _host_allowed(url: str) -> bool:
+    host = (urlsplit(url).hostname or "").lower()
+    if not host:
+        # data:, blob: etc.
+        return True
+    return any(host == h or host.endswith("." + h) for h in HOVN_ALLOWED_HOSTS)
+
+
+def should_block(url: str, resource_type: str, profile: str = HOVN_BLOCK_PROFILE) -> bool:
+    types, first_party_only = BLOCK_PROFILES.get(profile, BLOCK_PROFILES["off"])
+    if resource_type in types:
+        return True
+    return first_party_only and not _host_allowed(url)
+
+
+class PageTimings:
+    """Per-page latency samples for the Playwright paths, by phase."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.samples: dict[str, list[float]] = {}
+        self.blocked = 0
+
+    def record(self, phase: str, seconds: float) -> None:
+        with self._lock:
+            self.samples.setdefault(phase, []).append(seconds)
+
+    def count_blocked(self) -> None:
+        with self._lock:
+            self.blocked += 1
+
+    def reset(self) -> None:
+        with self._lock:
+            self.samples = {}
+            self.blocked = 0
+
+    def summary(self) -> dict:
+        with self._lock:
+            out = {"blocked_requests": self.blocked}
+            for phase, values in self.samples.items():
+                v = sorted(values)
+                out[phase] = {
+                    "n": len(v),
+                    "mean_ms": round(sum(v) / len(v) * 1000, 1),
+                    "p50_ms": round(v[len(v) // 2] * 1000, 1),
+                    "p95_ms": round(v[min(len(v) - 1, int(len(v) * 0.95))] * 1000, 1),
+                    "max_ms": round(v[-1] * 1000, 1),
+                }
+            return out
+
+
+PAGE_TIMINGS = PageTimings()
+
+
+def install_resource_blocking(page, profile: str = HOVN_BLOCK_PROFILE, timings: PageTimings = PAGE_TIMINGS) -> None:
+    if profile == "off":
+        return
+
+    def handler(route):
+        req = route.request
+        if should_block(req.url, req.resource_type, profile):
+            timings.count_blocked()
+            route.abort()
+        else:
+            route.continue_()
+
+    page.route("**/*", handler)
+
+
+def _timed_goto(page, url: str, phase: str, wait_until: str, timings: PageTimings = PAGE_TIMINGS) -> None:
+    t0 = time.perf_counter()
+    page.goto(url, wait_until=wait_until, timeout=60000)
+    timings.record(phase, time.perf_counter() - t0)
+
+
+def _get_text(page, xpath: str, timeout: int = XPATH_TIMEOUT_MS) -> str | None:
     try:
         el = page.locator(f"xpath={xpath}")
-        el.wait_for(timeout=15000)
+        el.wait_for(timeout=timeout)
         return el.inner_text().strip()
     except PlaywrightTimeoutError:
         return None
@@ -52,10 +177,10 @@ def _get_text(page, xpath: str) -> str | None:
         return None
 
 
-def _get_attr(page, xpath: str, attr: str) -> str | None:
+def _get_attr(page, xpath: str, attr: str, timeout: int = XPATH_TIMEOUT_MS) -> str | None:
     try:
         el = page.locator(f"xpath={xpath}")
-        el.wait_for(timeout=15000)
+        el.wait_for(timeout=timeout)
         val = el.get_attribute(attr)
         if val is None:
             return None
@@ -87,75 +212,196 @@ def _clean_instructor_name(raw: str | None) -> str | None:
     return raw.split("\n", 1)[0].strip()
 
 
-def _extract_booking(page) -> dict:
-    data: dict[str, str | None] = {}
+# ------------------------------------------------------
+# FIELD TABLE (shared by the locator, evaluate and pool paths)
+# ------------------------------------------------------
+
+# Raw field -> [xpath, attribute or None for the element's text]. Email and
+# phone are read both ways because the href wins only if it has the prefix.
+BOOKING_FIELDS = {
+    "bookingRef": [BOOKING_XPATHS["bookingRef"], None],
+    "name": [BOOKING_XPATHS["name"], None],
+    "emailHref": [BOOKING_XPATHS["email"], "href"],
+    "emailText": [BOOKING_XPATHS["email"], None],
+    "phoneHref": [BOOKING_XPATHS["phone"], "href"],
+    "phoneText": [BOOKING_XPATHS["phone"], None],
+    "studentID": [BOOKING_XPATHS["studentID"], "href"],
+    "orderNum": [BOOKING_XPATHS["orderNum"], None],
+    "orderStatus": [BOOKING_XPATHS["orderStatus"], None],
+    "orderDate": [BOOKING_XPATHS["orderDate"], "datetime"],
+    "orderTotal": [BOOKING_XPATHS["orderTotal"], None],
+    "sessionAddress": [BOOKING_XPATHS["sessionAddress"], None],
+    "orderID": [BOOKING_XPATHS["orderID"], "href"],
+    "sessionLink": [SESSION_LINK_XPATH, "href"],
+}
 
-    data["booking_ref"] = _get_text(page, BOOKING_XPATHS["bookingRef"])
-    data["student_name"] = _get_text(page, BOOKING_XPATHS["name"])
+SESSION_FIELDS = {
+    "courseName": [SESSION_XPATHS["courseName"], None],
+    "format": [SESSION_XPATHS["format"], None],
+    "agency": [SESSION_XPATHS["agency"], None],
+    "date": [SESSION_XPATHS["date"], "datetime"],
+    "locationName": [SESSION_XPATHS["locationName"], None],
+    "instructor": [SESSION_XPATHS["instructor"], None],
+    "sessionID": [SESSION_XPATHS["sessionID"], None],
+}
 
-    # email from href or visible text
-    email_href = _get_attr(page, BOOKING_XPATHS["email"], "href")
-    if email_href and email_href.lower().startswith("mailto:"):
-        data["student_email"] = email_href.split(":", 1)[1]
-    else:
-        data["student_email"] = _get_text(page, BOOKING_XPATHS["email"])
+# Once this element exists the page has rendered; everything else is read
+# in the same pass and anything absent is reported missing straight away.
+BOOKING_READY_XPATH = BOOKING_XPATHS["bookingRef"]
+SESSION_READY_XPATH = SESSION_XPATHS["courseName"]
+
+# Resolves every field in one page.evaluate (innerText matches what
+# locator.inner_text() returned in the per-field path).
+EXTRACT_FIELDS_JS = """
+(fields) => {
+  const out = {};
+  for (const [name, [xpath, attr]] of Object.entries(fields)) {
+    const node = document.evaluate(
+      xpath, document, null, XPathResult.FIRST_ORDERED_NODE_TYPE, null
+    ).singleNodeValue;
+    let value = null;
+    if (node) {
+      value = attr ? node.getAttribute(attr) : (node.innerText ?? node.textContent);
+    }
+    out[name] = value == null ? null : value.trim();
+  }
+  return out;
+}
+"""
 
-    # phone from tel: href or text
-    phone_href = _get_attr(page, BOOKING_XPATHS["phone"], "href")
-    if phone_href and phone_href.lower().startswith("tel:"):
-        data["student_phone"] = phone_href.split(":", 1)[1]
-    else:
-        data["student_phone"] = _get_text(page, BOOKING_XPATHS["phone"])
 
-    # student id: only last segment, no text key
-    student_href = _get_attr(page, BOOKING_XPATHS["studentID"], "href")
-    data["student_id"] = _last_path_segment(student_href)
+# Text fields only used when the href before them lacks its scheme
+TEXT_FALLBACKS = {
+    "emailText": ("emailHref", "mailto:"),
+    "phoneText": ("phoneHref", "tel:"),
+}
 
-    data["order_number"] = _get_text(page, BOOKING_XPATHS["orderNum"])
-    data["order_status"] = _get_text(page, BOOKING_XPATHS["orderStatus"])
 
-    # use datetime attribute for full ISO timestamp
-    data["order_datetime"] = _get_attr(page, BOOKING_XPATHS["orderDate"], "datetime")
+def _has_scheme(href: str | None, scheme: str) -> bool:
+    return bool(href) and href.lower().startswith(scheme)
 
-    data["order_total"] = _get_text(page, BOOKING_XPATHS["orderTotal"])
 
-    # normalize address to single line
-    session_address_raw = _get_text(page, BOOKING_XPATHS["sessionAddress"])
-    data["session_address"] = _normalize_address(session_address_raw)
+def field_needed(name: str, raw: dict) -> bool:
+    """False for a text fallback whose href (read earlier) already has the value."""
+    if name not in TEXT_FALLBACKS:
+        return True
+    href_field, scheme = TEXT_FALLBACKS[name]
+    return not _has_scheme(raw.get(href_field), scheme)
 
-    # order_id: only last segment, no *_text key
-    order_id_href = _get_attr(page, BOOKING_XPATHS["orderID"], "href")
-    data["order_id"] = _last_path_segment(order_id_href)
 
-    # session page link
-    session_link = _get_attr(page, SESSION_LINK_XPATH, "href")
-    if session_link:
-        if session_link.startswith("http"):
-            data["session_url"] = session_link
-        else:
-            data["session_url"] = urljoin(SESSION_BASE_URL, session_link)
-    else:
-        data["session_url"] = None
+def _href_or_text(href: str | None, text: str | None, scheme: str) -> str | None:
+    if _has_scheme(href, scheme):
+        return href.split(":", 1)[1]
+    return text
 
-    return data
 
+def _session_url(link: str | None) -> str | None:
+    if not link:
+        return None
+    return link if link.startswith("http") else urljoin(SESSION_BASE_URL, link)
 
-def _extract_session(page) -> dict:
-    data: dict[str, str | None] = {}
 
-    data["course_name"] = _get_text(page, SESSION_XPATHS["courseName"])
-    data["format"] = _get_text(page, SESSION_XPATHS["format"])
-    data["agency"] = _get_text(page, SESSION_XPATHS["agency"])
+def booking_from_raw(raw: dict) -> dict:
+    """BOOKING_FIELDS values -> booking dict (every extraction path ends here)."""
+    return {
+        "booking_ref": raw.get("bookingRef"),
+        "student_name": raw.get("name"),
+        "student_email": _href_or_text(raw.get("emailHref"), raw.get("emailText"), "mailto:"),
+        "student_phone": _href_or_text(raw.get("phoneHref"), raw.get("phoneText"), "tel:"),
+        "student_id": _last_path_segment(raw.get("studentID")),
+        "order_number": raw.get("orderNum"),
+        "order_status": raw.get("orderStatus"),
+        "order_datetime": raw.get("orderDate"),
+        "order_total": raw.get("orderTotal"),
+        "session_address": _normalize_address(raw.get("sessionAddress")),
+        "order_id": _last_path_segment(raw.get("orderID")),
+        "session_url": _session_url(raw.get("sessionLink")),
+    }
 
-    # only keep one ISO field (using the date <time> element's datetime)
-    data["session_date_iso"] = _get_attr(page, SESSION_XPATHS["date"], "datetime")
 
-    data["location_name"] = _get_text(page, SESSION_XPATHS["locationName"])
-    data["instructor_name"] = _clean_instructor_name(
-        _get_text(page, SESSION_XPATHS["instructor"])
-    )
-    data["session_id_text"] = _get_text(page, SESSION_XPATHS["sessionID"])
+def session_from_raw(raw: dict) -> dict:
+    """SESSION_FIELDS values -> session dict (every extraction path ends here)."""
+    return {
+        "course_name": raw.get("courseName"),
+        "format": raw.get("format"),
+        "agency": raw.get("agency"),
+        "session_date_iso": raw.get("date"),
+        "location_name": raw.get("locationName"),
+        "instructor_name": _clean_instructor_name(raw.get("instructor")),
+        "session_id_text": raw.get("sessionID"),
+    }
 
+
+# ------------------------------------------------------
+# PER-FIELD LOCATOR EXTRACTION (HOVN_EXTRACT_MODE=locator)
+# ------------------------------------------------------
+
+def read_field_locator(page, field: list, timeout: int = XPATH_TIMEOUT_MS) -> str | None:
+    xpath, attr = field
+    return _get_attr(page, xpath, attr, timeout) if attr else _get_text(page, xpath, timeout)
+
+
+def read_fields_locator(page, fields: dict, timeout: int = XPATH_TIMEOUT_MS) -> dict:
+    """Same raw dict as EXTRACT_FIELDS_JS, one locator wait per field."""
+    raw: dict[str, str | None] = {}
+    for name, field in fields.items():
+        raw[name] = read_field_locator(page, field, timeout) if field_needed(name, raw) else None
+    return raw
+
+
+def _extract_booking_locator(page, timeout: int = XPATH_TIMEOUT_MS) -> dict:
+    return booking_from_raw(read_fields_locator(page, BOOKING_FIELDS, timeout))
+
+
+def _extract_session_locator(page, timeout: int = XPATH_TIMEOUT_MS) -> dict:
+    return session_from_raw(read_fields_locator(page, SESSION_FIELDS, timeout))
+
+
+# ------------------------------------------------------
+# SINGLE-ROUNDTRIP EXTRACTION
+# ------------------------------------------------------
+
+def missing_keys(data: dict) -> list[str]:
+    return [k for k, v in data.items() if v is None]
+
+
+def _wait_ready(page, xpath: str, timeout: int) -> bool:
+    try:
+        page.locator(f"xpath={xpath}").first.wait_for(timeout=timeout)
+        return True
+    except PlaywrightTimeoutError:
+        return False
+
+
+def extract_booking(page, timeout: int = XPATH_TIMEOUT_MS) -> tuple[dict, list[str]]:
+    """One readiness wait + one evaluate. Returns (booking dict, missing keys)."""
+    _wait_ready(page, BOOKING_READY_XPATH, timeout)
+    data = booking_from_raw(page.evaluate(EXTRACT_FIELDS_JS, BOOKING_FIELDS))
+    return data, missing_keys(data)
+
+
+def extract_session(page, timeout: int = XPATH_TIMEOUT_MS) -> tuple[dict, list[str]]:
+    """One readiness wait + one evaluate. Returns (session dict, missing keys)."""
+    _wait_ready(page, SESSION_READY_XPATH, timeout)
+    data = session_from_raw(page.evaluate(EXTRACT_FIELDS_JS, SESSION_FIELDS))
+    return data, missing_keys(data)
+
+
+def _extract_booking(page, timeout: int = XPATH_TIMEOUT_MS) -> dict:
+    if HOVN_EXTRACT_MODE == "locator":
+        return _extract_booking_locator(page, timeout)
+    data, missing = extract_booking(page, timeout)
+    if missing:
+        print(f"[SCRAPER] booking page missing: {', '.join(missing)}")
+    return data
+
+
+def _extract_session(page, timeout: int = XPATH_TIMEOUT_MS) -> dict:
+    if HOVN_EXTRACT_MODE == "locator":
+        return _extract_session_locator(page, timeout)
+    data, missing = extract_session(page, timeout)
+    if missing:
+        print(f"[SCRAPER] session page missing: {', '.join(missing)}")
     return data
 
 
@@ -184,26 +430,89 @@ def attach_to_edge(playwright):
     return browser, context, page
 
 
-def scrape_booking_and_session(booking_ref: str) -> dict:
+def _archive_page(page, source: str, booking_ref: str) -> str | None:
+    # Rendered DOM (not the network response) so replay sees what the XPaths saw
+    if raw_archive.RAW_ARCHIVE_ENABLED:
+        return raw_archive.capture(source, page.url, page.content(), key=booking_ref)
+    return None
+
+
+def extract_from_archived_html(page, booking_ref: str, booking_html: str, session_html: str | None) -> dict:
+    """
+    Re-run the booking/session extraction on archived page HTML (see
+    replay_archive.py). `page` can be any Playwright page; no Hovn login
+    or network access is needed.
+    """
+    page.set_content(booking_html, wait_until="domcontentloaded")
+    booking_data = _extract_booking(page, ARCHIVED_XPATH_TIMEOUT_MS)
+
+    session_data = None
+    if session_html:
+        page.set_content(session_html, wait_until="domcontentloaded")
+        session_data = _extract_session(page, ARCHIVED_XPATH_TIMEOUT_MS)
+
+    return {
+        "booking_ref": booking_ref,
+        "booking_url": BOOKING_BASE_URL + booking_ref,
+        "booking": booking_data,
+        "session": session_data,
+    }
+
+
+def scrape_booking_and_session_playwright(
+    booking_ref: str,
+    block_profile: str | None = None,
+    wait_until: str | None = None,
+    session_cache: SessionPageCache | None = None,
+) -> dict:
+    """
+    Scrape one booking + session through Edge. With a session_cache, a
+    session already extracted for another booking is reused instead of
+    navigating to it again.
+    """
+    block_profile = (block_profile or HOVN_BLOCK_PROFILE).lower()
+    wait_until = wait_until or HOVN_WAIT_UNTIL
+
     with sync_playwright() as p:
         browser, context, page = attach_to_edge(p)
+        install_resource_blocking(page, block_profile)
 
         try:
             booking_url = BOOKING_BASE_URL + booking_ref
-            print(f"[SCRAPER] Opening booking page: {booking_url}")
-            page.goto(booking_url, wait_until="networkidle", timeout=60000)
+            print(f"[SCRAPER] Opening booking page: {booking_url} (wait_until={wait_until}, block={block_profile})")
+            started = time.perf_counter()
+            _timed_goto(page, booking_url, "booking_nav", wait_until)
 
+            t0 = time.perf_counter()
             booking_data = _extract_booking(page)
+            PAGE_TIMINGS.record("booking_extract", time.perf_counter() - t0)
+            # After extraction, so the archived DOM is the rendered one
+            _archive_page(page, raw_archive.HOVN_BOOKING_PAGE, booking_ref)
 
             session_url = booking_data.get("session_url")
             session_data = None
-            if session_url:
+            cached = session_cache.get(session_url) if session_cache and session_url else None
+            if cached:
+                print(f"[SCRAPER] Reusing session page: {session_url}")
+                session_data = cached["session"]
+                raw_archive.link(raw_archive.HOVN_SESSION_PAGE, session_url, cached["archive_sha"], key=booking_ref)
+            elif session_url:
                 print(f"[SCRAPER] Opening session page: {session_url}")
-                page.goto(session_url, wait_until="networkidle", timeout=60000)
+                _timed_goto(page, session_url, "session_nav", wait_until)
+
+                t0 = time.perf_counter()
                 session_data = _extract_session(page)
+                PAGE_TIMINGS.record("session_extract", time.perf_counter() - t0)
+                sha = _archive_page(page, raw_archive.HOVN_SESSION_PAGE, booking_ref)
+                if session_cache:
+                    session_cache.put(session_url, session_data, sha)
             else:
                 print("[SCRAPER] WARNING: No session_url found on booking page.")
 
+            elapsed = time.perf_counter() - started
+            PAGE_TIMINGS.record("scrape_total", elapsed)
+            print(f"[SCRAPER] {booking_ref} scraped in {elapsed * 1000:.0f} ms")
+
             result = {
                 "booking_ref": booking_ref,
                 "booking_url": booking_url,
@@ -225,6 +534,75 @@ def scrape_booking_and_session(booking_ref: str) -> dict:
                 pass
 
 
+def scrape_booking_and_session(
+    booking_ref: str,
+    backend: str | None = None,
+    session_cache: SessionPageCache | None = None,
+) -> dict:
+    """
+    Scrape one booking + its session into the bundle normalize_full_bundle()
+    takes. Uses the HTTP/Flight engine unless HOVN_SCRAPER_BACKEND (or
+    `backend`) is "playwright"; HTTP failures fall back to Playwright.
+    Pass one SessionPageCache across calls to load each session page once.
+    """
+    backend = (backend or HOVN_SCRAPER_BACKEND).lower()
+
+    if backend != "playwright":
+        from hovn_http_scraper import scrape_booking_http, HovnHttpScrapeError
+
+        try:
+            return scrape_booking_http(booking_ref)
+        except HovnHttpScrapeError as e:
+            print(f"[SCRAPER] HTTP engine failed for {booking_ref} ({e}); falling back to Playwright")
+        except Exception as e:
+            print(f"[SCRAPER] HTTP engine error for {booking_ref}: {e}; falling back to Playwright")
+
+    return scrape_booking_and_session_playwright(booking_ref, session_cache=session_cache)
+
+
+def scrape_bookings(
+    booking_refs,
+    backend: str | None = None,
+    concurrency: int = HOVN_HTTP_CONCURRENCY,
+    tabs: int | None = None,
+    session_cache: SessionPageCache | None = None,
+):
+    """
+    Batch version of scrape_booking_and_session for migrations. Yields
+    (ref, bundle, error) as each ref finishes.
+
+    Refs go through the HTTP engine in parallel first; whatever it can't
+    handle is scraped on one shared HovnBrowserPool (a single CDP
+    connection with `tabs` tabs) instead of a fresh browser per ref.
+    Session pages are memoized for the run (see session_cache.py).
+    """
+    from hovn_browser_pool import HovnBrowserPool, HOVN_POOL_TABS
+
+    backend = (backend or HOVN_SCRAPER_BACKEND).lower()
+    refs = list(dict.fromkeys(r.strip() for r in booking_refs if r and r.strip()))
+    leftovers = refs
+
+    if backend != "playwright" and refs:
+        from hovn_http_scraper import scrape_booking_http
+
+        leftovers = []
+        with ThreadPoolExecutor(max_workers=max(1, concurrency)) as ex:
+            futures = {ex.submit(scrape_booking_http, ref): ref for ref in refs}
+            for fut in as_completed(futures):
+                ref = futures[fut]
+                try:
+                    yield ref, fut.result(), None
+                except Exception as e:
+                    print(f"[SCRAPER] HTTP engine failed for {ref} ({e}); queued for Playwright")
+                    leftovers.append(ref)
+
+    if leftovers:
+        session_cache = session_cache or SessionPageCache()
+        with HovnBrowserPool(tabs=tabs or HOVN_POOL_TABS, session_cache=session_cache) as pool:
+            yield from pool.scrape_many(leftovers)
+        print(f"[SCRAPER] session page cache: {session_cache.stats()}")
+
+
 def main():
     if len(sys.argv) < 2:
         print("Usage: python hovn_scraper.py <BOOKING_REF>")
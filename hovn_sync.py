@@ -9,12 +9,16 @@
 import sys
 from db import SessionLocal
 from models import Booking, Student
-from redcross import scrape_certs_for_email
-from main import _upsert_certs_for_student  # reuse existing logic
+from redcross import scrape_certs_for_emails, ARC_CONCURRENCY
+from cert_store import CertUpsertBuffer, CERT_COMMIT_CHUNK
 from emailer import send_migration_notice
 
 
-def run_sync(booking_refs: list[str]):
+def run_sync(
+    booking_refs: list[str],
+    concurrency: int = ARC_CONCURRENCY,
+    chunk_size: int = CERT_COMMIT_CHUNK,
+):
     db = SessionLocal()
     print(f"🔍 Starting sync for {len(booking_refs)} booking refs...")
 
@@ -43,33 +47,52 @@ def run_sync(booking_refs: list[str]):
 
     print(f"Found {len(students)} unique students to sync.")
 
-    # Process each student
+    # Index students by email for the batched ARC lookup
+    by_email = {}
     for student in students.values():
         if not student.email:
             print(f"Skipping student {student.id} (no email)")
             continue
-
-        print(f"→ Scraping ARC certs for {student.email}...")
-        scraped = scrape_certs_for_email(student.email) or []
-
-        if scraped:
-            saved = _upsert_certs_for_student(db, student, scraped)
-            print(f"   ✓ Saved {len(saved)} certs")
-
-            # Internal-only migration email
-            send_migration_notice(
-                ref=";".join(refs),
-                student=student,
-                certs=[{
-                    "course_name": c.course_name,
-                    "issuer_org": c.issuer_org,
-                    "format": c.format,
-                    "issue_date": c.issue_date,
-                    "expiry_date": c.expiry_date,
-                } for c in saved],
-            )
-        else:
-            print("   ⚠ No certs found on ARC.")
+        by_email.setdefault(student.email.strip().lower(), []).append(student)
+
+    def notify(student, diff):
+        if not diff.has_changes:
+            print(f"   = {student.email}: {diff.unchanged} certs unchanged, no email sent")
+            return
+
+        print(
+            f"   ✓ {student.email}: {len(diff.added)} added, {len(diff.changed)} changed, "
+            f"{len(diff.removed)} no longer on ARC, {diff.unchanged} unchanged"
+        )
+
+        # Internal-only migration email
+        send_migration_notice(
+            ref=";".join(refs),
+            student=student,
+            certs=[{
+                "course_name": c.course_name,
+                "issuer_org": c.issuer_org,
+                "format": c.format,
+                "issue_date": c.issue_date,
+                "expiry_date": c.expiry_date,
+            } for c in diff.current],
+        )
+
+    print(f"→ Scraping ARC certs for {len(by_email)} emails (concurrency={concurrency})...")
+
+    # Certs are written in one statement + commit per `chunk_size` students
+    with CertUpsertBuffer(db, chunk_size=chunk_size, on_flush=notify) as buffer:
+        for email, scraped, err in scrape_certs_for_emails(by_email, concurrency=concurrency):
+            if err is not None:
+                print(f"   ❌ {email}: ARC lookup failed: {err}")
+                continue
+
+            if not scraped:
+                print(f"   ⚠ {email}: No certs found on ARC.")
+                continue
+
+            for student in by_email[email]:
+                buffer.add(student, scraped)
 
     print("🎉 Migration complete!")
 
@@ -3,126 +3,235 @@ import sys
 import json
 import os
 
+from sqlalchemy import func
 from sqlalchemy.orm import Session
 
 # --- existing internal modules you already have ---
-from hovn_scraper import scrape_booking_and_session
+from hovn_scraper import scrape_bookings
 from normalize import normalize_full_bundle
-from db_pipeline import persist_full_normalized_bundle
+from db_pipeline import persist_full_normalized_bundle, persist_normalized_bundles
 from db import get_db
-from models import Student, Certificate
-from redcross import scrape_certs_for_email
+from models import Booking, Student
+from redcross import scrape_certs_for_emails, ARC_CONCURRENCY
+from cert_store import CertUpsertBuffer, CERT_COMMIT_CHUNK
+from ingest_ledger import IngestLedger, bundle_hash
+from hovn_incremental import (
+    HOVN_SYNC_MAX_PAGES,
+    load_sync_state,
+    resume_of,
+    save_watermark,
+    settle_watermark,
+    walk_listing,
+)
+
+# Scraped bundles written per persist_normalized_bundles() transaction
+HOVN_PERSIST_BATCH = int(os.getenv("HOVN_PERSIST_BATCH", "500"))
 
 # ---------------------------------------------------------
-# Helper: upsert ARC certs (copied from main.py)
+# Scrape + persist many refs, writing bundles in batches
 # ---------------------------------------------------------
-from datetime import datetime, date
+def _persist_batch(pending: list, emails: list, errors: dict, ledger: IngestLedger | None = None):
+    """pending: [(ref, normalized, hash)]. One set-based transaction; one-by-one if that fails."""
+    retry = pending
+    try:
+        stats = persist_normalized_bundles([n for _, n, _ in pending])
+        print(
+            f"🗄️  Batch write: {stats['bookings']} bookings, {stats['students']} students, "
+            f"{stats['sessions']} sessions in {stats['round_trips']} round trips."
+        )
+        skipped = set(stats["skipped"])
+        retry = [p for p in pending if p[1].get("booking_ref") in skipped]
+    except Exception as e:
+        print(f"❌ Batch write failed ({e}) — retrying {len(pending)} bundles one at a time.")
 
-def _parse_date(x: str | None):
-    if not x:
-        return None
-    for fmt in ("%m/%d/%Y", "%b %d, %Y", "%b %d, %y"):
+    written = {ref for ref, _, _ in pending} - {ref for ref, _, _ in retry}
+    for ref, normalized, _ in retry:
         try:
-            return datetime.strptime(x.strip(), fmt).date()
-        except ValueError:
+            persist_full_normalized_bundle(normalized)
+            written.add(ref)
+        except Exception as e:
+            print(f"❌ ERROR writing {ref} to DB: {e}")
+            errors[ref] = e
+
+    for ref, normalized, source_hash in pending:
+        if ref not in written:
+            if ledger:
+                ledger.failed(ref, errors[ref])
             continue
-    return None
-
-
-def _upsert_certs_for_student(db: Session, student: Student, certs):
-    """Exact same logic as main.py — ARC cert_id is unique key."""
-    if not certs:
-        return []
-
-    for c in certs:
-        cert_id = c.get("cert_id")
-        if not cert_id:
+        if ledger:
+            ledger.ok(ref, source_hash)
+        email = normalized.get("student", {}).get("email")
+        if email:
+            emails.append(email.lower().strip())
+
+    if ledger:
+        ledger.flush()
+
+
+def _stored_emails(db: Session, refs: list[str], chunk_size: int = 1000) -> list[str]:
+    """Emails of the students already stored for `refs` (bookings the ledger skipped)."""
+    emails = []
+    for i in range(0, len(refs), chunk_size):
+        rows = (
+            db.query(Student.email)
+            .join(Booking, Booking.student_id == Student.id)
+            .filter(Booking.hovn_booking_ref.in_(refs[i:i + chunk_size]), Student.email.isnot(None))
+            .all()
+        )
+        emails.extend(email.lower().strip() for (email,) in rows)
+    db.rollback()  # don't hold a transaction open across the scrape
+    return emails
+
+
+def scrape_and_persist(
+    booking_refs: list[str],
+    batch_size: int = HOVN_PERSIST_BATCH,
+    ledger: IngestLedger | None = None,
+    skip_fresh: bool = True,
+):
+    """
+    Returns (student emails, refs that failed to scrape, normalize or persist).
+
+    With a ledger, refs synced within INGEST_SKIP_WINDOW_HOURS (when
+    skip_fresh) or waiting out a retry backoff aren't scraped, and
+    bundles identical to the last successful write aren't persisted.
+    Refs held back by backoff count as failed. Students of skipped and
+    unchanged bookings are still returned, so their certs keep syncing.
+    """
+    emails, errors, pending = [], {}, []
+
+    refs = booking_refs
+    if ledger:
+        refs, skipped = ledger.plan(booking_refs, skip_fresh=skip_fresh)
+        if skipped:
+            fresh = sum(1 for r in skipped.values() if r == "fresh")
+            print(f"⏭️  Skipping {fresh} recently synced refs and {len(skipped) - fresh} refs waiting to retry.")
+        for ref, reason in skipped.items():
+            if reason == "backoff":
+                errors[ref] = "waiting for retry backoff"
+        emails.extend(_stored_emails(ledger.db, [r for r, why in skipped.items() if why == "fresh"]))
+    unchanged = 0
+
+    # Scrapes run in parallel (HTTP engine, then one shared browser pool for
+    # anything it can't read); normalized bundles are written batch_size at a time
+    for ref, scraped, err in scrape_bookings(refs):
+        if err is None and not scraped:
+            err = "no data returned from scraper"
+        if err is not None:
+            print(f"❌ ERROR scraping {ref}: {err}")
+            errors[ref] = err
+            if ledger:
+                ledger.failed(ref, err)
             continue
+        print(f"📥 Scraped OK for {ref}")
 
-        obj = db.query(Certificate).filter(Certificate.cert_id == cert_id).one_or_none()
-        if obj is None:
-            obj = Certificate(student_id=student.id, cert_id=cert_id)
-            db.add(obj)
-
-        obj.course_name = c.get("course_name")
-        obj.course_code = c.get("course_code")
-        obj.format = c.get("format")
+        try:
+            normalized = normalize_full_bundle(scraped)
+            source_hash = bundle_hash(normalized)
+        except Exception as e:
+            print(f"❌ ERROR normalizing {ref}: {e}")
+            errors[ref] = e
+            if ledger:
+                ledger.failed(ref, e)
+            continue
 
-        obj.issue_date = _parse_date(c.get("issue_date"))
-        obj.expiry_date = _parse_date(c.get("expiry_date"))
+        if ledger and ledger.is_unchanged(ref, source_hash):
+            ledger.unchanged(ref, source_hash)
+            unchanged += 1
+            email = normalized.get("student", {}).get("email")
+            if email:
+                emails.append(email.lower().strip())
+            continue
 
-        obj.issuer_org = (
-            c.get("issuer_org")
-            or c.get("agency_org_name")
-            or c.get("org_name")
-        )
-        obj.instructor_name = c.get("instructor_name")
+        pending.append((ref, normalized, source_hash))
+        if len(pending) >= batch_size:
+            _persist_batch(pending, emails, errors, ledger)
+            pending = []
 
-    db.commit()
-    return db.query(Certificate).filter(Certificate.student_id == student.id).all()
+    if pending:
+        _persist_batch(pending, emails, errors, ledger)
+    if ledger:
+        ledger.flush()
+        if unchanged:
+            print(f"⏭️  {unchanged} bookings unchanged since the last sync — not rewritten.")
+    return list(dict.fromkeys(emails)), list(errors)
 
 
 # ---------------------------------------------------------
-# Main runner for ONE booking ref
+# Batched ARC cert scrape + store for all synced students
 # ---------------------------------------------------------
-def process_single_ref(booking_ref: str, db: Session):
-    print(f"\n🔎  Processing {booking_ref}...")
-
-    # 1) SCRAPE BOOKING + SESSION
-    try:
-        scraped = scrape_booking_and_session(booking_ref)
-    except Exception as e:
-        print(f"❌ ERROR scraping {booking_ref}: {e}")
-        return
-
-    if not scraped:
-        print("❌ No data returned from scraper.")
-        return
-
-    print(f"📥 Scraped OK for {booking_ref}")
-
-    # 2) NORMALIZE
-    normalized = normalize_full_bundle(scraped)
-    print("📐 Normalized bundle ready.")
-
-    # 3) WRITE BOOKING, SESSION, ORDER, STUDENT into DB
-    try:
-        persist_full_normalized_bundle(normalized)
-        print("🗄️  DB write successful (HOVN bundle).")
-    except Exception as e:
-        print(f"❌ ERROR writing to DB: {e}")
-        return
-
-    # 4) ARC CERT SCRAPE + STORE (NO EMAILS)
-    student_email = normalized.get("student", {}).get("email")
-    if not student_email:
-        print("⚠️ No student email found — skipping ARC certs.")
-        return
-
-    student_email = student_email.lower().strip()
-
-    # Find student in DB
-    student = (
-        db.query(Student)
-        .filter(Student.email.ilike(student_email))
-        .one_or_none()
+def sync_certs_for_emails(
+    emails: list[str],
+    db: Session,
+    concurrency: int = ARC_CONCURRENCY,
+    chunk_size: int = CERT_COMMIT_CHUNK,
+):
+    print(f"\n📡 Scraping ARC certs for {len(emails)} students (concurrency={concurrency})...")
+
+    # One query for every student in the batch
+    students = {
+        s.email.strip().lower(): s
+        for s in db.query(Student).filter(func.lower(Student.email).in_(emails)).all()
+        if s.email
+    }
+
+    # Certs are written in one statement + commit per `chunk_size` students
+    with CertUpsertBuffer(db, chunk_size=chunk_size) as buffer:
+        for student_email, arc, err in scrape_certs_for_emails(emails, concurrency=concurrency):
+            if err is not None:
+                print(f"❌ ARC lookup failed for {student_email}: {err}")
+                continue
+
+            student = students.get(student_email)
+            if not student:
+                print(f"⚠️ Student for {student_email} not found after persist() — skipping certs.")
+                continue
+
+            if not arc:
+                print(f"ℹ️ No ARC certifications found for {student_email}.")
+                continue
+
+            print(f"📄 Found {len(arc)} ARC certs for {student_email}. Saving...")
+            buffer.add(student, arc)
+
+    print(
+        f"✅ Synced {buffer.students_written} students: {buffer.certs_written} certs written, "
+        f"{buffer.certs_unchanged} unchanged (skipped)."
     )
 
-    if not student:
-        print(f"⚠️ Student for {student_email} not found after persist() — skipping certs.")
-        return
-
-    print(f"📡 Scraping ARC certs for {student_email}...")
 
-    arc = scrape_certs_for_email(student_email) or []
-    if not arc:
-        print("ℹ️ No ARC certifications found.")
+# ---------------------------------------------------------
+# Incremental: everything changed on Hovn since the last run
+# ---------------------------------------------------------
+def sync_incremental(db: Session, dry_run: bool = False, max_pages: int = HOVN_SYNC_MAX_PAGES, force: bool = False):
+    state = load_sync_state(db)
+    watermark = state.watermark
+    resume = resume_of(state)
+    db.rollback()  # don't hold a transaction open across the scrape
+    print(f"🚀 Incremental sync since {watermark.isoformat() if watermark else 'the beginning'}...")
+    if resume:
+        print(f"↪️  Resuming a walk cut short by the page cap at listing page {resume['page']}")
+
+    entries, stats = walk_listing(watermark, max_pages=max_pages, start_page=resume["page"] if resume else 1)
+    print(f"📋 {stats['changed']} new/changed bookings ({stats['listed']} listed over {stats['pages']} pages)")
+
+    if dry_run:
+        for e in entries:
+            print(f"  {e['ref']}  {e['updated_at'].isoformat() if e['updated_at'] else '?'}")
         return
 
-    print(f"📄 Found {len(arc)} ARC certs. Saving...")
-    _upsert_certs_for_student(db, student, arc)
+    # Everything listed changed since the watermark, so the fresh-window skip doesn't apply
+    ledger = None if force else IngestLedger(db)
+    emails, failed = scrape_and_persist([e["ref"] for e in entries], ledger=ledger, skip_fresh=False)
+    sync_certs_for_emails(emails, db)
 
-    print(f"✅ DONE {booking_ref}: Student {student_email} fully synced.")
+    # Only now: the watermark never moves past a booking that isn't in the DB
+    new_watermark, resume = settle_watermark(watermark, entries, failed, stats, resume)
+    stats["failed"] = len(failed)
+    save_watermark(db, new_watermark, stats, resume)
+    print(f"🔖 Watermark {watermark} → {new_watermark} ({len(failed)} failed, retried next run)")
+    if resume:
+        print(f"↪️  Walk incomplete: next run resumes at listing page {resume['page']}")
 
 
 # ---------------------------------------------------------
@@ -133,10 +242,23 @@ def main():
         print("Usage:")
         print("  python hovn_sync_full.py refs.txt")
         print("  python hovn_sync_full.py brn_ABC123 brn_DEF456 ...")
+        print("  python hovn_sync_full.py --incremental [--dry-run] [--max-pages N]")
+        print("  add --force to re-sync refs the ingest ledger would skip")
         sys.exit(1)
 
     # Load booking refs
     args = sys.argv[1:]
+    force = "--force" in args
+    args = [a for a in args if a != "--force"]
+
+    if args[0] == "--incremental":
+        dry_run = "--dry-run" in args
+        max_pages = HOVN_SYNC_MAX_PAGES
+        if "--max-pages" in args:
+            max_pages = int(args[args.index("--max-pages") + 1])
+        sync_incremental(next(get_db()), dry_run=dry_run, max_pages=max_pages, force=force)
+        print("\n🎉 ALL DONE — Incremental sync complete.\n")
+        return
 
     # Case A: they passed a txt file
     if len(args) == 1 and os.path.isfile(args[0]) and args[0].endswith(".txt"):
@@ -154,8 +276,9 @@ def main():
 
     db = next(get_db())
 
-    for ref in booking_refs:
-        process_single_ref(ref, db)
+    ledger = None if force else IngestLedger(db)
+    emails, _ = scrape_and_persist(booking_refs, ledger=ledger)
+    sync_certs_for_emails(emails, db)
 
     print("\n🎉 ALL DONE — Migration complete.\n")
 
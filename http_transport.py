@@ -0,0 +1,181 @@
+# http_transport.py
+# -----------------
+# Shared outbound HTTP plumbing for scrapers:
+#
+# - PooledTransport: one keep-alive requests.Session per upstream with a
+#   sized connection pool, (connect, read) timeouts and jittered
+#   exponential backoff on 429/5xx and connection errors.
+# - TokenBucket: client-side rate limiter shared by the sync and asyncio
+#   paths so bulk jobs can run flat out without tripping upstream throttles.
+#
+# Limits are per process; with 4 gunicorn workers the effective ceiling
+# is 4x the configured rate.
+
+import asyncio
+import email.utils
+import random
+import threading
+import time
+from typing import Any, Dict, Optional
+
+import aiohttp
+import requests
+from requests.adapters import HTTPAdapter
+
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+
+class TokenBucket:
+    """
+    Thread-safe token bucket. `rate` tokens are added per second up to
+    `burst`. rate <= 0 disables limiting.
+    """
+
+    def __init__(self, rate: float, burst: int):
+        self.rate = rate
+        self.burst = max(1, burst)
+        self._tokens = float(self.burst)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _reserve(self) -> float:
+        """Take one token (possibly on credit) and return how long to wait for it."""
+        if self.rate <= 0:
+            return 0.0
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            self._tokens -= 1
+            if self._tokens >= 0:
+                return 0.0
+            return -self._tokens / self.rate
+
+    def acquire(self) -> None:
+        wait = self._reserve()
+        if wait > 0:
+            time.sleep(wait)
+
+    async def acquire_async(self) -> None:
+        wait = self._reserve()
+        if wait > 0:
+            await asyncio.sleep(wait)
+
+
+def backoff_delay(attempt: int, base: float, cap: float) -> float:
+    """Full-jitter exponential backoff: uniform(0, min(cap, base * 2**attempt))."""
+    return random.uniform(0, min(cap, base * (2 ** attempt)))
+
+
+def retry_after_seconds(value: Optional[str]) -> Optional[float]:
+    """Parse a Retry-After header (delta-seconds or HTTP date)."""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        when = email.utils.parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    return max(0.0, when.timestamp() - time.time())
+
+
+class PooledTransport:
+    def __init__(
+        self,
+        name: str,
+        headers: Optional[Dict[str, str]] = None,
+        pool_size: int = 16,
+        connect_timeout: float = 5.0,
+        read_timeout: float = 20.0,
+        max_retries: int = 4,
+        backoff_base: float = 0.5,
+        backoff_cap: float = 30.0,
+        rate_limiter: Optional[TokenBucket] = None,
+    ):
+        self.name = name
+        self.headers = dict(headers or {})
+        self.pool_size = pool_size
+        self.connect_timeout = connect_timeout
+        self.read_timeout = read_timeout
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_cap = backoff_cap
+        self.rate_limiter = rate_limiter or TokenBucket(0, 1)
+
+        self.session = requests.Session()
+        self.session.headers.update(self.headers)
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=0)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+
+    def _retry_wait(self, attempt: int, retry_after: Optional[str]) -> float:
+        hinted = retry_after_seconds(retry_after)
+        if hinted is not None:
+            return min(hinted, self.backoff_cap)
+        return backoff_delay(attempt, self.backoff_base, self.backoff_cap)
+
+    # ---------- sync (requests) ----------
+
+    def get(self, url: str, **kwargs: Any) -> requests.Response:
+        """
+        GET with pooling, timeouts, rate limiting and retries. Returns the
+        last response once retries are exhausted; raises the last
+        connection error if every attempt failed to connect.
+        """
+        kwargs.setdefault("timeout", (self.connect_timeout, self.read_timeout))
+
+        for attempt in range(self.max_retries + 1):
+            self.rate_limiter.acquire()
+            try:
+                resp = self.session.get(url, **kwargs)
+            except (requests.ConnectionError, requests.Timeout) as e:
+                if attempt >= self.max_retries:
+                    raise
+                wait = self._retry_wait(attempt, None)
+                print(f"[{self.name}] {type(e).__name__} on {url}; retry {attempt + 1} in {wait:.1f}s")
+                time.sleep(wait)
+                continue
+
+            if resp.status_code in RETRY_STATUSES and attempt < self.max_retries:
+                wait = self._retry_wait(attempt, resp.headers.get("Retry-After"))
+                print(f"[{self.name}] HTTP {resp.status_code} on {url}; retry {attempt + 1} in {wait:.1f}s")
+                resp.close()
+                time.sleep(wait)
+                continue
+
+            return resp
+
+        raise RuntimeError("unreachable")
+
+    # ---------- asyncio (aiohttp) ----------
+
+    def client_session(self) -> aiohttp.ClientSession:
+        """aiohttp session with the same pool size, headers and timeouts."""
+        return aiohttp.ClientSession(
+            headers=self.headers,
+            connector=aiohttp.TCPConnector(limit=self.pool_size),
+            timeout=aiohttp.ClientTimeout(sock_connect=self.connect_timeout, sock_read=self.read_timeout),
+        )
+
+    async def get_text_async(self, http: aiohttp.ClientSession, url: str, **kwargs: Any) -> str:
+        for attempt in range(self.max_retries + 1):
+            await self.rate_limiter.acquire_async()
+            try:
+                async with http.get(url, **kwargs) as resp:
+                    if resp.status in RETRY_STATUSES and attempt < self.max_retries:
+                        wait = self._retry_wait(attempt, resp.headers.get("Retry-After"))
+                        print(f"[{self.name}] HTTP {resp.status} on {url}; retry {attempt + 1} in {wait:.1f}s")
+                    else:
+                        resp.raise_for_status()
+                        return await resp.text()
+            except (aiohttp.ClientConnectionError, asyncio.TimeoutError) as e:
+                if attempt >= self.max_retries:
+                    raise
+                wait = self._retry_wait(attempt, None)
+                print(f"[{self.name}] {type(e).__name__} on {url}; retry {attempt + 1} in {wait:.1f}s")
+            await asyncio.sleep(wait)
+
+        raise RuntimeError("unreachable")
@@ -0,0 +1,166 @@
+# ingest_ledger.py
+# ----------------
+# Per-ref bookkeeping for Hovn batch syncs (ingest_ledger table), so a
+# re-run of hovn_sync_full.py doesn't redo work that is already done:
+#
+#   - refs synced successfully within INGEST_SKIP_WINDOW_HOURS are not
+#     scraped at all ("fresh")
+#   - refs whose last attempt failed wait INGEST_RETRY_BASE_SECONDS,
+#     doubling per consecutive failure up to INGEST_RETRY_MAX_SECONDS
+#     ("backoff")
+#   - scraped refs whose normalized bundle hashes the same as last time
+#     are not written again ("unchanged")
+#
+#   ledger = IngestLedger(db)
+#   refs, skipped = ledger.plan(refs)
+#   ... scrape ...
+#   if ledger.is_unchanged(ref, h): ledger.unchanged(ref, h)
+#   ... persist ... ledger.ok(ref, h) / ledger.failed(ref, err)
+#   ledger.flush()      # one INSERT ... ON CONFLICT + commit
+
+import hashlib
+import json
+import os
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.orm import Session
+
+from models import IngestLedger as LedgerRow
+
+INGEST_SKIP_WINDOW_HOURS = float(os.getenv("INGEST_SKIP_WINDOW_HOURS", "12"))
+INGEST_RETRY_BASE_SECONDS = float(os.getenv("INGEST_RETRY_BASE_SECONDS", "300"))
+INGEST_RETRY_MAX_SECONDS = float(os.getenv("INGEST_RETRY_MAX_SECONDS", "86400"))
+
+# Rows per SELECT / INSERT statement
+LEDGER_ROWS_PER_STATEMENT = 1000
+
+OK = "ok"
+UNCHANGED = "unchanged"
+FAILED = "failed"
+
+
+def bundle_hash(normalized: Dict[str, Any]) -> str:
+    """sha256 of a normalized bundle (key order and value types don't matter)."""
+    blob = json.dumps(normalized, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(blob.encode("utf-8")).hexdigest()
+
+
+def retry_delay(failures: int) -> timedelta:
+    """Wait before the next attempt after `failures` consecutive failures."""
+    seconds = INGEST_RETRY_BASE_SECONDS * (2 ** max(0, failures - 1))
+    return timedelta(seconds=min(seconds, INGEST_RETRY_MAX_SECONDS))
+
+
+def _utc(dt: Optional[datetime]) -> Optional[datetime]:
+    # timestamptz comes back aware; treat anything naive as UTC
+    if dt is not None and dt.tzinfo is None:
+        return dt.replace(tzinfo=timezone.utc)
+    return dt
+
+
+class IngestLedger:
+    def __init__(self, db: Session, skip_window_hours: float = INGEST_SKIP_WINDOW_HOURS):
+        self.db = db
+        self.skip_window = timedelta(hours=skip_window_hours)
+        self.now = datetime.now(timezone.utc)
+        self._rows: Dict[str, Any] = {}
+        self._pending: Dict[str, Dict[str, Any]] = {}
+
+    # ---------- read ----------
+
+    def load(self, refs: Iterable[str]) -> None:
+        table = LedgerRow.__table__
+        refs = [r for r in dict.fromkeys(refs) if r not in self._rows]
+        for i in range(0, len(refs), LEDGER_ROWS_PER_STATEMENT):
+            chunk = refs[i:i + LEDGER_ROWS_PER_STATEMENT]
+            for row in self.db.execute(select(table).where(table.c.booking_ref.in_(chunk))):
+                self._rows[row.booking_ref] = row
+        # Don't hold a transaction open while the caller scrapes
+        self.db.rollback()
+
+    def plan(self, refs: Iterable[str], skip_fresh: bool = True) -> Tuple[List[str], Dict[str, str]]:
+        """
+        (refs to fetch, {skipped ref: "fresh" | "backoff"}). Fresh refs are
+        only skipped when skip_fresh; refs in backoff always wait.
+        """
+        refs = list(dict.fromkeys(refs))
+        self.load(refs)
+
+        to_fetch: List[str] = []
+        skipped: Dict[str, str] = {}
+        for ref in refs:
+            row = self._rows.get(ref)
+            if row is None:
+                to_fetch.append(ref)
+            elif row.outcome == FAILED and row.next_retry_at and _utc(row.next_retry_at) > self.now:
+                skipped[ref] = "backoff"
+            elif (
+                skip_fresh
+                and self.skip_window
+                and row.outcome in (OK, UNCHANGED)
+                and row.last_success_at
+                and self.now - _utc(row.last_success_at) < self.skip_window
+            ):
+                skipped[ref] = "fresh"
+            else:
+                to_fetch.append(ref)
+        return to_fetch, skipped
+
+    def is_unchanged(self, ref: str, source_hash: str) -> bool:
+        row = self._rows.get(ref)
+        return row is not None and row.outcome in (OK, UNCHANGED) and row.source_hash == source_hash
+
+    # ---------- record ----------
+
+    def _record(self, ref: str, **values) -> None:
+        row = self._rows.get(ref)
+        self._pending[ref] = {
+            "booking_ref": ref,
+            "source_hash": row.source_hash if row is not None else None,
+            "error": None,
+            "failures": 0,
+            "last_fetched_at": self.now,
+            "last_success_at": row.last_success_at if row is not None else None,
+            "next_retry_at": None,
+            "updated_at": self.now,
+            **values,
+        }
+
+    def ok(self, ref: str, source_hash: Optional[str]) -> None:
+        self._record(ref, outcome=OK, source_hash=source_hash, last_success_at=self.now)
+
+    def unchanged(self, ref: str, source_hash: str) -> None:
+        self._record(ref, outcome=UNCHANGED, source_hash=source_hash, last_success_at=self.now)
+
+    def failed(self, ref: str, error: Any) -> None:
+        row = self._rows.get(ref)
+        failures = (row.failures if row is not None and row.outcome == FAILED else 0) + 1
+        self._record(
+            ref,
+            outcome=FAILED,
+            error=str(error)[:2000],
+            failures=failures,
+            next_retry_at=self.now + retry_delay(failures),
+        )
+
+    def flush(self) -> None:
+        """Write every recorded outcome (one statement per chunk) and commit."""
+        if not self._pending:
+            return
+        rows, self._pending = list(self._pending.values()), {}
+        table = LedgerRow.__table__
+        try:
+            for i in range(0, len(rows), LEDGER_ROWS_PER_STATEMENT):
+                stmt = pg_insert(table).values(rows[i:i + LEDGER_ROWS_PER_STATEMENT])
+                stmt = stmt.on_conflict_do_update(
+                    index_elements=[table.c.booking_ref],
+                    set_={c: stmt.excluded[c] for c in rows[0] if c != "booking_ref"},
+                )
+                self.db.execute(stmt)
+            self.db.commit()
+        except Exception as e:
+            self.db.rollback()
+            print(f"[LEDGER] could not record {len(rows)} outcomes: {e}")
@@ -3,17 +3,18 @@ import re
 from datetime import datetime, date, timedelta
 from typing import List, Dict, Any
 
-from fastapi import FastAPI, Depends, Request, APIRouter, Form, Body
+from fastapi import FastAPI, Depends, Request, APIRouter, Form, Body, Query, BackgroundTasks, Response
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
 from fastapi.responses import FileResponse
+from sqlalchemy import func
 from sqlalchemy.orm import Session
 from hovn_scraper import scrape_booking_and_session
 from normalize import normalize_full_bundle
 from db_pipeline import persist_full_normalized_bundle
 
 
-from db import get_db
+from db import get_db, SessionLocal
 from models import (
     Student,
     Booking,
@@ -22,7 +23,17 @@ from models import (
     Certificate,
 )
 
-from redcross import scrape_certs_for_email
+from redcross import scrape_certs_for_email, scrape_certs_for_emails, ARC_CONCURRENCY
+from cert_cache import cached_scrape_certs_for_email, arc_cache
+from cert_store import upsert_certs, mark_certs_checked, CertUpsertBuffer, CERT_COMMIT_CHUNK
+from cert_refresh import (
+    scheduler as cert_refresh_scheduler,
+    cert_freshness,
+    revalidate_student_certs,
+    CERT_REFRESH_ENABLED,
+)
+from dimension_cache import dimension_cache
+from singleflight import coalesce, email_key, booking_key, ARC_LOCK_NAMESPACE, HOVN_LOCK_NAMESPACE
 from emailer import (
     send_cert_report,
     send_one_off_lookup,
@@ -40,6 +51,7 @@ app.add_middleware(
     allow_origins=["*"],
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Cert-Freshness", "X-Cert-Age-Seconds", "X-Cert-Checked-At"],
 )
 
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
@@ -50,6 +62,32 @@ if os.path.exists(ASSETS_DIR):
     app.mount("/assets", StaticFiles(directory=ASSETS_DIR), name="assets")
 
 
+@app.on_event("startup")
+def start_cert_refresh():
+    # Every worker runs the thread; the advisory lock keeps ticks to one at a time
+    if CERT_REFRESH_ENABLED:
+        cert_refresh_scheduler.start()
+
+
+@app.on_event("startup")
+def preload_dimension_cache():
+    if not dimension_cache.enabled:
+        return
+    db = SessionLocal()
+    try:
+        dimension_cache.preload(db)
+    except Exception as e:
+        # Not fatal: the cache fills itself on first use instead
+        print(f"[DIM_CACHE] preload failed: {e}")
+    finally:
+        db.close()
+
+
+@app.on_event("shutdown")
+def stop_cert_refresh():
+    cert_refresh_scheduler.stop()
+
+
 def spa_index():
     return FileResponse(os.path.join(FRONTEND_DIST, "index.html"))
 
@@ -119,40 +157,10 @@ def _upsert_certs_for_student(db: Session, student: Student, certs: List[Dict[st
     if not certs:
         return []
 
-    for c in certs:
-        cert_id = c.get("cert_id")
-        if not cert_id:
-            continue
-
-        obj = db.query(Certificate).filter(Certificate.cert_id == cert_id).one_or_none()
-        if obj is None:
-            obj = Certificate(student_id=student.id, cert_id=cert_id)
-            db.add(obj)
-
-        obj.course_name = c.get("course_name")
-        obj.course_code = c.get("course_code")
-        obj.format = c.get("format")
-
-        obj.issue_date = _parse_date(c.get("issue_date"))
-        obj.expiry_date = _parse_date(c.get("expiry_date"))
-
-        # Special rule: Skills Session eligible within 90 days
-        name_str = (c.get("course_name") or "").lower()
-        if "eligible for skills session within 90 days" in name_str:
-            if obj.issue_date:
-                obj.expiry_date = obj.issue_date + timedelta(days=90)
-
-        obj.issuer_org = (
-            c.get("issuer_org")
-            or c.get("agency_org_name")
-            or c.get("org_name")
-        )
-
-        obj.instructor_name = c.get("instructor_name")
-
+    saved = upsert_certs(db, {student.id: certs})
     db.commit()
 
-    return db.query(Certificate).filter(Certificate.student_id == student.id).all()
+    return saved.get(student.id, [])
 
 
 def _extract_first_email(text: str) -> str | None:
@@ -266,19 +274,41 @@ def migrate_students_by_booking_refs(payload: dict, db: Session = Depends(get_db
         if b.student and b.student.id not in students:
             students[b.student.id] = b.student
 
-    processed = 0
+    by_email: Dict[str, List[Student]] = {}
     for s in students.values():
         if not s.email:
             continue
-        scraped = scrape_certs_for_email(s.email) or []
-        if scraped:
-            saved = _upsert_certs_for_student(db, s, scraped)
-            processed += 1
+        by_email.setdefault(s.email.strip().lower(), []).append(s)
+
+    concurrency = int(payload.get("concurrency") or ARC_CONCURRENCY)
+    chunk_size = int(payload.get("chunk_size") or CERT_COMMIT_CHUNK)
+
+    errors = []
+    changes = []
+
+    def record(student, diff):
+        if diff.has_changes:
+            changes.append({"student_id": student.id, **diff.summary()})
+
+    with CertUpsertBuffer(db, chunk_size=chunk_size, on_flush=record) as buffer:
+        for email, scraped, err in scrape_certs_for_emails(by_email, concurrency=concurrency):
+            if err is not None:
+                errors.append({"email": email, "error": str(err)})
+                continue
+            if scraped:
+                for s in by_email[email]:
+                    buffer.add(s, scraped)
+
+    processed = buffer.students_written
 
     return {
         "status": "ok",
         "processed_students": processed,
         "processed_bookings": len(bookings),
+        "certs_written": buffer.certs_written,
+        "certs_unchanged": buffer.certs_unchanged,
+        "changes": changes,
+        "errors": errors,
     }
 
 @app.post("/api/bookings/import")
@@ -288,14 +318,25 @@ def import_single_booking(payload: dict):
     if not ref:
         return {"error": "booking_ref is required"}
 
-    scraped = scrape_booking_and_session(ref)
-    if not scraped:
-        return {"error": f"Could not scrape booking {ref}"}
+    ref = booking_key(ref)
 
-    normalized = normalize_full_bundle(scraped)
-    persist_full_normalized_bundle(normalized)
+    def fetch():
+        scraped = scrape_booking_and_session(ref)
+        if not scraped:
+            return {"error": f"Could not scrape booking {ref}"}
+
+        normalized = normalize_full_bundle(scraped)
+        persist_full_normalized_bundle(normalized)
+
+        return {"status": "ok", "booking_ref": ref}
+
+    def recheck():
+        # Another worker just imported this ref while we waited on it
+        with SessionLocal() as db:
+            exists = db.query(Booking.id).filter(Booking.hovn_booking_ref == ref).first()
+        return {"status": "ok", "booking_ref": ref} if exists else None
 
-    return {"status": "ok", "booking_ref": ref}
+    return coalesce(HOVN_LOCK_NAMESPACE, ref, fetch, recheck)
 
 @app.post("/api/bookings/add")
 def add_booking(booking_ref: str = Query(...), db: Session = Depends(get_db)):
@@ -323,35 +364,87 @@ def add_booking(booking_ref: str = Query(...), db: Session = Depends(get_db)):
 
 # -------------------- CERT LOOKUP -------------------------
 
+def _set_cert_freshness_headers(response: Response, freshness: str, age: float | None, checked_at=None):
+    response.headers["X-Cert-Freshness"] = freshness
+    if age is not None:
+        response.headers["X-Cert-Age-Seconds"] = str(int(age))
+    if checked_at is not None:
+        response.headers["X-Cert-Checked-At"] = checked_at.isoformat()
+
+
 @app.post("/api/certs/lookup")
-def lookup_certs(email: str, db: Session = Depends(get_db)):
+def lookup_certs(
+    email: str,
+    response: Response,
+    background_tasks: BackgroundTasks,
+    refresh: bool = False,
+    db: Session = Depends(get_db),
+):
     """
     DB-first lookup used by StudentDetailPage and CertLookupPage.
+
+    Known students are answered from the DB straight away (stale-while-
+    revalidate): rows checked within CERT_FRESH_TTL are "fresh"; older
+    rows are still returned as "stale" and a background ARC re-check is
+    queued. X-Cert-Freshness / X-Cert-Age-Seconds say which one you got.
+
+    Only students never checked (and unknown emails) wait on ARC.
+    refresh=true skips the DB rows and the ARC cache and re-scrapes now.
     """
     email = (email or "").lower().strip()
     if not email:
         return []
 
-    student = db.query(Student).filter(Student.email.ilike(email)).one_or_none()
+    # lower() = lower() rather than ilike(): uses ix_students_email_lower, and
+    # "_" / "%" in an address aren't wildcards
+    student = db.query(Student).filter(func.lower(Student.email) == email).one_or_none()
 
-    # Student exists + has certs → use DB
-    if student:
+    if student and not refresh:
         existing = db.query(Certificate).filter(
             Certificate.student_id == student.id
         ).all()
-        if existing:
+        freshness, age = cert_freshness(student.certs_checked_at)
+
+        # Serve what we have if we have ever checked ARC (even "no certs")
+        # or hold rows from before certs_checked_at existed
+        if existing or student.certs_checked_at is not None:
+            if freshness != "fresh":
+                background_tasks.add_task(revalidate_student_certs, student.id, email)
+            _set_cert_freshness_headers(response, freshness, age, student.certs_checked_at)
             return [_serialize_cert(c, student) for c in existing]
 
-    # Otherwise scrape
-    scraped = scrape_certs_for_email(email) or []
-
-    # Save only if student exists
-    if student and scraped:
-        saved = _upsert_certs_for_student(db, student, scraped)
-        return [_serialize_cert(c, student) for c in saved]
+    # Otherwise scrape (one in-flight scrape per email across workers)
+    def fetch():
+        scraped = cached_scrape_certs_for_email(email, refresh=refresh)
+
+        # Save only if student exists
+        if student:
+            if scraped:
+                saved = _upsert_certs_for_student(db, student, scraped)
+                return [_serialize_cert(c, student) for c in saved]
+            mark_certs_checked(db, [student.id])
+            db.commit()
+
+        # No student → ephemeral
+        return [_serialize_cert_ephemeral(c) for c in scraped]
+
+    def recheck():
+        # Another worker just scraped + stored this student's certs
+        if not student:
+            return None
+        stored = db.query(Certificate).filter(
+            Certificate.student_id == student.id
+        ).all()
+        return [_serialize_cert(c, student) for c in stored] or None
 
-    # No student → ephemeral
-    return [_serialize_cert_ephemeral(c) for c in scraped]
+    # refresh=true must come back live: it never joins a non-refresh scrape
+    # (which may be served from the ARC cache) or takes another worker's rows
+    if refresh:
+        result = coalesce(ARC_LOCK_NAMESPACE, f"{email_key(email)}:refresh", fetch)
+    else:
+        result = coalesce(ARC_LOCK_NAMESPACE, email_key(email), fetch, recheck)
+    _set_cert_freshness_headers(response, "live", 0)
+    return result
 
 
 @app.post("/api/certs/check-email")
@@ -363,12 +456,31 @@ def cert_check_safe(payload: dict):
     if not email:
         return {"error": "missing email"}
 
-    scraped = scrape_certs_for_email(email) or []
+    refresh = str(payload.get("refresh") or "").lower() in ("1", "true", "yes")
+    scraped = cached_scrape_certs_for_email(email, refresh=refresh)
     clean = [_serialize_cert_ephemeral(x) for x in scraped]
 
     return {"email": email, "count": len(clean), "certs": clean}
 
 
+@app.get("/api/certs/cache-stats")
+def cert_cache_stats():
+    """Hit/miss counters for this worker's ARC lookup cache."""
+    return arc_cache.stats()
+
+
+@app.get("/api/dimensions/cache-stats")
+def dimension_cache_stats():
+    """Hit rate and SELECTs saved by this worker's agency/course/location/instructor cache."""
+    return dimension_cache.stats()
+
+
+@app.get("/api/certs/refresh-status")
+def cert_refresh_status():
+    """Background cert refresh scheduler state for this worker."""
+    return {"enabled": CERT_REFRESH_ENABLED, **cert_refresh_scheduler.status()}
+
+
 @app.get("/api/certs/all")
 def cert_database(db: Session = Depends(get_db)):
     rows = (
@@ -404,7 +516,7 @@ def inbound_email(payload: dict):
         )
         return {"status": "no-email"}
 
-    scraped = scrape_certs_for_email(target) or []
+    scraped = cached_scrape_certs_for_email(target)
     normalized = [_serialize_cert_ephemeral(c) for c in scraped]
 
     internal = _is_internal(sender)
@@ -11,7 +11,9 @@ from sqlalchemy import (
     Date,
     DateTime,
     ForeignKey,
+    Index,
     UniqueConstraint,
+    func,
 )
 from sqlalchemy.orm import relationship, Mapped, mapped_column
 
@@ -33,6 +35,9 @@ class Student(Base):
     phone_e164: Mapped[str | None] = mapped_column(String(32), nullable=True)
     phone_raw: Mapped[str | None] = mapped_column(String(64), nullable=True)
 
+    # Last time ARC was checked for this student's certs (see cert_refresh.py)
+    certs_checked_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True, index=True)
+
     created_at: Mapped[datetime] = mapped_column(
         DateTime(timezone=True), default=datetime.utcnow, nullable=False
     )
@@ -45,6 +50,10 @@ class Student(Base):
     certificates: Mapped[list["Certificate"]] = relationship("Certificate", back_populates="student")
 
 
+# Case-insensitive email lookups: filter on func.lower(Student.email), not ilike()
+Index("ix_students_email_lower", func.lower(Student.email))
+
+
 # --------------------------- AGENCY ----------------------------
 class Agency(Base):
     __tablename__ = "agencies"
@@ -141,16 +150,16 @@ class Session(Base):
 
     hovn_session_id: Mapped[str] = mapped_column(String(64), unique=True, nullable=False)
 
-    course_id: Mapped[int | None] = mapped_column(Integer, ForeignKey("courses.id"))
+    course_id: Mapped[int | None] = mapped_column(Integer, ForeignKey("courses.id"), index=True)
     course: Mapped[Course | None] = relationship("Course", back_populates="sessions")
 
     agency_id: Mapped[int | None] = mapped_column(Integer, ForeignKey("agencies.id"))
     agency: Mapped[Agency | None] = relationship("Agency", back_populates="sessions")
 
-    location_id: Mapped[int | None] = mapped_column(Integer, ForeignKey("locations.id"))
+    location_id: Mapped[int | None] = mapped_column(Integer, ForeignKey("locations.id"), index=True)
     location: Mapped[Location | None] = relationship("Location", back_populates="sessions")
 
-    instructor_id: Mapped[int | None] = mapped_column(Integer, ForeignKey("instructors.id"))
+    instructor_id: Mapped[int | None] = mapped_column(Integer, ForeignKey("instructors.id"), index=True)
     instructor: Mapped[Instructor | None] = relationship("Instructor", back_populates="sessions")
 
     start_utc: Mapped[datetime | None] = mapped_column(DateTime(timezone=True))
@@ -177,7 +186,7 @@ class Order(Base):
 
     stripe_order_number: Mapped[str | None] = mapped_column(String(128), index=True)
 
-    student_id: Mapped[int | None] = mapped_column(Integer, ForeignKey("students.id"))
+    student_id: Mapped[int | None] = mapped_column(Integer, ForeignKey("students.id"), index=True)
     student: Mapped[Student | None] = relationship("Student", back_populates="orders")
 
     amount_cents: Mapped[int | None] = mapped_column(Integer)
@@ -202,13 +211,13 @@ class Booking(Base):
 
     hovn_booking_ref: Mapped[str] = mapped_column(String(64), unique=True, nullable=False)
 
-    student_id: Mapped[int | None] = mapped_column(Integer, ForeignKey("students.id"))
+    student_id: Mapped[int | None] = mapped_column(Integer, ForeignKey("students.id"), index=True)
     student: Mapped[Student | None] = relationship("Student", back_populates="bookings")
 
-    session_id: Mapped[int | None] = mapped_column(Integer, ForeignKey("sessions.id"))
+    session_id: Mapped[int | None] = mapped_column(Integer, ForeignKey("sessions.id"), index=True)
     session: Mapped[Session | None] = relationship("Session", back_populates="bookings")
 
-    order_id: Mapped[int | None] = mapped_column(Integer, ForeignKey("orders.id"))
+    order_id: Mapped[int | None] = mapped_column(Integer, ForeignKey("orders.id"), index=True)
     order: Mapped[Order | None] = relationship("Order", back_populates="bookings")
 
     status: Mapped[str | None] = mapped_column(String(50), default="active")
@@ -226,7 +235,7 @@ class Certificate(Base):
     # Use Red Cross cert_id as unique identifier
     cert_id: Mapped[str] = mapped_column(String(32), primary_key=True)
 
-    student_id: Mapped[int] = mapped_column(Integer, ForeignKey("students.id"), nullable=False)
+    student_id: Mapped[int] = mapped_column(Integer, ForeignKey("students.id"), nullable=False, index=True)
     student: Mapped[Student] = relationship("Student", back_populates="certificates")
 
     course_name: Mapped[str | None] = mapped_column(String(255))
@@ -237,6 +246,51 @@ class Certificate(Base):
     instructor_name: Mapped[str | None] = mapped_column(String(255))
 
     issue_date: Mapped[date | None] = mapped_column(Date)
-    expiry_date: Mapped[date | None] = mapped_column(Date)
+    expiry_date: Mapped[date | None] = mapped_column(Date, index=True)
+
+    added_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
+
+# --------------------------- SYNC STATE ----------------------------
+class SyncState(Base):
+    """Per-feed high-water mark for incremental syncs (see hovn_incremental.py)."""
+    __tablename__ = "sync_state"
+
+    name: Mapped[str] = mapped_column(String(64), primary_key=True)
+
+    # Newest source-side updatedAt that has been fully ingested
+    watermark: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
+
+    # Set while a walk cut short by the page cap is unfinished: the listing
+    # page to continue from, and the watermark to adopt once it completes
+    resume_page: Mapped[int | None] = mapped_column(Integer, nullable=True)
+    resume_watermark: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
+
+    last_run_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
+    last_run_stats: Mapped[str | None] = mapped_column(Text, nullable=True)  # JSON
+
+    updated_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False
+    )
+
+
+# --------------------------- INGEST LEDGER ----------------------------
+class IngestLedger(Base):
+    """Per booking ref: what we last fetched from Hovn and how it went (see ingest_ledger.py)."""
+    __tablename__ = "ingest_ledger"
+
+    booking_ref: Mapped[str] = mapped_column(String(64), primary_key=True)
+
+    # sha256 of the normalized bundle last written
+    source_hash: Mapped[str | None] = mapped_column(String(64), nullable=True)
 
-    added_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
\ No newline at end of file
+    outcome: Mapped[str | None] = mapped_column(String(16), nullable=True)  # ok | unchanged | failed
+    error: Mapped[str | None] = mapped_column(Text, nullable=True)
+    failures: Mapped[int] = mapped_column(Integer, default=0, nullable=False)  # consecutive
+
+    last_fetched_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
+    last_success_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
+    next_retry_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
+
+    updated_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False
+    )
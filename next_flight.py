@@ -0,0 +1,370 @@
+# next_flight.py
+# --------------
+# Decoder for the Next.js Flight (React Server Components) payload that
+# Hovn's admin pages embed as self.__next_f.push([1, "..."]) calls.
+#
+# The string chunks are concatenated back into the RSC stream, which is a
+# sequence of rows:
+#
+#   0:["$","div",null,{...}]          JSON row
+#   a:{"booking":{...,"course":"$b"}} JSON row pointing at row "b"
+#   b:{"id":12,"name":"Adult CPR"}
+#   c:I[1234,["chunk.js"],"Page"]     tagged row (import, hint, error, ...)
+#   d:T1a,<0x1a bytes of text>        length-prefixed text row
+#
+# Rows are decoded once into a table. Values are handed out as FlightDict /
+# FlightList views that resolve "$<row>" / "$<row>:path:to" references,
+# "$D" dates, "$undefined" etc. only when accessed; to_python() materializes
+# a plain dict/list tree (cycle safe).
+#
+#   doc = parse_flight(html)
+#   booking = find_booking(doc, "brn_YZWADB")     # FlightDict
+#   booking["courseSession"]["course"]["name"]    # "$b" resolved on access
+#   doc.find_all("bookings")                      # every value under that key
+#   doc.find_dicts(referenceNumber="brn_YZWADB")
+
+import json
+import re
+from collections.abc import Mapping, Sequence
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+_PUSH_MARKER = "self.__next_f.push("
+_ROW_ID_RE = re.compile(r"([0-9a-fA-F]+):")
+_TAG_RE = re.compile(r"[A-Z]+")
+_HEX = frozenset("0123456789abcdefABCDEF")
+
+_decoder = json.JSONDecoder()
+
+# Longest "$a" -> "$b" -> ... chain followed before giving up
+MAX_REF_CHAIN = 32
+
+_SPECIAL_STRINGS = {
+    "$undefined": None,
+    "$Infinity": float("inf"),
+    "$-Infinity": float("-inf"),
+    "$NaN": float("nan"),
+    "$-0": -0.0,
+}
+
+_MISSING = object()
+
+
+# ------------------------------------------------------
+# STREAM
+# ------------------------------------------------------
+
+def flight_chunks(html: str) -> List[str]:
+    """The string payloads of every self.__next_f.push([1, "..."]) call, in order."""
+    chunks: List[str] = []
+    pos = html.find(_PUSH_MARKER)
+    while pos != -1:
+        start = pos + len(_PUSH_MARKER)
+        # A push call can't run past its </script> (the JS string would have
+        # it escaped), so decode only up to there: a JSONDecodeError counts
+        # lines from the start of what it was given, not of the whole page.
+        stop = html.find("</script>", start)
+        stop = len(html) if stop == -1 else stop
+        try:
+            arr, rel_end = _decoder.raw_decode(html[start:stop])
+        except (json.JSONDecodeError, RecursionError):
+            end = start
+        else:
+            end = start + rel_end
+            if isinstance(arr, list) and len(arr) >= 2 and arr[0] == 1 and isinstance(arr[1], str):
+                chunks.append(arr[1])
+        pos = html.find(_PUSH_MARKER, end)
+    return chunks
+
+
+def _take_utf8(s: str, start: int, nbytes: int) -> str:
+    # T rows are length-prefixed in UTF-8 bytes; every char is >= 1 byte,
+    # so the first nbytes chars always cover them.
+    chunk = s[start:start + nbytes]
+    data = chunk.encode("utf-8")
+    if len(data) == nbytes:
+        return chunk
+    return data[:nbytes].decode("utf-8", errors="ignore")
+
+
+def parse_rows(stream: str) -> Tuple[Dict[str, Any], Dict[str, Tuple[str, Any]]]:
+    """
+    Split an RSC stream into ({row id: JSON value or text}, {row id: (tag, payload)}).
+    Lines that aren't rows (HTML around a pre-decoded fixture) are skipped.
+    """
+    rows: Dict[str, Any] = {}
+    tagged: Dict[str, Tuple[str, Any]] = {}
+    pos, n = 0, len(stream)
+
+    while pos < n:
+        m = _ROW_ID_RE.match(stream, pos)
+        if m is None:
+            nl = stream.find("\n", pos)
+            pos = n if nl == -1 else nl + 1
+            continue
+
+        row_id = m.group(1)
+        pos = m.end()
+
+        if stream.startswith("T", pos):
+            comma = stream.find(",", pos)
+            try:
+                length = int(stream[pos + 1:comma], 16)
+            except ValueError:
+                length = None
+            if comma != -1 and length is not None:
+                text = _take_utf8(stream, comma + 1, length)
+                rows[row_id] = text
+                pos = comma + 1 + len(text)
+                continue
+
+        tag_m = _TAG_RE.match(stream, pos)
+        tag = tag_m.group(0) if tag_m else ""
+        value_start = tag_m.end() if tag_m else pos
+
+        # JSON rows are one line each; decoding just that line keeps a
+        # malformed row's error (and its line count) local to the row
+        nl = stream.find("\n", value_start)
+        line_end = n if nl == -1 else nl
+        try:
+            value, rel_end = _decoder.raw_decode(stream[value_start:line_end])
+            end = value_start + rel_end
+        except (json.JSONDecodeError, RecursionError):
+            end = line_end
+            value = stream[value_start:end]
+            tag = tag or "?"
+
+        if tag:
+            tagged[row_id] = (tag, value)
+        else:
+            rows[row_id] = value
+
+        nl = stream.find("\n", end)
+        pos = n if nl == -1 else nl + 1
+
+    return rows, tagged
+
+
+# ------------------------------------------------------
+# LAZY VIEWS
+# ------------------------------------------------------
+
+class FlightDict(Mapping):
+    """Read-only view of a Flight object; references resolve on access."""
+
+    __slots__ = ("_doc", "_raw")
+
+    def __init__(self, doc: "FlightDocument", raw: Dict[str, Any]):
+        self._doc = doc
+        self._raw = raw
+
+    def __getitem__(self, key):
+        return self._doc.wrap(self._raw[key])
+
+    def __iter__(self):
+        return iter(self._raw)
+
+    def __len__(self):
+        return len(self._raw)
+
+    def __repr__(self):
+        return f"FlightDict({self._raw!r:.200})"
+
+    def to_python(self) -> Dict[str, Any]:
+        return self._doc.to_python(self._raw)
+
+
+class FlightList(Sequence):
+    """Read-only view of a Flight array; references resolve on access."""
+
+    __slots__ = ("_doc", "_raw")
+
+    def __init__(self, doc: "FlightDocument", raw: List[Any]):
+        self._doc = doc
+        self._raw = raw
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [self._doc.wrap(v) for v in self._raw[i]]
+        return self._doc.wrap(self._raw[i])
+
+    def __len__(self):
+        return len(self._raw)
+
+    def __repr__(self):
+        return f"FlightList({self._raw!r:.200})"
+
+    def to_python(self) -> List[Any]:
+        return self._doc.to_python(self._raw)
+
+
+# ------------------------------------------------------
+# DOCUMENT
+# ------------------------------------------------------
+
+class FlightDocument:
+    def __init__(self, rows: Dict[str, Any], tagged: Optional[Dict[str, Tuple[str, Any]]] = None):
+        self.rows = rows
+        self.tagged = tagged or {}
+        self._index: Optional[Dict[str, List[Dict[str, Any]]]] = None
+
+    def __len__(self):
+        return len(self.rows)
+
+    # ---------- references ----------
+
+    def _deref(self, ref: str) -> Any:
+        row_id, *path = ref.split(":")
+        value = self.rows.get(row_id, _MISSING)
+        if value is _MISSING:
+            return _MISSING
+        for seg in path:
+            value = self.resolve(value)
+            if isinstance(value, dict):
+                value = value.get(seg, _MISSING)
+            elif isinstance(value, list) and seg.isdigit() and int(seg) < len(value):
+                value = value[int(seg)]
+            else:
+                return _MISSING
+            if value is _MISSING:
+                return _MISSING
+        return value
+
+    def resolve(self, value: Any) -> Any:
+        """
+        Decode one raw value: "$..." strings become their target (a raw
+        dict/list from the row table) or scalar; everything else is
+        returned as is. Unresolvable references stay as their string.
+        """
+        for _ in range(MAX_REF_CHAIN):
+            if not isinstance(value, str) or len(value) < 2 or value[0] != "$":
+                return value
+            if value in _SPECIAL_STRINGS:
+                return _SPECIAL_STRINGS[value]
+
+            kind = value[1]
+            if kind == "$":
+                return value[1:]
+            if kind == "D":
+                return value[2:]
+            if kind == "n":
+                try:
+                    return int(value[2:])
+                except ValueError:
+                    return value
+            if kind in "L@QW":
+                # lazy component / promise / Map / Set: all point at a row
+                target = self._deref(value[2:])
+            elif kind in _HEX:
+                target = self._deref(value[1:])
+            else:
+                # $S symbols, $F/$h server refs, $K form data, $B blobs, ...
+                return value
+
+            if target is _MISSING:
+                return value
+            value = target
+        return value
+
+    def wrap(self, value: Any) -> Any:
+        value = self.resolve(value)
+        if isinstance(value, dict):
+            return FlightDict(self, value)
+        if isinstance(value, list):
+            return FlightList(self, value)
+        return value
+
+    def to_python(self, value: Any, _stack: Optional[set] = None) -> Any:
+        """Fully resolved plain copy; a reference back into its own ancestors becomes None."""
+        if isinstance(value, (FlightDict, FlightList)):
+            value = value._raw
+        value = self.resolve(value)
+        if not isinstance(value, (dict, list)):
+            return value
+
+        stack = _stack if _stack is not None else set()
+        if id(value) in stack:
+            return None
+        stack.add(id(value))
+        try:
+            if isinstance(value, dict):
+                return {k: self.to_python(v, stack) for k, v in value.items()}
+            return [self.to_python(v, stack) for v in value]
+        finally:
+            stack.discard(id(value))
+
+    def row(self, row_id: str) -> Any:
+        return self.wrap(self.rows.get(row_id))
+
+    # ---------- queries ----------
+
+    def _build_index(self) -> Dict[str, List[Dict[str, Any]]]:
+        # One pre-order walk over every row's raw tree, in document order:
+        # key -> dicts that have it. References aren't followed, so each
+        # object is visited once.
+        index: Dict[str, List[Dict[str, Any]]] = {}
+        stack: List[Any] = list(reversed(list(self.rows.values())))
+        while stack:
+            v = stack.pop()
+            if isinstance(v, dict):
+                for k in v:
+                    index.setdefault(k, []).append(v)
+                children = v.values()
+            elif isinstance(v, list):
+                children = v
+            else:
+                continue
+            stack.extend(reversed([c for c in children if isinstance(c, (dict, list))]))
+        return index
+
+    @property
+    def index(self) -> Dict[str, List[Dict[str, Any]]]:
+        if self._index is None:
+            self._index = self._build_index()
+        return self._index
+
+    def find_all(self, key: str) -> List[Any]:
+        """Every value stored under `key` anywhere in the document (wrapped)."""
+        return [self.wrap(d[key]) for d in self.index.get(key, ())]
+
+    def find_first(self, key: str, default: Any = None) -> Any:
+        for d in self.index.get(key, ()):
+            return self.wrap(d[key])
+        return default
+
+    def find_dicts(self, **match: Any) -> Iterator[FlightDict]:
+        """Objects whose (resolved) fields equal every keyword, e.g. referenceNumber="brn_X"."""
+        if not match:
+            return
+        first_key = next(iter(match))
+        for d in self.index.get(first_key, ()):
+            if all(k in d and self.resolve(d[k]) == v for k, v in match.items()):
+                yield FlightDict(self, d)
+
+
+def parse_flight(html: str) -> FlightDocument:
+    """
+    Page HTML (or an already-joined RSC stream) -> FlightDocument. Pages
+    without push calls are parsed as a stream directly.
+    """
+    chunks = flight_chunks(html)
+    stream = "".join(chunks) if chunks else html
+    rows, tagged = parse_rows(stream)
+    return FlightDocument(rows, tagged)
+
+
+# ------------------------------------------------------
+# HOVN HELPERS
+# ------------------------------------------------------
+
+def find_booking(doc: FlightDocument, booking_ref: str) -> Optional[FlightDict]:
+    """
+    The booking object for booking_ref: the page's "booking" prop if it
+    matches, otherwise any object with that referenceNumber (e.g. an entry
+    of a session page's "bookings" array).
+    """
+    for b in doc.find_all("booking"):
+        if isinstance(b, FlightDict) and b.get("referenceNumber") == booking_ref:
+            return b
+    for b in doc.find_dicts(referenceNumber=booking_ref):
+        return b
+    return None
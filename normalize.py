@@ -1,6 +1,7 @@
 import re
 import json
 from datetime import datetime
+from decimal import Decimal, InvalidOperation, ROUND_HALF_UP
 import phonenumbers
 from zoneinfo import ZoneInfo
 
@@ -134,4 +135,102 @@ def normalize_full_bundle(bundle: dict):
         },
     }
 
-    return normalized
\ No newline at end of file
+    return normalized
+
+# ------------------------------------------------------
+# Helpers for normalized_pipeline / hovn_roster_ingest
+# (typed values for the ORM rather than the ISO strings above)
+# ------------------------------------------------------
+
+def normalize_phone_e164(raw: str | None) -> str | None:
+    return _parse_phone(raw)
+
+
+def parse_currency_to_cents(value) -> int | None:
+    """
+    "$95.00" -> 9500. Ints are taken as cents already (Hovn's JSON
+    stores prices that way).
+    """
+    if value is None or isinstance(value, bool):
+        return None
+    if isinstance(value, int):
+        return value
+    # Decimal, not float: int(19.99 * 100) is 1998
+    v = str(value).replace("$", "").replace(",", "").strip()
+    try:
+        return int((Decimal(v) * 100).to_integral_value(ROUND_HALF_UP))
+    except (InvalidOperation, ValueError, OverflowError):
+        return None
+
+
+def parse_iso_utc_and_local(iso_str: str | None):
+    """
+    Return (utc datetime, America/Chicago datetime), or (None, None).
+    """
+    if not iso_str:
+        return None, None
+    try:
+        dt = datetime.fromisoformat(iso_str.replace("Z", "+00:00"))
+    except ValueError:
+        return None, None
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=ZoneInfo("UTC"))
+    return dt.astimezone(ZoneInfo("UTC")), dt.astimezone(ZoneInfo(CENTRAL_TZ))
+
+
+_STATE_ZIP_RE = re.compile(r"^([A-Z]{2})\s+(\d{5})(?:-\d{4})?$")
+
+
+def parse_address_block(raw: str | None) -> dict:
+    """
+    Split an address into Location columns. Comma separated
+    ("2331 Willow Rd, Glenview, IL 60025, USA") is split on the commas;
+    anything else goes through _parse_address.
+    """
+    out = {
+        "address_line1": None,
+        "city": None,
+        "state": None,
+        "postal_code": None,
+        "country_code": None,
+        "raw_address": raw,
+    }
+    if not raw:
+        return out
+
+    text = " ".join(raw.split())
+    parts = [p.strip() for p in text.split(",") if p.strip()]
+    if parts and parts[-1].upper() in ("US", "USA", "UNITED STATES"):
+        parts.pop()
+
+    m = _STATE_ZIP_RE.match(parts[-1]) if parts else None
+    if m and len(parts) >= 3:
+        out["address_line1"] = ", ".join(parts[:-2])
+        out["city"] = parts[-2]
+        out["state"], out["postal_code"] = m.group(1), m.group(2)
+    else:
+        street, city, state, zipcode = _parse_address(text)
+        out["address_line1"], out["city"], out["state"], out["postal_code"] = street, city, state, zipcode
+
+    out["country_code"] = "US"
+    return out
+
+
+def parse_instructor_name_and_title(raw: str | None) -> dict:
+    """
+    "Jane Doe\nLead" -> full_name "Jane Doe", title "Lead".
+    """
+    if not raw:
+        return {"full_name": None, "first_name": None, "last_name": None, "title": None}
+
+    lines = [l.strip() for l in raw.split("\n") if l.strip()]
+    full_name = lines[0] if lines else raw.strip()
+    title = lines[1] if len(lines) > 1 else None
+    first, last = _split_name(full_name)
+    return {"full_name": full_name, "first_name": first, "last_name": last, "title": title}
+
+
+def extract_hovn_id_from_path(url_or_path) -> str | None:
+    if url_or_path is None:
+        return None
+    return extract_last_path(str(url_or_path))
@@ -27,6 +27,7 @@ from normalize import (
     extract_hovn_id_from_path,
 )
 from hovn_scraper import scrape_booking_and_session
+from dimension_cache import dimension_cache
 
 
 # Ensure tables exist
@@ -37,13 +38,7 @@ def init_db() -> None:
 def get_or_create_agency(db, name: Optional[str]) -> Optional[Agency]:
     if not name:
         return None
-    stmt = select(Agency).where(Agency.name == name)
-    agency = db.execute(stmt).scalar_one_or_none()
-    if agency:
-        return agency
-    agency = Agency(name=name)
-    db.add(agency)
-    db.flush()
+    agency, _ = dimension_cache.get_or_create(db, Agency, {"name": name})
     return agency
 
 
@@ -51,22 +46,9 @@ def get_or_create_course(db, name: Optional[str], fmt: Optional[str], agency: Op
     if not name:
         return None
     agency_id = agency.id if agency else None
-    stmt = select(Course).where(
-        Course.name == name,
-        Course.format == fmt,
-        Course.agency_id == agency_id,
-    )
-    course = db.execute(stmt).scalar_one_or_none()
-    if course:
-        return course
-
-    course = Course(
-        name=name,
-        format=fmt,
-        agency_id=agency_id,
+    course, _ = dimension_cache.get_or_create(
+        db, Course, {"name": name, "format": fmt, "agency_id": agency_id}
     )
-    db.add(course)
-    db.flush()
     return course
 
 
@@ -76,28 +58,21 @@ def get_or_create_location(db, name: Optional[str], address_raw: Optional[str])
 
     parsed = parse_address_block(address_raw)
 
-    stmt = select(Location).where(
-        Location.name == name,
-        Location.address_line1 == parsed["address_line1"],
-        Location.city == parsed["city"],
-        Location.state == parsed["state"],
-        Location.postal_code == parsed["postal_code"],
+    loc, _ = dimension_cache.get_or_create(
+        db,
+        Location,
+        {
+            "name": name,
+            "address_line1": parsed["address_line1"],
+            "city": parsed["city"],
+            "state": parsed["state"],
+            "postal_code": parsed["postal_code"],
+        },
+        defaults={
+            "country_code": parsed["country_code"],
+            "raw_address": parsed["raw_address"],
+        },
     )
-    loc = db.execute(stmt).scalar_one_or_none()
-    if loc:
-        return loc
-
-    loc = Location(
-        name=name,
-        address_line1=parsed["address_line1"],
-        city=parsed["city"],
-        state=parsed["state"],
-        postal_code=parsed["postal_code"],
-        country_code=parsed["country_code"],
-        raw_address=parsed["raw_address"],
-    )
-    db.add(loc)
-    db.flush()
     return loc
 
 
@@ -108,22 +83,20 @@ def get_or_create_instructor(db, raw_name: Optional[str]) -> Optional[Instructor
     parsed = parse_instructor_name_and_title(raw_name)
     full_name = parsed["full_name"]
 
-    stmt = select(Instructor).where(Instructor.full_name == full_name)
-    inst = db.execute(stmt).scalar_one_or_none()
-    if inst:
-        # Update title if changed
-        if parsed["title"] and inst.title != parsed["title"]:
-            inst.title = parsed["title"]
-        return inst
-
-    inst = Instructor(
-        full_name=full_name,
-        first_name=parsed["first_name"],
-        last_name=parsed["last_name"],
-        title=parsed["title"],
+    inst, created = dimension_cache.get_or_create(
+        db,
+        Instructor,
+        {"full_name": full_name},
+        defaults={
+            "first_name": parsed["first_name"],
+            "last_name": parsed["last_name"],
+            "title": parsed["title"],
+        },
     )
-    db.add(inst)
-    db.flush()
+    # Update title if changed
+    if not created and parsed["title"] and inst.title != parsed["title"]:
+        inst.title = parsed["title"]
+        dimension_cache.invalidate(Instructor, (full_name,))
     return inst
 
 
@@ -0,0 +1,160 @@
+# raw_archive.py
+# --------------
+# Optional capture of raw upstream responses (ARC cert searches, Hovn
+# booking/session pages) so a parser fix can be re-applied from disk
+# with replay_archive.py instead of re-scraping everything live.
+#
+# Enabled by setting RAW_ARCHIVE_DIR. Layout:
+#
+#   $RAW_ARCHIVE_DIR/objects/ab/abcdef...gz   gzip body, named by sha256 of the body
+#   $RAW_ARCHIVE_DIR/index.jsonl              one line per fetch:
+#       {"source", "key", "url", "fetched_at", "sha256", "size", "status"}
+#
+# Identical bodies are stored once; every fetch still gets an index line,
+# so the index is the (url, fetch time) -> content history.
+#
+# Capturing never raises into the scraper: a full disk just logs.
+
+import gzip
+import hashlib
+import json
+import os
+import threading
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterator, Optional
+
+RAW_ARCHIVE_DIR = os.getenv("RAW_ARCHIVE_DIR", "")
+RAW_ARCHIVE_ENABLED = bool(RAW_ARCHIVE_DIR)
+
+# gzip level: 6 is ~the same ratio as 9 on HTML at a fraction of the CPU
+RAW_ARCHIVE_GZIP_LEVEL = int(os.getenv("RAW_ARCHIVE_GZIP_LEVEL", "6"))
+
+# Sources
+ARC_SEARCH = "arc_search"
+HOVN_BOOKING_PAGE = "hovn_booking_page"
+HOVN_SESSION_PAGE = "hovn_session_page"
+HOVN_ADMIN_BOOKING_HTML = "hovn_admin_booking_html"
+HOVN_ROSTER_HTML = "hovn_roster_html"
+HOVN_BOOKINGS_LISTING = "hovn_bookings_listing"
+
+_index_lock = threading.Lock()
+
+
+def _object_path(root: str, sha: str) -> str:
+    return os.path.join(root, "objects", sha[:2], sha + ".gz")
+
+
+def capture(
+    source: str,
+    url: str,
+    body: str | bytes,
+    key: Optional[str] = None,
+    status: Optional[int] = None,
+    root: Optional[str] = None,
+) -> Optional[str]:
+    """
+    Store one response body and append it to the index. Returns the
+    sha256 of the body, or None if archiving is off or failed.
+    """
+    root = root or RAW_ARCHIVE_DIR
+    if not root or body is None:
+        return None
+
+    try:
+        data = body.encode("utf-8") if isinstance(body, str) else body
+        sha = hashlib.sha256(data).hexdigest()
+
+        path = _object_path(root, sha)
+        if not os.path.exists(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+            with gzip.open(tmp, "wb", compresslevel=RAW_ARCHIVE_GZIP_LEVEL) as f:
+                f.write(data)
+            os.replace(tmp, path)
+
+        _append_index(root, source, key, url, sha, len(data), status)
+        return sha
+    except Exception as e:
+        print(f"[ARCHIVE] capture failed for {url}: {e}")
+        return None
+
+
+def link(
+    source: str,
+    url: str,
+    sha: str,
+    key: Optional[str] = None,
+    size: Optional[int] = None,
+    root: Optional[str] = None,
+) -> None:
+    """
+    Index an already-stored body under another key without fetching it
+    again (e.g. one session page shared by every booking in the class).
+    """
+    root = root or RAW_ARCHIVE_DIR
+    if not root or not sha:
+        return
+    try:
+        _append_index(root, source, key, url, sha, size, None)
+    except Exception as e:
+        print(f"[ARCHIVE] link failed for {url}: {e}")
+
+
+def _append_index(root: str, source: str, key: Optional[str], url: str, sha: str, size: Optional[int], status: Optional[int]) -> None:
+    entry = {
+        "source": source,
+        "key": key,
+        "url": url,
+        "fetched_at": datetime.now(timezone.utc).isoformat(),
+        "sha256": sha,
+        "size": size,
+        "status": status,
+    }
+    line = json.dumps(entry, separators=(",", ":")) + "\n"
+    with _index_lock:
+        with open(os.path.join(root, "index.jsonl"), "a", encoding="utf-8") as f:
+            f.write(line)
+
+
+def load_body(sha: str, root: Optional[str] = None) -> str:
+    with gzip.open(_object_path(root or RAW_ARCHIVE_DIR, sha), "rb") as f:
+        return f.read().decode("utf-8")
+
+
+def iter_index(
+    source: Optional[str] = None,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    root: Optional[str] = None,
+) -> Iterator[Dict[str, Any]]:
+    """Index entries in fetch order, filtered by source and fetch time."""
+    path = os.path.join(root or RAW_ARCHIVE_DIR, "index.jsonl")
+    if not os.path.exists(path):
+        return
+
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                entry = json.loads(line)
+            except json.JSONDecodeError:
+                continue  # torn write at the end of the file
+            if source and entry.get("source") != source:
+                continue
+            if since or until:
+                fetched = datetime.fromisoformat(entry["fetched_at"])
+                if since and fetched < since:
+                    continue
+                if until and fetched > until:
+                    continue
+            yield entry
+
+
+def latest_by_key(source: str, **kwargs: Any) -> Dict[str, Dict[str, Any]]:
+    """{key: newest index entry} for one source (later lines win)."""
+    out: Dict[str, Dict[str, Any]] = {}
+    for entry in iter_index(source=source, **kwargs):
+        out[entry.get("key") or entry["url"]] = entry
+    return out
@@ -1,6 +1,14 @@
 # redcross.py
-import requests
-from bs4 import BeautifulSoup
+import asyncio
+import os
+from typing import AsyncIterator, Iterable, Iterator
+from urllib.parse import urlencode
+
+import aiohttp
+
+from arc_parser import parse_certs
+from http_transport import PooledTransport, TokenBucket
+import raw_archive
 
 BASE_URL = (
     "https://www.redcross.org/on/demandware.store/"
@@ -20,66 +28,121 @@ HEADERS = {
     "X-Requested-With": "XMLHttpRequest",
 }
 
-def determine_format(course_code: str):
-    code = (course_code or "").upper()
-    if "BL" in code:
-        return "Blended"
-    if "OL" in code or code.startswith("ROC"):
-        return "Online"
-    return "Instructor-Led"
+# Max in-flight ARC requests for bulk lookups (scrape_certs_for_emails)
+ARC_CONCURRENCY = int(os.getenv("ARC_CONCURRENCY", "8"))
+
+# Shared keep-alive transport for redcross.org (per worker process)
+ARC_TRANSPORT = PooledTransport(
+    name="ARC",
+    headers=HEADERS,
+    pool_size=max(ARC_CONCURRENCY, int(os.getenv("ARC_POOL_SIZE", "16"))),
+    connect_timeout=float(os.getenv("ARC_CONNECT_TIMEOUT", "5")),
+    read_timeout=float(os.getenv("ARC_READ_TIMEOUT", "20")),
+    max_retries=int(os.getenv("ARC_MAX_RETRIES", "4")),
+    backoff_base=float(os.getenv("ARC_BACKOFF_BASE", "0.5")),
+    backoff_cap=float(os.getenv("ARC_BACKOFF_CAP", "30")),
+    rate_limiter=TokenBucket(
+        rate=float(os.getenv("ARC_RATE_PER_SEC", "5")),
+        burst=int(os.getenv("ARC_RATE_BURST", "10")),
+    ),
+)
+
 
+def _parse_certs_html(html: str):
+    return [c.as_dict() for c in parse_certs(html)]
 
-def scrape_certs_for_email(email: str):
+
+def scrape_certs_for_email(email: str, base_url: str = BASE_URL, transport: PooledTransport = ARC_TRANSPORT):
     params = {
         "email": email,
         "format": "ajax"
     }
 
-    resp = requests.get(BASE_URL, params=params, headers=HEADERS)
+    resp = transport.get(base_url, params=params)
     resp.raise_for_status()
 
-    soup = BeautifulSoup(resp.text, "html.parser")
-
-    inputs = soup.select("input.certpdfdownload")
-
-    certs = []
-
-    for tag in inputs:
-        raw = tag.get("value", "")
-        parts = raw.split("|")
-
-        # Red Cross format indexes:
-        # 0  id-XXXXXX
-        # 1  TS/walletpdftemplate
-        # 2  cert PDF URL
-        # 3  Org / Provider
-        # 4  AAS number
-        # 5  Course name
-        # 6  Course code
-        # 7  ?
-        # 8  Format (text)
-        # 9  Active/Expired
-        # 10 "Certifications"
-        # 11 Student name
-        # 12 Provider / Org
-        # 13 Issue date
-        # 14 Expiry date
-        # 15 Validity length
-        # 16 Instructor name
-        # 17 Cert number duplicated
-
-        course_code = parts[6] if len(parts) > 6 else ""
-        format_label = determine_format(course_code)
-
-        certs.append({
-            "cert_id": parts[0].replace("id-", "") if len(parts) > 0 else "",
-            "course_name": parts[5] if len(parts) > 5 else "",
-            "course_code": course_code,
-            "format": format_label,
-            "issue_date": parts[13] if len(parts) > 13 else "",
-            "expiry_date": parts[14] if len(parts) > 14 else "",
-            "agency_org_name": parts[3] if len(parts) > 3 else "",
-            "instructor_name": parts[16] if len(parts) > 16 else "",
-        })
-
-    return certs
\ No newline at end of file
+    if raw_archive.RAW_ARCHIVE_ENABLED:
+        raw_archive.capture(raw_archive.ARC_SEARCH, resp.url, resp.text, key=email.lower(), status=resp.status_code)
+
+    return _parse_certs_html(resp.text)
+
+
+# ------------------------------------------------------
+# BULK LOOKUPS (asyncio)
+# ------------------------------------------------------
+
+async def _fetch_certs_async(
+    http: aiohttp.ClientSession,
+    email: str,
+    base_url: str,
+    transport: PooledTransport,
+):
+    params = {"email": email, "format": "ajax"}
+    html = await transport.get_text_async(http, base_url, params=params)
+
+    if raw_archive.RAW_ARCHIVE_ENABLED:
+        url = f"{base_url}?{urlencode(params)}"
+        await asyncio.to_thread(raw_archive.capture, raw_archive.ARC_SEARCH, url, html, email.lower(), 200)
+
+    return _parse_certs_html(html)
+
+
+async def scrape_certs_for_emails_async(
+    emails: Iterable[str],
+    concurrency: int = ARC_CONCURRENCY,
+    base_url: str = BASE_URL,
+    transport: PooledTransport = ARC_TRANSPORT,
+) -> AsyncIterator[tuple[str, list, Exception | None]]:
+    """
+    Look up many emails against ARC with at most `concurrency` requests
+    in flight. Yields (email, certs, error) tuples in completion order;
+    a failed lookup yields ([], exc) instead of aborting the batch.
+    Requests share the transport's rate limiter and retry policy.
+    """
+    unique = list(dict.fromkeys(e.strip().lower() for e in emails if e and e.strip()))
+    if not unique:
+        return
+
+    sem = asyncio.Semaphore(max(1, concurrency))
+
+    async with transport.client_session() as http:
+
+        async def one(email: str):
+            async with sem:
+                try:
+                    return email, await _fetch_certs_async(http, email, base_url, transport), None
+                except Exception as e:
+                    return email, [], e
+
+        tasks = [asyncio.create_task(one(e)) for e in unique]
+        try:
+            for fut in asyncio.as_completed(tasks):
+                yield await fut
+        finally:
+            for t in tasks:
+                t.cancel()
+
+
+def scrape_certs_for_emails(
+    emails: Iterable[str],
+    concurrency: int = ARC_CONCURRENCY,
+    base_url: str = BASE_URL,
+    transport: PooledTransport = ARC_TRANSPORT,
+) -> Iterator[tuple[str, list, Exception | None]]:
+    """
+    Sync wrapper around scrape_certs_for_emails_async for scripts and
+    FastAPI sync routes. Results are yielded as each lookup completes.
+    """
+    loop = asyncio.new_event_loop()
+    agen = scrape_certs_for_emails_async(
+        emails, concurrency=concurrency, base_url=base_url, transport=transport
+    )
+    try:
+        while True:
+            try:
+                yield loop.run_until_complete(agen.__anext__())
+            except StopAsyncIteration:
+                break
+    finally:
+        loop.run_until_complete(agen.aclose())
+        loop.close()
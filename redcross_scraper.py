@@ -1,6 +1,5 @@
-import requests
-from bs4 import BeautifulSoup
-from datetime import datetime
+from arc_parser import parse_certs
+from redcross import ARC_TRANSPORT
 
 
 HEADERS = {
@@ -24,50 +23,17 @@ def scrape_redcross_certificates(email: str):
         f"?email={email}&format=ajax"
     )
 
-    r = requests.get(url, headers=HEADERS, timeout=15)
+    r = ARC_TRANSPORT.get(url, headers=HEADERS)
 
     if r.status_code != 200:
         raise Exception(f"Red Cross HTML fetch failed ({r.status_code})")
 
-    soup = BeautifulSoup(r.text, "html.parser")
-    results = []
-
-    # Each cert row is a .certificate-heading-list.result-certificate-dt
-    cert_blocks = soup.select(".certificate-heading-list.result-certificate-dt")
-
-    for block in cert_blocks:
-        certpdf_input = block.select_one("input.certpdfdownload")
-
-        if not certpdf_input:
-            continue
-
-        raw_value = certpdf_input.get("value")
-        parts = raw_value.split("|")
-
-        # Parse values
-        cert_id = parts[0].replace("id-", "").strip()
-        course_name = parts[5].strip()
-        issue_date_raw = parts[13].strip()
-        expire_date_raw = parts[14].strip()
-
-        # Convert dates
-        def try_parse(d):
-            try:
-                return datetime.strptime(d, "%m/%d/%Y").date()
-            except:
-                try:
-                    return datetime.strptime(d, "%b %d, %Y").date()
-                except:
-                    return None
-
-        issue_date = try_parse(issue_date_raw)
-        expire_date = try_parse(expire_date_raw)
-
-        results.append({
-            "cert_id": cert_id,
-            "course_name": course_name,
-            "issue_date": issue_date,
-            "expire_date": expire_date
-        })
-
-    return results
\ No newline at end of file
+    return [
+        {
+            "cert_id": c.cert_id,
+            "course_name": c.course_name,
+            "issue_date": c.issue_date,
+            "expire_date": c.expiry_date,
+        }
+        for c in parse_certs(r.text)
+    ]
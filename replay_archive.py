@@ -0,0 +1,232 @@
+#!/usr/bin/env python3
+# replay_archive.py
+# -----------------
+# Re-run parsing + persistence from responses captured by raw_archive.py
+# instead of re-scraping ARC / Hovn live. Only the newest capture per
+# email / booking ref is replayed.
+#
+# Usage:
+#   python replay_archive.py arc                         # re-parse every archived ARC search, upsert certs
+#   python replay_archive.py arc --dry-run               # parse only, print counts
+#   python replay_archive.py hovn-pages --since 2025-01-01
+#   python replay_archive.py hovn-admin --keys brn_ABC123 brn_DEF456
+#   python replay_archive.py hovn-http                   # admin pages through hovn_http_scraper
+#   python replay_archive.py hovn-roster                 # session/order pages through hovn_roster_ingest
+#   python replay_archive.py arc --archive-dir /mnt/backup/raw
+#
+# hovn-pages needs Playwright's bundled Chromium (no Edge, no Hovn login):
+# the archived DOM is loaded with page.set_content() and run through the
+# same XPath extraction as a live scrape.
+
+import argparse
+import time
+from datetime import datetime, timezone
+
+from sqlalchemy import func
+
+import raw_archive
+
+
+def _parse_when(s: str | None) -> datetime | None:
+    if not s:
+        return None
+    dt = datetime.fromisoformat(s)
+    return dt if dt.tzinfo else dt.replace(tzinfo=timezone.utc)
+
+
+def _select(source: str, args) -> dict:
+    entries = raw_archive.latest_by_key(
+        source, since=_parse_when(args.since), until=_parse_when(args.until), root=args.archive_dir
+    )
+    if args.keys:
+        wanted = {k.strip().lower() if source == raw_archive.ARC_SEARCH else k.strip() for k in args.keys}
+        entries = {k: v for k, v in entries.items() if k in wanted}
+    return entries
+
+
+# ------------------------------------------------------
+# ARC
+# ------------------------------------------------------
+
+def replay_arc(args) -> None:
+    from redcross import _parse_certs_html
+
+    entries = _select(raw_archive.ARC_SEARCH, args)
+    parsed = {}
+    for email, entry in entries.items():
+        parsed[email] = _parse_certs_html(raw_archive.load_body(entry["sha256"], root=args.archive_dir))
+
+    certs = sum(len(v) for v in parsed.values())
+    print(f"[REPLAY] parsed {len(parsed)} ARC responses, {certs} certs")
+    if args.dry_run:
+        return
+
+    from db import SessionLocal
+    from models import Student
+    from cert_store import CertUpsertBuffer
+
+    db = SessionLocal()
+    try:
+        students = {
+            s.email.lower(): s
+            for s in db.query(Student).filter(func.lower(Student.email).in_(list(parsed))).all()
+            if s.email
+        }
+        with CertUpsertBuffer(db) as buffer:
+            for email, arc in parsed.items():
+                student = students.get(email)
+                if student:
+                    buffer.add(student, arc)
+        print(
+            f"[REPLAY] {buffer.students_written} students: {buffer.certs_written} certs written, "
+            f"{buffer.certs_unchanged} unchanged, {len(parsed) - len(students)} emails with no student"
+        )
+    finally:
+        db.close()
+
+
+# ------------------------------------------------------
+# HOVN (Playwright page captures)
+# ------------------------------------------------------
+
+def replay_hovn_pages(args) -> None:
+    from playwright.sync_api import sync_playwright
+
+    from hovn_scraper import extract_from_archived_html
+    from normalize import normalize_full_bundle
+
+    bookings = _select(raw_archive.HOVN_BOOKING_PAGE, args)
+    sessions = _select(raw_archive.HOVN_SESSION_PAGE, args)
+
+    if not args.dry_run:
+        from db_pipeline import persist_full_normalized_bundle
+
+    ok = failed = 0
+    with sync_playwright() as p:
+        browser = p.chromium.launch(headless=True)
+        page = browser.new_page()
+        try:
+            for ref, entry in bookings.items():
+                try:
+                    booking_html = raw_archive.load_body(entry["sha256"], root=args.archive_dir)
+                    session_entry = sessions.get(ref)
+                    session_html = (
+                        raw_archive.load_body(session_entry["sha256"], root=args.archive_dir)
+                        if session_entry else None
+                    )
+                    scraped = extract_from_archived_html(page, ref, booking_html, session_html)
+                    normalized = normalize_full_bundle(scraped)
+                    if not args.dry_run:
+                        persist_full_normalized_bundle(normalized)
+                    ok += 1
+                except Exception as e:
+                    failed += 1
+                    print(f"[REPLAY] {ref}: {e}")
+        finally:
+            browser.close()
+
+    print(f"[REPLAY] {ok} bookings replayed, {failed} failed")
+
+
+# ------------------------------------------------------
+# HOVN (admin page HTML via hovn_api_client)
+# ------------------------------------------------------
+
+def replay_hovn_admin(args) -> None:
+    from hovn_api_client import _extract_booking_json_from_html, persist_booking_html
+
+    ok = failed = 0
+    for ref, entry in _select(raw_archive.HOVN_ADMIN_BOOKING_HTML, args).items():
+        try:
+            html = raw_archive.load_body(entry["sha256"], root=args.archive_dir)
+            if args.dry_run:
+                _extract_booking_json_from_html(html, ref)
+            else:
+                persist_booking_html(ref, html)
+            ok += 1
+        except Exception as e:
+            failed += 1
+            print(f"[REPLAY] {ref}: {e}")
+
+    print(f"[REPLAY] {ok} bookings replayed, {failed} failed")
+
+
+# ------------------------------------------------------
+# HOVN (admin page HTML via the HTTP/Flight engine)
+# ------------------------------------------------------
+
+def replay_hovn_http(args) -> None:
+    from hovn_http_scraper import parse_booking_page
+    from normalize import normalize_full_bundle
+
+    if not args.dry_run:
+        from db_pipeline import persist_full_normalized_bundle
+
+    ok = failed = 0
+    for ref, entry in _select(raw_archive.HOVN_ADMIN_BOOKING_HTML, args).items():
+        try:
+            html = raw_archive.load_body(entry["sha256"], root=args.archive_dir)
+            normalized = normalize_full_bundle(parse_booking_page(html, ref))
+            if not args.dry_run:
+                persist_full_normalized_bundle(normalized)
+            ok += 1
+        except Exception as e:
+            failed += 1
+            print(f"[REPLAY] {ref}: {e}")
+
+    print(f"[REPLAY] {ok} bookings replayed, {failed} failed")
+
+
+# ------------------------------------------------------
+# HOVN (whole session/order pages via hovn_roster_ingest)
+# ------------------------------------------------------
+
+def replay_hovn_roster(args) -> None:
+    from hovn_next_parser import parse_roster_html
+    from hovn_roster_ingest import ingest_roster_html
+
+    ok = failed = 0
+    for url, entry in _select(raw_archive.HOVN_ROSTER_HTML, args).items():
+        try:
+            html = raw_archive.load_body(entry["sha256"], root=args.archive_dir)
+            if args.dry_run:
+                print(f"[REPLAY] {url}: {len(parse_roster_html(html))} bookings")
+            else:
+                ingest_roster_html(html)
+            ok += 1
+        except Exception as e:
+            failed += 1
+            print(f"[REPLAY] {url}: {e}")
+
+    print(f"[REPLAY] {ok} rosters replayed, {failed} failed")
+
+
+REPLAYERS = {
+    "arc": replay_arc,
+    "hovn-pages": replay_hovn_pages,
+    "hovn-admin": replay_hovn_admin,
+    "hovn-http": replay_hovn_http,
+    "hovn-roster": replay_hovn_roster,
+}
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Replay archived ARC/Hovn responses through the parsers.")
+    ap.add_argument("source", choices=sorted(REPLAYERS))
+    ap.add_argument("--archive-dir", default=raw_archive.RAW_ARCHIVE_DIR or None)
+    ap.add_argument("--since", help="only captures fetched at/after this ISO time")
+    ap.add_argument("--until", help="only captures fetched at/before this ISO time")
+    ap.add_argument("--keys", nargs="+", help="only these emails / booking refs")
+    ap.add_argument("--dry-run", action="store_true", help="parse only, don't write to the DB")
+    args = ap.parse_args()
+
+    if not args.archive_dir:
+        ap.error("set RAW_ARCHIVE_DIR or pass --archive-dir")
+
+    started = time.perf_counter()
+    REPLAYERS[args.source](args)
+    print(f"[REPLAY] done in {time.perf_counter() - started:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
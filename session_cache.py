@@ -0,0 +1,122 @@
+# session_cache.py
+# ----------------
+# Memoizes extracted Hovn session pages across the bookings of one batch.
+# A class of 20 students is 20 booking refs pointing at the same session,
+# so the Playwright paths only need to load and extract it once.
+#
+# Two tiers:
+#   - memory: lives as long as the SessionPageCache (one batch run)
+#   - disk:   optional, set HOVN_SESSION_CACHE_DIR; entries older than
+#             HOVN_SESSION_CACHE_TTL seconds are ignored and overwritten
+#
+# Entries are keyed by Hovn session id (last segment of the session URL).
+# Sessions without a course name are never cached, so a half-rendered
+# page is retried on the next booking instead of being reused.
+
+import json
+import os
+import threading
+import time
+from typing import Any, Dict, Optional
+from urllib.parse import urlsplit
+
+HOVN_SESSION_CACHE_DIR = os.getenv("HOVN_SESSION_CACHE_DIR", "")
+HOVN_SESSION_CACHE_TTL = float(os.getenv("HOVN_SESSION_CACHE_TTL", "21600"))
+
+
+def session_key(session_url: str) -> str:
+    """"https://www.hovn.app/admin/x/sessions/1234?tab=roster" -> "1234"."""
+    path = urlsplit(session_url).path.rstrip("/")
+    return path.rsplit("/", 1)[-1] or session_url
+
+
+class SessionPageCache:
+    def __init__(self, cache_dir: Optional[str] = None, ttl: float = HOVN_SESSION_CACHE_TTL):
+        self.cache_dir = HOVN_SESSION_CACHE_DIR if cache_dir is None else cache_dir
+        self.ttl = ttl
+
+        # key -> {"session": {...}, "archive_sha": str | None}
+        self._memory: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.stores = 0
+
+    # ---------- disk tier ----------
+
+    def _path(self, key: str) -> str:
+        safe = "".join(c for c in key if c.isalnum() or c in "-_") or "unknown"
+        return os.path.join(self.cache_dir, safe + ".json")
+
+    def _load_disk(self, key: str) -> Optional[Dict[str, Any]]:
+        if not self.cache_dir or self.ttl <= 0:
+            return None
+        try:
+            with open(self._path(key), encoding="utf-8") as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if time.time() - entry.get("cached_at", 0) > self.ttl:
+            return None
+        return entry
+
+    def _save_disk(self, key: str, entry: Dict[str, Any]) -> None:
+        if not self.cache_dir or self.ttl <= 0:
+            return
+        path = self._path(key)
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump({**entry, "cached_at": time.time()}, f)
+            os.replace(tmp, path)
+        except OSError as e:
+            print(f"[SESSION_CACHE] could not write {path}: {e}")
+
+    # ---------- public ----------
+
+    def get(self, session_url: str) -> Optional[Dict[str, Any]]:
+        """
+        {"session": {...}, "archive_sha": ...} for this session, or None.
+        The session dict is a copy; callers may modify it.
+        """
+        key = session_key(session_url)
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                self.hits += 1
+                return {"session": dict(entry["session"]), "archive_sha": entry.get("archive_sha")}
+
+        entry = self._load_disk(key)
+        with self._lock:
+            if entry is None:
+                self.misses += 1
+                return None
+            entry = {"session": entry["session"], "archive_sha": entry.get("archive_sha")}
+            self._memory[key] = entry
+            self.disk_hits += 1
+            return {"session": dict(entry["session"]), "archive_sha": entry.get("archive_sha")}
+
+    def put(self, session_url: str, session: Optional[Dict[str, Any]], archive_sha: Optional[str] = None) -> None:
+        if not session or not session.get("course_name"):
+            return
+        key = session_key(session_url)
+        entry = {"session": dict(session), "archive_sha": archive_sha}
+        with self._lock:
+            self._memory[key] = entry
+            self.stores += 1
+        self._save_disk(key, entry)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.disk_hits + self.misses
+            return {
+                "entries": len(self._memory),
+                "hits": self.hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "stores": self.stores,
+                "hit_rate": round((self.hits + self.disk_hits) / lookups, 4) if lookups else 0.0,
+            }
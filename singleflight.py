@@ -0,0 +1,191 @@
+# singleflight.py
+# ---------------
+# Request coalescing for expensive scrapes (ARC cert lookups, Hovn
+# booking imports).
+#
+# Two layers:
+#   1) In-process: concurrent threads asking for the same key wait on
+#      one in-flight call and share its result.
+#   2) Cross-worker: the in-process leader takes a Postgres transaction
+#      advisory lock on the key. If another gunicorn worker already holds
+#      it, we block until that worker is done and then call `recheck()`
+#      so we can reuse what it just wrote to the DB instead of scraping
+#      again.
+#
+# Transaction-scoped locks (pg_advisory_xact_lock) are used on purpose:
+# session-scoped locks are not safe behind the Neon pgbouncer pooler.
+
+import copy
+import os
+import threading
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Optional, TypeVar
+
+from sqlalchemy import text
+
+from db import engine
+
+T = TypeVar("T")
+
+# Advisory lock namespaces (first int of the two-int lock key)
+ARC_LOCK_NAMESPACE = 4101
+HOVN_LOCK_NAMESPACE = 4102
+SCHEDULER_LOCK_NAMESPACE = 4103
+ARC_REVALIDATE_LOCK_NAMESPACE = 4104
+
+# How long a worker waits on another worker's in-flight fetch
+SINGLEFLIGHT_LOCK_TIMEOUT_MS = int(os.getenv("SINGLEFLIGHT_LOCK_TIMEOUT_MS", "60000"))
+
+
+def email_key(email: str) -> str:
+    return (email or "").strip().lower()
+
+
+def booking_key(ref: str) -> str:
+    return (ref or "").strip()
+
+
+class _Call:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result: Any = None
+        self.error: Optional[BaseException] = None
+
+
+class SingleFlight:
+    """
+    In-process request coalescing. The first caller for a key runs `fn`;
+    callers that arrive while it is running wait and get the same result
+    (or the same exception).
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls: Dict[str, _Call] = {}
+
+    def do(self, key: str, fn: Callable[[], T]) -> T:
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = _Call()
+                self._calls[key] = call
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return copy.deepcopy(call.result)
+
+        try:
+            call.result = fn()
+            return call.result
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                self._calls.pop(key, None)
+            call.done.set()
+
+
+@contextmanager
+def pg_advisory_xact_lock(namespace: int, key: str):
+    """
+    Hold a Postgres transaction advisory lock on (namespace, hashtext(key))
+    for the duration of the block. Yields True if we had to wait for
+    another holder, False if the lock was free.
+
+    If the DB is unreachable or the wait times out we yield None and the
+    caller proceeds unlocked — coalescing is an optimization, not a
+    correctness requirement.
+    """
+    conn = None
+    waited = None
+    try:
+        conn = engine.connect()
+        conn.begin()
+        params = {"ns": namespace, "key": key}
+        got = conn.execute(
+            text("SELECT pg_try_advisory_xact_lock(:ns, hashtext(:key))"), params
+        ).scalar()
+        waited = False
+        if not got:
+            conn.execute(text(f"SET LOCAL lock_timeout = {SINGLEFLIGHT_LOCK_TIMEOUT_MS}"))
+            conn.execute(text("SELECT pg_advisory_xact_lock(:ns, hashtext(:key))"), params)
+            waited = True
+    except Exception as e:
+        print(f"[SINGLEFLIGHT] advisory lock unavailable for {key}: {e}")
+        waited = None
+        if conn is not None:
+            conn.close()
+            conn = None
+
+    try:
+        yield waited
+    finally:
+        if conn is not None:
+            # Ending the transaction releases the xact lock
+            try:
+                conn.rollback()
+            finally:
+                conn.close()
+
+
+@contextmanager
+def pg_try_advisory_xact_lock(namespace: int, key: str):
+    """
+    Non-blocking variant for leader election between workers (e.g. the
+    cert refresh scheduler). Yields True if we hold the lock for the
+    duration of the block, False if another worker has it or the DB is
+    unreachable.
+    """
+    conn = None
+    got = False
+    try:
+        conn = engine.connect()
+        conn.begin()
+        got = bool(conn.execute(
+            text("SELECT pg_try_advisory_xact_lock(:ns, hashtext(:key))"),
+            {"ns": namespace, "key": key},
+        ).scalar())
+    except Exception as e:
+        print(f"[SINGLEFLIGHT] advisory lock unavailable for {key}: {e}")
+        got = False
+
+    try:
+        yield got
+    finally:
+        if conn is not None:
+            try:
+                conn.rollback()
+            finally:
+                conn.close()
+
+
+_flight = SingleFlight()
+
+
+def coalesce(
+    namespace: int,
+    key: str,
+    fetch: Callable[[], T],
+    recheck: Optional[Callable[[], Optional[T]]] = None,
+) -> T:
+    """
+    Run `fetch()` at most once per key across threads in this process and
+    across workers sharing the database.
+
+    `recheck()` is called only when we waited for another worker; if it
+    returns something other than None, that is used instead of fetching.
+    """
+
+    def leader() -> T:
+        with pg_advisory_xact_lock(namespace, key) as waited:
+            if waited and recheck is not None:
+                hit = recheck()
+                if hit is not None:
+                    return hit
+            return fetch()
+
+    return _flight.do(f"{namespace}:{key}", leader)
@@ -0,0 +1,110 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+import hovn_incremental
+from hovn_incremental import advance_watermark, settle_watermark, walk_listing
+
+T0 = datetime(2026, 10, 1, tzinfo=timezone.utc)
+
+
+def _listing(n_new, per_page, n_old=3):
+    """Pages of entries newest first: n_new past the T0 watermark, then n_old at/before it."""
+    rows = [{"ref": f"brn_new{i:03d}", "updated_at": T0 + timedelta(minutes=n_new - i), "created_at": None}
+            for i in range(n_new)]
+    rows += [{"ref": f"brn_old{i:03d}", "updated_at": T0 - timedelta(minutes=i), "created_at": None}
+             for i in range(n_old)]
+    return {p + 1: rows[i:i + per_page] for p, i in enumerate(range(0, len(rows), per_page))}
+
+
+@pytest.fixture
+def listing(monkeypatch):
+    pages = {}
+    fetched = []
+
+    def fetch(page):
+        fetched.append(page)
+        return page
+
+    monkeypatch.setattr(hovn_incremental, "parse_listing", lambda page: list(pages.get(page, [])))
+    return pages, fetch, fetched
+
+
+def _run(state, fetch, failed=(), max_pages=2):
+    entries, stats = walk_listing(
+        state["watermark"], fetch=fetch, max_pages=max_pages, overlap_seconds=0,
+        start_page=state["resume"]["page"] if state["resume"] else 1,
+    )
+    bad = [e["ref"] for e in entries if e["ref"] in failed]
+    state["watermark"], state["resume"] = settle_watermark(state["watermark"], entries, bad, stats, state["resume"])
+    return entries, stats
+
+
+def test_walk_stops_at_watermark(listing):
+    pages, fetch, fetched = listing
+    pages.update(_listing(n_new=5, per_page=4))
+
+    entries, stats = walk_listing(T0, fetch=fetch, max_pages=10, overlap_seconds=0)
+
+    assert [e["ref"] for e in entries] == [f"brn_new{i:03d}" for i in range(5)]
+    assert fetched == [1, 2, 3]  # page 2 still had a new row; page 3 is past it
+    assert not stats["hit_max_pages"]
+
+
+def test_page_cap_holds_watermark_and_resumes(listing):
+    pages, fetch, fetched = listing
+    pages.update(_listing(n_new=10, per_page=2))  # new rows span pages 1-5
+    state = {"watermark": T0, "resume": None}
+    seen = set()
+
+    entries, stats = _run(state, fetch)
+    seen.update(e["ref"] for e in entries)
+    assert stats["hit_max_pages"]
+    # The newest pages alone must not move the watermark past the unseen rows
+    assert state["watermark"] == T0
+    assert state["resume"] == {"page": 2, "watermark": T0 + timedelta(minutes=10)}
+
+    # Naive advance over the capped walk is exactly the gap this guards against
+    assert advance_watermark(T0, entries, []) == T0 + timedelta(minutes=10)
+
+    while state["resume"]:
+        start = state["resume"]["page"]
+        entries, stats = _run(state, fetch)
+        assert stats["start_page"] == start
+        seen.update(e["ref"] for e in entries)
+
+    assert seen == {f"brn_new{i:03d}" for i in range(10)}
+    assert state["watermark"] == T0 + timedelta(minutes=10)
+    assert fetched == [1, 2, 2, 3, 3, 4, 4, 5, 5, 6]
+
+
+def test_failure_in_resumed_run_lowers_chain_watermark(listing):
+    pages, fetch, _ = listing
+    pages.update(_listing(n_new=10, per_page=2))
+    state = {"watermark": T0, "resume": None}
+    failing = pages[4][0]  # an older row, only reached after resuming
+
+    _run(state, fetch, failed={failing["ref"]})
+    while state["resume"]:
+        _run(state, fetch, failed={failing["ref"]})
+
+    # Held at the newest row older than the failure, everything up to it ingested
+    assert state["watermark"] == T0 + timedelta(minutes=3)
+    assert state["watermark"] < failing["updated_at"]
+
+    # The next walk from page 1 picks the failed row up again
+    entries, _ = walk_listing(state["watermark"], fetch=fetch, max_pages=10, overlap_seconds=0)
+    assert failing["ref"] in {e["ref"] for e in entries}
+
+
+def test_first_run_without_watermark_is_capped_too(listing):
+    pages, fetch, _ = listing
+    pages.update(_listing(n_new=6, per_page=2, n_old=0))
+    state = {"watermark": None, "resume": None}
+
+    _run(state, fetch)
+    assert state["watermark"] is None and state["resume"]["page"] == 2
+
+    while state["resume"]:
+        _run(state, fetch)
+    assert state["watermark"] == T0 + timedelta(minutes=6)